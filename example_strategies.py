@@ -79,15 +79,9 @@ def macd_strategy(data: pd.DataFrame) -> str:
     if len(data) < 26:
         return 'HOLD'
     
-    # Calculate MACD
-    exp1 = data['Close'].ewm(span=12, adjust=False).mean()
-    exp2 = data['Close'].ewm(span=26, adjust=False).mean()
-    macd = exp1 - exp2
-    signal = macd.ewm(span=9, adjust=False).mean()
-    
-    # Get the last two days
-    last_two_macd = macd.tail(2)
-    last_two_signal = signal.tail(2)
+    # MACD columns come from calculate_indicators
+    last_two_macd = data['MACD'].tail(2)
+    last_two_signal = data['Signal_Line'].tail(2)
     
     # Check for crossovers
     if (last_two_macd.iloc[-2] < last_two_signal.iloc[-2] and 
@@ -110,12 +104,9 @@ def volume_strategy(data: pd.DataFrame,
     if len(data) < volume_ma_period:
         return 'HOLD'
     
-    # Calculate volume moving average
-    volume_ma = data['Volume'].rolling(window=volume_ma_period).mean()
-    
-    # Get the last day's data
+    # Get the last day's data and its volume moving average
     last_volume = data['Volume'].iloc[-1]
-    last_volume_ma = volume_ma.iloc[-1]
+    last_volume_ma = data['Volume'].iloc[-volume_ma_period:].mean()
     
     # Check for volume signals
     if last_volume > last_volume_ma * volume_threshold:
@@ -1,23 +1,16 @@
 from schwab_trader.strategies.volatility_pattern import VolatilityPatternStrategy
 from schwab_trader.utils.backtester import StrategyBacktester
+from schwab_trader.utils.price_panel import PricePanel
 from schwab_trader.utils.visualization import TechnicalAnalysisVisualizer
 import yfinance as yf
 from datetime import datetime, timedelta
 
 def fetch_historical_data(symbols, start_date, end_date):
-    """Fetch historical data from Yahoo Finance"""
+    """Fetch historical data from Yahoo Finance as one DataFrame per symbol"""
     data = {}
     for symbol in symbols:
         ticker = yf.Ticker(symbol)
-        df = ticker.history(start=start_date, end=end_date)
-        data[symbol] = df.reset_index().rename(columns={
-            'Date': 'date',
-            'Open': 'open',
-            'High': 'high',
-            'Low': 'low',
-            'Close': 'close',
-            'Volume': 'volume'
-        }).to_dict('records')
+        data[symbol] = ticker.history(start=start_date, end=end_date)
     return data
 
 def main():
@@ -42,8 +35,9 @@ def main():
     # Fetch historical data
     historical_data = fetch_historical_data(symbols, start_date, end_date)
     
-    # Run backtest
-    results = backtester.backtest(historical_data)
+    # Pack the frames into one aligned panel and run the backtest on it
+    panel = PricePanel.from_frames(historical_data)
+    results = backtester.backtest(panel)
     
     # Print performance metrics
     print("\nBacktest Results:")
@@ -55,7 +49,8 @@ def main():
     
     # Create and save visualization for each symbol
     for symbol in symbols:
-        symbol_data = historical_data[symbol]
+        symbol_data = historical_data[symbol].rename_axis('date').reset_index()
+        symbol_data.columns = [str(column).lower() for column in symbol_data.columns]
         symbol_signals = [t for t in results['trades'] if t['symbol'] == symbol]
         
         chart = visualizer.create_analysis_chart(symbol, symbol_data, symbol_signals)
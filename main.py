@@ -5,14 +5,15 @@ from fastapi.responses import HTMLResponse
 import yfinance as yf
 from datetime import datetime, timedelta
 import os
-import requests
 from dotenv import load_dotenv
 import json
 import asyncio
 from typing import List
 from sqlalchemy.orm import Session
 import models
-from models import get_db
+from models import SessionLocal, get_db
+from schwab_trader.services.alert_engine import LEGACY_CONDITIONS, AlertEngine, AlertRule
+from schwab_trader.services.quote_batcher import alpha_vantage_batcher
 
 # Load environment variables
 load_dotenv()
@@ -50,6 +51,32 @@ manager = ConnectionManager()
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
+# Active alerts, checked against every quote the symbol monitor receives
+alert_engine = AlertEngine()
+
+# Subscribers' demands are merged into batched multi-symbol requests
+quote_batcher = alpha_vantage_batcher(ALPHA_VANTAGE_API_KEY) if ALPHA_VANTAGE_API_KEY else None
+
+@app.on_event("startup")
+async def load_alerts():
+    db = SessionLocal()
+    try:
+        alert_engine.load(db.query(models.Alert).filter(models.Alert.is_active == True).all())
+    finally:
+        db.close()
+
+def record_triggered_alerts(triggered):
+    db = SessionLocal()
+    try:
+        for item in triggered:
+            alert = db.get(models.Alert, item.rule.id)
+            if alert:
+                alert.last_triggered = item.triggered_at
+                alert.is_active = False
+        db.commit()
+    finally:
+        db.close()
+
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
@@ -85,17 +112,14 @@ async def monitor_symbols(symbols: List[str]):
     while True:
         try:
             quotes = {}
-            for symbol in symbols:
-                if ALPHA_VANTAGE_API_KEY:
-                    url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={ALPHA_VANTAGE_API_KEY}"
-                    response = requests.get(url)
-                    data = response.json()
-                    if "Global Quote" in data:
-                        quote = data["Global Quote"]
+            if quote_batcher is not None:
+                batch = await asyncio.to_thread(quote_batcher.get_many, symbols)
+                for symbol, quote in batch.items():
+                    if quote:
                         quotes[symbol] = {
-                            "price": float(quote["05. price"]),
-                            "change": float(quote["09. change"]),
-                            "change_percent": float(quote["10. change percent"].replace("%", ""))
+                            "price": quote["price"],
+                            "change": quote["change"],
+                            "change_percent": quote["change_percent"]
                         }
             
             if quotes:
@@ -103,6 +127,15 @@ async def monitor_symbols(symbols: List[str]):
                     "type": "quotes",
                     "data": quotes
                 }))
+                triggered = alert_engine.process_many(
+                    {"symbol": symbol, **quote} for symbol, quote in quotes.items()
+                )
+                if triggered:
+                    await asyncio.to_thread(record_triggered_alerts, triggered)
+                    await manager.broadcast(json.dumps({
+                        "type": "alerts",
+                        "data": [item.to_dict() for item in triggered]
+                    }))
         except Exception as e:
             print(f"Error monitoring symbols: {str(e)}")
         
@@ -305,6 +338,8 @@ async def create_alert(
     threshold: float,
     db: Session = Depends(get_db)
 ):
+    if condition_type not in LEGACY_CONDITIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown alert condition: {condition_type}")
     portfolio = db.query(models.Portfolio).first()
     if not portfolio:
         raise HTTPException(status_code=404, detail="Portfolio not found")
@@ -317,6 +352,7 @@ async def create_alert(
     )
     db.add(alert)
     db.commit()
+    alert_engine.add(AlertRule.from_model(alert))
     
     return {"message": f"Alert created for {symbol}"}
 
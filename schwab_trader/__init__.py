@@ -58,6 +58,23 @@ def create_app(config_class=Config):
         
         strategy_tester = StrategyTester(data_manager)
         cache.set('strategy_tester', strategy_tester)
+        
+        # Evaluate stored alerts against live quotes in the background
+        if app.config.get('ALERT_MONITOR_ENABLED'):
+            if not app.config['ALPHA_VANTAGE_API_KEY']:
+                app.logger.warning("Alert monitor not started: ALPHA_VANTAGE_API_KEY is not set")
+            else:
+                from schwab_trader.services.alert_engine import AlertEngine
+                from schwab_trader.services.quote_batcher import alpha_vantage_batcher
+                from schwab_trader.tasks.alert_monitor import start_alert_monitor
+                
+                engine = AlertEngine(volume_history=volume_analysis.volume_history, store=data_manager.store)
+                app.extensions['alert_monitor'] = start_alert_monitor(
+                    app,
+                    engine=engine,
+                    quotes=alpha_vantage_batcher(app.config['ALPHA_VANTAGE_API_KEY']),
+                    interval_seconds=app.config['ALERT_MONITOR_INTERVAL']
+                )
     
     # Register blueprints
     from schwab_trader.routes import auth, main, positions, market_analysis
@@ -73,6 +73,10 @@ class Config:
     REALTIME_MAX_RETRIES = int(os.getenv('REALTIME_MAX_RETRIES', '3'))
     REALTIME_RETRY_DELAY = int(os.getenv('REALTIME_RETRY_DELAY', '5'))  # seconds
     
+    # Alert monitor configuration
+    ALERT_MONITOR_ENABLED = os.getenv('ALERT_MONITOR_ENABLED', 'false').lower() == 'true'
+    ALERT_MONITOR_INTERVAL = int(os.getenv('ALERT_MONITOR_INTERVAL', '15'))  # seconds
+    
     # Strategy testing configuration
     STRATEGY_TEST_START_DATE = os.getenv('STRATEGY_TEST_START_DATE', '2020-01-01')
     STRATEGY_TEST_END_DATE = os.getenv('STRATEGY_TEST_END_DATE', '2023-12-31')
@@ -93,7 +97,8 @@ class Config:
         'ANALYSIS_MACD_SIGNAL': {'min': 2, 'max': 30},
         'NEWS_MAX_ARTICLES': {'min': 10, 'max': 1000},
         'REALTIME_MAX_RETRIES': {'min': 1, 'max': 10},
-        'REALTIME_RETRY_DELAY': {'min': 1, 'max': 60}
+        'REALTIME_RETRY_DELAY': {'min': 1, 'max': 60},
+        'ALERT_MONITOR_INTERVAL': {'min': 5, 'max': 3600}
     }
 
     # Format validation rules
@@ -239,6 +244,7 @@ class TestingConfig(Config):
     # Testing-specific overrides
     NEWS_UPDATE_INTERVAL = 30  # 30 seconds for testing
     REALTIME_UPDATE_INTERVAL = 1  # 1 second for testing
+    ALERT_MONITOR_ENABLED = False
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -103,7 +103,10 @@ DIRECTORY_CONFIG = {
         'validation': 'validation',
         'periods': 'periods',
         'historical': 'historical',
-        'logs': 'logs'
+        'logs': 'logs',
+        'benchmarks': 'benchmarks',
+        'store': 'store',
+        'cache': 'cache'
     }
 }
 
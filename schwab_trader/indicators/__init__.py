@@ -0,0 +1,25 @@
+"""
+Technical indicators with batch and streaming implementations.
+"""
+
+from .batch import sma, ema, rsi, macd, bollinger_bands, atr, volume_ma, rolling_std
+from .streaming import Indicator, SMA, EMA, RSI, MACD, BollingerBands, ATR, VolumeMA
+
+__all__ = [
+    'sma',
+    'ema',
+    'rsi',
+    'macd',
+    'bollinger_bands',
+    'atr',
+    'volume_ma',
+    'rolling_std',
+    'Indicator',
+    'SMA',
+    'EMA',
+    'RSI',
+    'MACD',
+    'BollingerBands',
+    'ATR',
+    'VolumeMA'
+]
@@ -0,0 +1,140 @@
+"""Batch indicator implementations over whole price histories.
+
+Each function takes 1-D arrays (or anything ``np.asarray`` accepts) and
+returns arrays of the same length, NaN until the indicator has enough bars.
+Windowed indicators are vectorized; the recursive ones (EMA, Wilder
+smoothing) share their step functions with ``streaming`` so both paths
+produce identical values.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+NAN = float('nan')
+
+
+def ema_step(previous, value, alpha):
+    """One exponential smoothing step; ``previous`` is NaN before the first value."""
+    if previous != previous:
+        return value
+    return previous + alpha * (value - previous)
+
+
+def wilder_step(previous, value, period):
+    """One Wilder smoothing step."""
+    return (previous * (period - 1) + value) / period
+
+
+def rsi_from_averages(avg_gain, avg_loss):
+    """RSI from smoothed gains and losses."""
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+def true_range(high, low, previous_close):
+    """True range of a bar; the first bar has no previous close."""
+    if previous_close != previous_close:
+        return high - low
+    return max(high - low, abs(high - previous_close), abs(low - previous_close))
+
+
+def _as_array(values):
+    return np.asarray(values, dtype=float)
+
+
+def sma(values, period=20):
+    """Simple moving average."""
+    values = _as_array(values)
+    result = np.full(len(values), np.nan)
+    if len(values) >= period:
+        result[period - 1:] = sliding_window_view(values, period).sum(axis=1) / period
+    return result
+
+
+def rolling_std(values, period=20, ddof=1):
+    """Rolling standard deviation."""
+    values = _as_array(values)
+    result = np.full(len(values), np.nan)
+    if len(values) >= period:
+        result[period - 1:] = sliding_window_view(values, period).std(axis=1, ddof=ddof)
+    return result
+
+
+def volume_ma(volumes, period=20):
+    """Moving average of volume."""
+    return sma(volumes, period)
+
+
+def ema(values, span=None, alpha=None):
+    """Exponential moving average seeded with the first value.
+
+    Matches ``Series.ewm(span=span, adjust=False).mean()``.
+    """
+    alpha = alpha if alpha is not None else 2.0 / (span + 1)
+    result = np.empty(len(values))
+    current = NAN
+    for i, value in enumerate(_as_array(values).tolist()):
+        current = ema_step(current, value, alpha)
+        result[i] = current
+    return result
+
+
+def rsi(close, period=14):
+    """Wilder's RSI, first defined at bar ``period``."""
+    close = _as_array(close).tolist()
+    result = np.full(len(close), np.nan)
+    gain_sum = loss_sum = 0.0
+    avg_gain = avg_loss = NAN
+    for i in range(1, len(close)):
+        change = close[i] - close[i - 1]
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if i < period:
+            gain_sum += gain
+            loss_sum += loss
+            continue
+        if i == period:
+            avg_gain = (gain_sum + gain) / period
+            avg_loss = (loss_sum + loss) / period
+        else:
+            avg_gain = wilder_step(avg_gain, gain, period)
+            avg_loss = wilder_step(avg_loss, loss, period)
+        result[i] = rsi_from_averages(avg_gain, avg_loss)
+    return result
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD line, signal line and histogram."""
+    macd_line = ema(close, span=fast) - ema(close, span=slow)
+    signal_line = ema(macd_line, span=signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def bollinger_bands(close, period=20, num_std=2.0):
+    """Upper band, middle band (SMA) and lower band."""
+    middle = sma(close, period)
+    width = rolling_std(close, period) * num_std
+    return middle + width, middle, middle - width
+
+
+def atr(high, low, close, period=14):
+    """Wilder's average true range, first defined at bar ``period - 1``."""
+    high = _as_array(high).tolist()
+    low = _as_array(low).tolist()
+    close = _as_array(close).tolist()
+    result = np.full(len(close), np.nan)
+    tr_sum = 0.0
+    current = NAN
+    previous_close = NAN
+    for i in range(len(close)):
+        tr = true_range(high[i], low[i], previous_close)
+        previous_close = close[i]
+        if i < period - 1:
+            tr_sum += tr
+            continue
+        if i == period - 1:
+            current = (tr_sum + tr) / period
+        else:
+            current = wilder_step(current, tr, period)
+        result[i] = current
+    return result
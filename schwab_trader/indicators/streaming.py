@@ -0,0 +1,222 @@
+"""Stateful indicators advanced one bar at a time.
+
+``update(bar)`` accepts a number or a bar mapping (``{'close': ...}`` or a
+DataFrame row with ``Close``) and returns the current value, NaN until the
+indicator is warm. Every update is O(1). Every class matches its batch
+counterpart, exactly or (for the running sums of SMA and Bollinger Bands) to
+within rounding, so a history can be seeded with ``batch`` or by streaming
+and give the same result. ``copy()`` snapshots the state, e.g. to apply a provisional
+intraday bar without committing it.
+"""
+import copy
+from abc import ABC, abstractmethod
+from collections import deque
+import numpy as np
+from .batch import NAN, ema_step, wilder_step, rsi_from_averages, true_range
+
+
+def bar_value(bar, field):
+    """Read ``field`` from a bar mapping, accepting capitalized keys; numbers pass through."""
+    if isinstance(bar, (int, float, np.floating, np.integer)):
+        return float(bar)
+    if field in bar:
+        return float(bar[field])
+    return float(bar[field.capitalize()])
+
+
+class Indicator(ABC):
+    """Base class for streaming indicators."""
+
+    field = 'close'
+
+    def __init__(self):
+        self.value = NAN
+
+    @property
+    def ready(self):
+        value = self.value[0] if isinstance(self.value, tuple) else self.value
+        return value == value
+
+    @abstractmethod
+    def update(self, bar):
+        """Advance by one bar and return the current value"""
+        pass
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+
+class SMA(Indicator):
+    """Simple moving average.
+
+    Keeps a running sum of the window, re-summed every ``period`` updates so
+    rounding errors cannot accumulate.
+    """
+
+    def __init__(self, period=20, field='close'):
+        super().__init__()
+        self.period = period
+        self.field = field
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.updates = 0
+
+    def _window_array(self):
+        return np.fromiter(self.window, dtype=float, count=len(self.window))
+
+    @property
+    def resummed(self):
+        """Whether the last update recomputed the sum from the window."""
+        return self.updates % self.period == 0
+
+    def update(self, bar):
+        value = bar_value(bar, self.field)
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(value)
+        self.total += value
+        self.updates += 1
+        if self.resummed:
+            self.total = float(self._window_array().sum())
+        if len(self.window) == self.period:
+            self.value = self.total / self.period
+        return self.value
+
+
+class VolumeMA(SMA):
+    """Moving average of volume."""
+
+    def __init__(self, period=20):
+        super().__init__(period, field='volume')
+
+
+class EMA(Indicator):
+    """Exponential moving average seeded with the first value."""
+
+    def __init__(self, span=None, alpha=None, field='close'):
+        super().__init__()
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1)
+        self.field = field
+
+    def update(self, bar):
+        self.value = ema_step(self.value, bar_value(bar, self.field), self.alpha)
+        return self.value
+
+
+class RSI(Indicator):
+    """Wilder's RSI."""
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+        self.count = 0
+        self.previous = NAN
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.avg_gain = NAN
+        self.avg_loss = NAN
+
+    def update(self, bar):
+        close = bar_value(bar, self.field)
+        previous, self.previous = self.previous, close
+        if previous != previous:
+            return self.value
+
+        self.count += 1
+        change = close - previous
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if self.count < self.period:
+            self.gain_sum += gain
+            self.loss_sum += loss
+            return self.value
+        if self.count == self.period:
+            self.avg_gain = (self.gain_sum + gain) / self.period
+            self.avg_loss = (self.loss_sum + loss) / self.period
+        else:
+            self.avg_gain = wilder_step(self.avg_gain, gain, self.period)
+            self.avg_loss = wilder_step(self.avg_loss, loss, self.period)
+        self.value = rsi_from_averages(self.avg_gain, self.avg_loss)
+        return self.value
+
+
+class MACD(Indicator):
+    """MACD line, signal line and histogram."""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        super().__init__()
+        self.fast = EMA(span=fast)
+        self.slow = EMA(span=slow)
+        self.signal = EMA(span=signal)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, bar):
+        close = bar_value(bar, self.field)
+        macd_line = self.fast.update(close) - self.slow.update(close)
+        signal_line = self.signal.update(macd_line)
+        self.value = (macd_line, signal_line, macd_line - signal_line)
+        return self.value
+
+
+class BollingerBands(Indicator):
+    """Upper band, middle band (SMA) and lower band.
+
+    The window's sum of squared deviations is updated in O(1) with Welford's
+    sliding-window step, which avoids the cancellation of a raw sum of
+    squares, and recomputed whenever the SMA re-sums its window.
+    """
+
+    def __init__(self, period=20, num_std=2.0):
+        super().__init__()
+        self.sma = SMA(period)
+        self.num_std = num_std
+        self.m2 = 0.0
+        self.std = NAN
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, bar):
+        value = bar_value(bar, self.field)
+        window = self.sma.window
+        count = len(window)
+        evicted = window[0] if count == self.sma.period else None
+        old_mean = self.sma.total / count if count else 0.0
+
+        middle = self.sma.update(value)
+        if self.sma.resummed:
+            values = self.sma._window_array()
+            self.m2 = float(((values - values.mean()) ** 2).sum())
+        else:
+            new_mean = self.sma.total / len(window)
+            if evicted is None:
+                self.m2 += (value - old_mean) * (value - new_mean)
+            else:
+                self.m2 += (value - evicted) * (value - new_mean + evicted - old_mean)
+
+        if self.sma.ready:
+            self.std = float(np.sqrt(max(self.m2, 0.0) / (self.sma.period - 1)))
+            width = self.std * self.num_std
+            self.value = (middle + width, middle, middle - width)
+        return self.value
+
+
+class ATR(Indicator):
+    """Wilder's average true range."""
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+        self.count = 0
+        self.tr_sum = 0.0
+        self.previous_close = NAN
+
+    def update(self, bar):
+        tr = true_range(bar_value(bar, 'high'), bar_value(bar, 'low'), self.previous_close)
+        self.previous_close = bar_value(bar, 'close')
+        self.count += 1
+        if self.count < self.period:
+            self.tr_sum += tr
+        elif self.count == self.period:
+            self.value = (self.tr_sum + tr) / self.period
+        else:
+            self.value = wilder_step(self.value, tr, self.period)
+        return self.value
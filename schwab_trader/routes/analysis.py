@@ -7,17 +7,21 @@ import statistics
 import os
 from schwab_trader.services.volume_analysis import VolumeAnalysisService
 from schwab_trader.services.logging_service import LoggingService
-import pandas as pd
 from schwab_trader.services.strategy_tester import StrategyTester
 from schwab_trader.services.schwab_market import SchwabMarketAPI
+from schwab_trader.services.market_stream import MarketStreamPublisher
+from schwab_trader import indicators
 import json
-import time
+import threading
 
 analysis_bp = Blueprint('analysis', __name__, url_prefix='/analysis')
 
 # Configure logging
 logger = LoggingService('analysis').logger
 
+# Guards creating the per-app market stream publisher
+_market_stream_lock = threading.Lock()
+
 def get_services():
     """Get services from the current application context."""
     services = {
@@ -79,16 +83,14 @@ def dashboard():
                             logger.error(f"Error getting market status: {str(e)}")
                             error_messages.append("Unable to fetch market status")
                     
-                    # Get basic stock data for default symbols
-                    for symbol in default_symbols:
-                        try:
-                            if services['schwab_market']:
-                                data = services['schwab_market'].get_latest_data(symbol)
-                                if data:
-                                    stock_data[symbol] = data
-                        except Exception as e:
-                            logger.error(f"Error fetching data for {symbol}: {str(e)}")
-                            error_messages.append(f"Unable to fetch data for {symbol}")
+                    # Get basic stock data for default symbols in one batched request
+                    if services['schwab_market']:
+                        quotes = services['schwab_market'].quotes.get_many(default_symbols)
+                        for symbol, data in quotes.items():
+                            if data:
+                                stock_data[symbol] = data
+                            else:
+                                error_messages.append(f"Unable to fetch data for {symbol}")
                     
                     # Get volume analysis if service is available
                     if services['volume_analysis']:
@@ -204,9 +206,10 @@ def get_market_data():
             }
         elif data_type == 'technical':
             # Calculate technical indicators
-            data['SMA_20'] = data['close'].rolling(window=20).mean()
-            data['SMA_50'] = data['close'].rolling(window=50).mean()
-            data['RSI'] = calculate_rsi(data['close'])
+            close = data['close'].to_numpy(dtype=float)
+            data['SMA_20'] = indicators.sma(close, 20)
+            data['SMA_50'] = indicators.sma(close, 50)
+            data['RSI'] = indicators.rsi(close)
             
             response_data = {
                 'dates': data.index.strftime('%Y-%m-%d').tolist(),
@@ -235,21 +238,45 @@ def get_market_data():
             'message': str(e)
         }), 500
 
+def get_market_stream():
+    """Shared publisher behind every dashboard stream of this app."""
+    publisher = current_app.extensions.get('market_stream')
+    if publisher is None:
+        with _market_stream_lock:
+            publisher = current_app.extensions.get('market_stream')
+            if publisher is None:
+                publisher = MarketStreamPublisher(get_services()['schwab_market'].quotes)
+                current_app.extensions['market_stream'] = publisher
+    return publisher
+
 @analysis_bp.route('/dashboard/stream-data')
 def stream_data():
-    """Stream real-time market data."""
+    """Stream real-time market data.
+    
+    Every client subscribes to the shared publisher, which polls each
+    symbol once per interval however many clients are connected.
+    """
+    symbols = [symbol.strip() for symbol in request.args.get('symbols', 'AAPL,MSFT,GOOGL').split(',') if symbol.strip()]
+    try:
+        subscription = get_market_stream().subscribe(symbols)
+    except Exception as e:
+        logger.error(f"Error starting data stream: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 503
+
     def generate():
-        try:
+        with subscription:
             while True:
-                # Get latest market data
-                data = services['schwab_market'].get_latest_data()
-                yield f"data: {json.dumps(data)}\n\n"
-                time.sleep(1)  # Adjust frequency as needed
-        except Exception as e:
-            logger.error(f"Error in data stream: {str(e)}")
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                frame = subscription.get(timeout=15)
+                if frame is None:
+                    # Comment line keeps idle connections open through proxies
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(frame)}\n\n"
 
-    return Response(generate(), mimetype='text/event-stream')
+    response = Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+    # Also unsubscribe clients that disconnect before the first frame
+    response.call_on_close(subscription.close)
+    return response
 
 def get_alpha_vantage():
     """Get Alpha Vantage API instance or None if not configured."""
@@ -440,25 +467,24 @@ def volume_analysis():
         # Get volume type from request
         volume_type = request.args.get('volume_type', 'raw')
         
+        services = get_services()
+        
         # List of stocks to analyze
         symbols = ['TSLA', 'NVDA', 'AAPL']
         stock_data = {}
         volume_alerts = []
         api_errors = []
         
+        histories = {}
         for symbol in symbols:
             try:
                 # Fetch historical data
-                logger.log('INFO', f"Fetching historical data for {symbol}", {
-                    'symbol': symbol,
-                    'days': days,
-                    'volume_type': volume_type
-                })
+                logger.info(f"Fetching {days} days of historical data for {symbol} ({volume_type} volume)")
                 
                 historical_data = schwab_api.get_historical_prices(symbol, days=days)
                 if not historical_data:
                     error_msg = f"No data available for {symbol}"
-                    logger.log('WARNING', error_msg, {'symbol': symbol})
+                    logger.warning(error_msg)
                     api_errors.append(error_msg)
                     continue
                 
@@ -471,39 +497,31 @@ def volume_analysis():
                     volumes = [v / avg_volume for v in volumes]
                 elif volume_type == 'sma':
                     # Calculate 20-day SMA
-                    sma = pd.Series(volumes).rolling(window=20).mean()
-                    volumes = sma.tolist()
-                
-                # Update volume data and get analysis
-                analysis = services['volume_analysis'].update_volume_data(symbol, volumes[-1])
-                
-                # Get volume alerts
-                alerts = services['volume_analysis'].get_volume_alerts(symbol)
-                volume_alerts.extend(alerts)
+                    volumes = indicators.volume_ma(volumes, 20).tolist()
                 
-                # Prepare data for template
+                histories[symbol] = volumes
                 stock_data[symbol] = {
                     'historical_data': historical_data,
-                    'analysis': analysis,
-                    'alerts': alerts,
                     'volumes': volumes
                 }
                 
-                logger.log('INFO', f"Completed analysis for {symbol}", {
-                    'symbol': symbol,
-                    'data_points': len(historical_data),
-                    'alerts_count': len(alerts)
-                })
-                
             except Exception as e:
                 error_msg = f"Error processing {symbol}: {str(e)}"
-                logger.log('ERROR', error_msg, {
-                    'symbol': symbol,
-                    'error': str(e)
-                })
+                logger.error(error_msg)
                 api_errors.append(error_msg)
                 continue
         
+        # Analyze every fetched symbol in one vectorized pass
+        if histories:
+            volume_service = services['volume_analysis']
+            analyses = volume_service.to_analyses(
+                volume_service.analyze_universe(*volume_service.volume_matrix(histories))
+            )
+            for symbol, analysis in analyses.items():
+                alerts = volume_service.alerts_for(analysis)
+                volume_alerts.extend(alerts)
+                stock_data[symbol].update({'analysis': analysis, 'alerts': alerts})
+        
         # Get log statistics
         log_stats = logger.get_log_stats()
         
@@ -676,11 +694,3 @@ def test_strategy():
     except Exception as e:
         logger.error(f"Error testing strategy: {str(e)}")
         return jsonify({'error': str(e)}), 500
-
-def calculate_rsi(prices, period=14):
-    """Calculate Relative Strength Index."""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs)) 
\ No newline at end of file
@@ -1,5 +1,9 @@
 from flask import Blueprint, jsonify, current_app
+from schwab_trader.services.quote_batcher import quote_batcher_metrics
+from schwab_trader.utils.cache import cache_metrics
+from schwab_trader.utils.circuit_breaker import breaker_metrics
 from schwab_trader.utils.logger import setup_logger
+from schwab_trader.utils.single_flight import single_flight_metrics
 
 logger = setup_logger(__name__)
 api_bp = Blueprint('api', __name__)
@@ -22,6 +26,16 @@ def get_api_status():
             'yfinance': 'error'
         }), 500
 
+@api_bp.route('/api/metrics')
+def get_api_metrics():
+    """Get circuit breaker, request coalescing, cache and quote batching counters for the market data providers."""
+    return jsonify({
+        'circuit_breakers': breaker_metrics(),
+        'single_flight': single_flight_metrics(),
+        'caches': cache_metrics(),
+        'quote_batches': quote_batcher_metrics()
+    })
+
 @api_bp.route('/api/schwab/<action>', methods=['POST'])
 def toggle_schwab(action):
     """Toggle Schwab API connection."""
@@ -0,0 +1,233 @@
+"""Benchmark the backtesters on synthetic market data.
+
+Times ``StrategyBacktester.backtest`` (panel), the services
+``StrategyTester`` portfolio run (service) and the top-level
+``StrategyTester.backtest_strategy`` (legacy) on deterministic universes
+from ``utils.synthetic_market``. It reports bars/sec and peak traced memory,
+appends the results to a JSON history, and flags regressions against the
+previous run of the same case.
+
+Usage:
+    python -m schwab_trader.scripts.benchmark_backtests --symbols 10 100 --years 1 5
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+from schwab_trader.config.market_config import get_directory_path
+from schwab_trader.utils.synthetic_market import generate_panel, panel_to_frames
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKTESTERS = ('panel', 'service', 'legacy')
+HISTORY_FILE = 'backtests.json'
+
+
+class SyntheticDataManager:
+    """Serves synthetic frames in place of DataManager."""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_historical_data(self, symbol, start_date, end_date, source='auto'):
+        return self.frames[symbol].copy()
+
+
+def run_panel(panel, frames):
+    """StrategyBacktester on the packed panel."""
+    from schwab_trader.strategies.sentiment_volume import SentimentVolumeStrategy
+    from schwab_trader.utils.backtester import StrategyBacktester
+
+    StrategyBacktester(SentimentVolumeStrategy()).backtest(panel)
+
+
+def run_service(panel, frames):
+    """services.strategy_tester.StrategyTester over the whole universe."""
+    from schwab_trader.services.strategy_tester import StrategyTester
+    from schwab_trader.strategies.volume_strategy import volume_strategy
+
+    tester = StrategyTester()
+    tester.data_manager = SyntheticDataManager(frames)
+    tester.run_portfolio(panel.symbols, panel.dates[0], panel.dates[-1], volume_strategy)
+
+
+def run_legacy(panel, frames):
+    """Top-level strategy_tester.StrategyTester.backtest_strategy."""
+    from strategy_tester import StrategyTester
+    from example_strategies import moving_average_crossover_strategy
+
+    tester = StrategyTester()
+    tester.get_historical_data = lambda symbol, start_date, end_date, interval='1d': frames[symbol].copy()
+    tester.backtest_strategy(
+        moving_average_crossover_strategy,
+        panel.symbols,
+        panel.dates[0].strftime('%Y-%m-%d'),
+        panel.dates[-1].strftime('%Y-%m-%d')
+    )
+
+
+RUNNERS = {'panel': run_panel, 'service': run_service, 'legacy': run_legacy}
+
+
+def measure(func, *args, memory=True):
+    """Run ``func`` and return ``(seconds, peak_bytes)``.
+
+    Timing and memory are taken in separate runs because tracing
+    allocations slows Python code down considerably.
+    """
+    start = time.perf_counter()
+    func(*args)
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func(*args)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return seconds, peak
+
+
+def run_benchmarks(sizes, backtesters=BACKTESTERS, seed=0, memory=True):
+    """Benchmark every backtester on every ``(n_symbols, years)`` size.
+
+    Returns:
+        List of result dicts with ``bars`` (symbol-days), ``seconds``,
+        ``bars_per_sec`` and ``peak_mb``.
+    """
+    results = []
+    for n_symbols, years in sizes:
+        panel = generate_panel(n_symbols, years, seed=seed)
+        frames = panel_to_frames(panel) if set(backtesters) - {'panel'} else None
+        bars = len(panel) * len(panel.symbols)
+
+        for name in backtesters:
+            logger.info(f"Benchmarking {name}: {n_symbols} symbols x {years} years ({bars} bars)")
+            seconds, peak = measure(RUNNERS[name], panel, frames, memory=memory)
+            results.append({
+                'backtester': name,
+                'symbols': n_symbols,
+                'years': years,
+                'bars': bars,
+                'seconds': seconds,
+                'bars_per_sec': bars / seconds if seconds > 0 else float('inf'),
+                'peak_mb': peak / 2 ** 20 if peak is not None else None
+            })
+    return results
+
+
+def _case(result):
+    return result['backtester'], result['symbols'], result['years']
+
+
+def find_regressions(history, results, threshold=0.2):
+    """Compare results with the latest earlier run of each case.
+
+    Returns a list of messages for throughput drops or memory growth larger
+    than ``threshold`` (a fraction).
+    """
+    previous = {}
+    for entry in history:
+        for result in entry['results']:
+            previous[_case(result)] = result
+
+    regressions = []
+    for result in results:
+        baseline = previous.get(_case(result))
+        if baseline is None:
+            continue
+        label = '{} {} symbols x {} years'.format(*_case(result))
+        if result['bars_per_sec'] < baseline['bars_per_sec'] * (1 - threshold):
+            regressions.append(
+                f"{label}: {result['bars_per_sec']:,.0f} bars/sec, was {baseline['bars_per_sec']:,.0f}"
+            )
+        if result['peak_mb'] and baseline.get('peak_mb') and result['peak_mb'] > baseline['peak_mb'] * (1 + threshold):
+            regressions.append(
+                f"{label}: peak {result['peak_mb']:.1f} MB, was {baseline['peak_mb']:.1f} MB"
+            )
+    return regressions
+
+
+def load_history(path):
+    """Read the benchmark history, or an empty one."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    """Write the benchmark history atomically."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--symbols', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--years', type=float, nargs='+', default=[1, 5])
+    parser.add_argument('--backtesters', nargs='+', choices=BACKTESTERS, default=list(BACKTESTERS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced-memory run')
+    parser.add_argument('--history', default=os.path.join(get_directory_path('benchmarks'), HISTORY_FILE))
+    parser.add_argument('--threshold', type=float, default=0.2, help='regression tolerance as a fraction')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+
+    sizes = [(n_symbols, years) for n_symbols in args.symbols for years in args.years]
+    results = run_benchmarks(sizes, args.backtesters, seed=args.seed, memory=not args.no_memory)
+
+    for result in results:
+        peak = f"{result['peak_mb']:.1f} MB" if result['peak_mb'] is not None else '-'
+        print(
+            f"{result['backtester']:>8} {result['symbols']:>6} symbols {result['years']:>5g} years "
+            f"{result['bars']:>12,} bars {result['seconds']:>9.2f}s "
+            f"{result['bars_per_sec']:>14,.0f} bars/sec {peak:>10}"
+        )
+
+    history = load_history(args.history)
+    regressions = find_regressions(history, results, args.threshold)
+    history.append({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'seed': args.seed,
+        'results': results
+    })
+    save_history(args.history, history)
+    logger.info(f"Appended results to {args.history}")
+
+    for message in regressions:
+        logger.warning(f"Regression: {message}")
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,7 +4,7 @@ import logging
 from datetime import datetime
 import requests
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 import shutil
@@ -17,6 +17,7 @@ from schwab_trader.config.market_config import (
     DATA_COLLECTION_CONFIG,
     get_directory_path
 )
+from schwab_trader.utils.cache import get_cache, make_key
 from schwab_trader.utils.data_validation import DataValidator
 
 # Configure logging
@@ -39,7 +40,7 @@ class DataCollector:
         self.timeout = DATA_COLLECTION_CONFIG['timeout']
         self.batch_size = DATA_COLLECTION_CONFIG['batch_size']
         self.failed_files: List[Path] = []
-        self.validation_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.validation_cache = get_cache('validated_history', max_entries=256, max_bytes=256 * 1024 * 1024, ttl=None)
     
     def check_disk_space(self, required_bytes: int) -> bool:
         """Check if there's enough disk space for data collection."""
@@ -102,10 +103,11 @@ class DataCollector:
             return None
             
         # Check cache first
-        cache_key = (symbol, market_condition)
-        if cache_key in self.validation_cache:
+        cache_key = make_key(symbol, market_condition)
+        cached_data = self.validation_cache.get(cache_key)
+        if cached_data is not None:
             logger.info(f"Using cached validation results for {symbol} ({market_condition})")
-            return self.validation_cache[cache_key]
+            return cached_data
             
         for attempt in range(self.retry_attempts):
             try:
@@ -134,7 +136,7 @@ class DataCollector:
                 data['data']['validation_stats'] = stats
                 
                 # Cache the validated data
-                self.validation_cache[cache_key] = data['data']
+                self.validation_cache.set(cache_key, data['data'])
                 return data['data']
                 
             except requests.Timeout:
@@ -152,12 +154,24 @@ class DataCollector:
                     logger.error(f"All attempts failed for {symbol} ({market_condition}): {str(e)}")
                     return None
     
+    def data_path(self, symbol: str, market_condition: str, base_dir: Path) -> Path:
+        """Location of the collected data for a symbol and market condition."""
+        return base_dir / symbol / market_condition / f"{symbol}_{market_condition}.json"
+    
+    def load_saved_data(self, symbol: str, market_condition: str, base_dir: Path) -> Optional[Dict[str, Any]]:
+        """Return previously collected data, or None if it is missing or unreadable."""
+        filepath = self.data_path(symbol, market_condition, base_dir)
+        try:
+            with open(filepath, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if 'validation_stats' in data else None
+    
     def save_historical_data(self, data: Dict[str, Any], symbol: str, market_condition: str, base_dir: Path) -> Optional[Path]:
-        """Save historical data to JSON file."""
+        """Save historical data to JSON file, replacing any earlier copy atomically."""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{symbol}_{market_condition}_{timestamp}.json"
-            filepath = base_dir / symbol / market_condition / filename
+            filepath = self.data_path(symbol, market_condition, base_dir)
             
             # Create a temporary file first
             temp_filepath = filepath.with_suffix('.tmp')
@@ -170,8 +184,8 @@ class DataCollector:
                 if loaded_data != data:
                     raise Exception("Data corruption detected during save")
             
-            # Rename temp file to final file
-            temp_filepath.rename(filepath)
+            # Replace the previous file in one step
+            os.replace(temp_filepath, filepath)
             
             logger.info(f"Saved data to {filepath}")
             return filepath
@@ -186,6 +200,19 @@ class DataCollector:
         """Process a single stock and market condition combination."""
         logger.info(f"\nProcessing {symbol} ({condition})...")
         
+        # Market periods are fixed date ranges, so collected data never goes stale
+        saved = self.load_saved_data(symbol, condition, base_dir)
+        if saved is not None:
+            logger.info(f"Already collected {symbol} ({condition})")
+            return {
+                'status': 'success',
+                'symbol': symbol,
+                'condition': condition,
+                'filepath': str(self.data_path(symbol, condition, base_dir)),
+                'stats': saved['validation_stats'],
+                'cached': True
+            }
+        
         data = self.fetch_historical_data(symbol, condition)
         if data:
             filepath = self.save_historical_data(data, symbol, condition, base_dir)
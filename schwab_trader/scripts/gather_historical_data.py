@@ -5,6 +5,7 @@ import pandas as pd
 from datetime import datetime, timedelta
 from flask import Flask
 from schwab_trader.services.data_manager import DataManager
+from schwab_trader.services.historical_sync import HistoricalSync
 from schwab_trader.config import Config
 
 logging.basicConfig(level=logging.INFO)
@@ -76,16 +77,18 @@ def main():
     with app.app_context():
         data_manager = DataManager()
         
-        # Define time periods
-        end_date = datetime.now()
+        # Define time periods; today's bar is not final, so stop at yesterday
+        end_date = datetime.now() - timedelta(days=1)
         start_date = end_date - timedelta(days=20*365)  # 20 years
         
+        # Fetch only the bars the local store does not have yet
+        HistoricalSync(data_manager).sync(symbols, start_date, end_date)
+        
         # Gather and validate data for each symbol
         for symbol in symbols:
             logger.info(f"\nProcessing {symbol}...")
             
-            # Get full historical data
-            logger.info("Fetching full historical data...")
+            # Full history is served from the store
             full_data = data_manager.get_historical_data(symbol, start_date, end_date)
             
             if not validate_data(full_data, symbol):
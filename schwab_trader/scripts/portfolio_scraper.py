@@ -13,6 +13,7 @@ sys.path.insert(0, project_root)
 
 from schwab_trader import create_app
 from schwab_trader.models import db, Portfolio, Position, Sector
+from schwab_trader.services.quote_batcher import alpha_vantage_batcher
 
 # Configure logging
 logging.basicConfig(
@@ -83,6 +84,10 @@ def process_portfolio_data(csv_file='schwab_portfolio.csv'):
             raise ValueError("ALPHA_VANTAGE_API_KEY environment variable not set")
         api = AlphaVantageAPI(api_key)
         
+        # Quote every holding in a few batched requests
+        symbols = [symbol for symbol in df['Symbol'] if symbol not in ['Cash & Cash Investments', 'Account Total']]
+        quotes = alpha_vantage_batcher(api_key).get_many(symbols)
+        
         # Create or get portfolio
         with db.session() as session:
             portfolio = Portfolio.query.filter_by(name='Schwab Portfolio').first()
@@ -109,8 +114,7 @@ def process_portfolio_data(csv_file='schwab_portfolio.csv'):
                         
                     symbol = row['Symbol']
                     
-                    # Get real-time quote
-                    quote = api.get_quote(symbol)
+                    quote = quotes.get(symbol)
                     if not quote:
                         logger.warning(f"Could not get quote for {symbol}")
                         continue
@@ -121,10 +125,10 @@ def process_portfolio_data(csv_file='schwab_portfolio.csv'):
                     
                     # Clean and convert numeric values
                     quantity = float(str(row['Quantity']).replace(',', ''))
-                    price = float(quote['05. price'])
+                    price = quote['price']
                     market_value = quantity * price
-                    day_change = float(quote['09. change'])
-                    day_change_pct = float(quote['10. change percent'].replace('%', ''))
+                    day_change = quote['change'] or 0.0
+                    day_change_pct = quote['change_percent'] or 0.0
                     cost_basis = float(str(row['Cost Basis']).replace('$', '').replace(',', ''))
                     
                     position = Position(
@@ -0,0 +1,458 @@
+"""Real-time evaluation of user alerts against a stream of quote ticks."""
+import logging
+import math
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+import numpy as np
+from schwab_trader.indicators import RSI
+from schwab_trader.services.ohlcv_store import BAR_DTYPE
+from schwab_trader.services.volume_history import VolumeHistory
+from schwab_trader.utils.market_calendar import calendar
+
+logger = logging.getLogger(__name__)
+
+ALERT_TYPES = ('price', 'volume', 'technical', 'percent_change')
+CONDITIONS = ('above', 'below', 'crosses')
+
+# condition_type values of the FastAPI app's models.Alert
+LEGACY_CONDITIONS = {
+    'price_above': ('price', 'above'),
+    'price_below': ('price', 'below'),
+    'percent_change': ('percent_change', 'above')
+}
+
+
+def session_day(at: Optional[datetime] = None) -> date:
+    """Trading day a tick at ``at`` belongs to; naive times are UTC.
+
+    Ticks on weekends and holidays belong to the previous trading day, as
+    the quotes they carry are that day's close.
+    """
+    if at is None:
+        day = calendar.now().date()
+    else:
+        day = (at if at.tzinfo else at.replace(tzinfo=timezone.utc)).astimezone(calendar.timezone).date()
+    return day if calendar.is_trading_day(day) else calendar.previous_trading_day(day)
+
+
+class AlertRule:
+    """Immutable snapshot of an ``Alert`` row, detached from the database session.
+
+    ``value`` is a price for price alerts, a multiple of the volume baseline
+    for volume alerts, an RSI level for technical alerts and an absolute
+    day change in percent for percent_change alerts.
+    """
+
+    __slots__ = ('id', 'user_id', 'symbol', 'alert_type', 'condition', 'value')
+
+    def __init__(self, id: int, symbol: str, alert_type: str, condition: str, value: float,
+                 user_id: Optional[int] = None):
+        if alert_type not in ALERT_TYPES:
+            raise ValueError(f"Unknown alert type: {alert_type}")
+        if condition not in CONDITIONS:
+            raise ValueError(f"Unknown alert condition: {condition}")
+        self.id = id
+        self.user_id = user_id
+        self.symbol = symbol.upper()
+        self.alert_type = alert_type
+        self.condition = condition
+        self.value = float(value)
+
+    @classmethod
+    def from_model(cls, alert) -> 'AlertRule':
+        """Rule for a Flask ``Alert`` or a FastAPI ``models.Alert`` row."""
+        if hasattr(alert, 'condition_type'):
+            if alert.condition_type not in LEGACY_CONDITIONS:
+                raise ValueError(f"Unknown alert condition: {alert.condition_type}")
+            alert_type, condition = LEGACY_CONDITIONS[alert.condition_type]
+            return cls(alert.id, alert.symbol, alert_type, condition, alert.threshold)
+        return cls(alert.id, alert.symbol, alert.alert_type, alert.condition, alert.value, alert.user_id)
+
+    def matches(self, current: float, previous: Optional[float]) -> bool:
+        """Whether the observed metric satisfies the rule.
+
+        ``crosses`` needs the previous observation on the other side of
+        ``value`` (or on it) and the current one past it.
+        """
+        if self.condition == 'above':
+            return current >= self.value
+        if self.condition == 'below':
+            return current <= self.value
+        if previous is None:
+            return False
+        return (previous < self.value <= current) or (previous > self.value >= current)
+
+    def __repr__(self):
+        return f'<AlertRule {self.id} {self.symbol} {self.alert_type} {self.condition} {self.value}>'
+
+
+class TriggeredAlert:
+    """A rule that fired, the metric that fired it and when."""
+
+    __slots__ = ('rule', 'observed', 'triggered_at')
+
+    def __init__(self, rule: AlertRule, observed: float, triggered_at: datetime):
+        self.rule = rule
+        self.observed = observed
+        self.triggered_at = triggered_at
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.rule.id,
+            'user_id': self.rule.user_id,
+            'symbol': self.rule.symbol,
+            'alert_type': self.rule.alert_type,
+            'condition': self.rule.condition,
+            'value': self.rule.value,
+            'observed': self.observed,
+            'triggered_at': self.triggered_at.isoformat()
+        }
+
+
+class PriceThresholdIndex:
+    """Price alerts per symbol, kept in sorted ``(threshold, id)`` lists.
+
+    When the price moves from ``previous`` to ``current``, bisection finds
+    the rules that fire: ``above`` thresholds at or below ``current``,
+    ``below`` thresholds at or above it, and ``crosses`` thresholds between
+    the two prices. Only those rules are visited, whatever the number of
+    alerts on the symbol. Rules are inserted and removed one at a time as
+    alerts are created or deactivated.
+    """
+
+    def __init__(self):
+        self._books: Dict[str, Dict[str, List[Tuple[float, int]]]] = {}
+        self._rules: Dict[int, AlertRule] = {}
+
+    def add(self, rule: AlertRule) -> None:
+        book = self._books.setdefault(rule.symbol, {condition: [] for condition in CONDITIONS})
+        insort(book[rule.condition], (rule.value, rule.id))
+        self._rules[rule.id] = rule
+
+    def remove(self, rule: AlertRule) -> bool:
+        book = self._books.get(rule.symbol)
+        if book is None:
+            return False
+        entries = book[rule.condition]
+        i = bisect_left(entries, (rule.value, rule.id))
+        if i == len(entries) or entries[i] != (rule.value, rule.id):
+            return False
+        del entries[i]
+        del self._rules[rule.id]
+        if not any(book.values()):
+            del self._books[rule.symbol]
+        return True
+
+    def fire(self, symbol: str, previous: Optional[float], current: float) -> List[AlertRule]:
+        """Remove and return the rules triggered by the move from ``previous`` to ``current``."""
+        book = self._books.get(symbol)
+        if book is None:
+            return []
+        fired = []
+
+        above = book['above']
+        end = bisect_right(above, (current, math.inf))
+        fired.extend(above[:end])
+        del above[:end]
+
+        below = book['below']
+        start = bisect_left(below, (current, -math.inf))
+        fired.extend(below[start:])
+        del below[start:]
+
+        crosses = book['crosses']
+        if previous is not None and previous != current:
+            if current > previous:
+                # previous < threshold <= current
+                start = bisect_right(crosses, (previous, math.inf))
+                end = bisect_right(crosses, (current, math.inf))
+            else:
+                # current <= threshold < previous
+                start = bisect_left(crosses, (current, -math.inf))
+                end = bisect_left(crosses, (previous, -math.inf))
+            fired.extend(crosses[start:end])
+            del crosses[start:end]
+
+        if not any(book.values()):
+            del self._books[symbol]
+        return [self._rules.pop(alert_id) for _, alert_id in fired]
+
+    def symbols(self) -> List[str]:
+        return list(self._books)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+
+class _SymbolState:
+    """Last observed metrics for one symbol, for ``crosses`` rules.
+
+    ``rsi_indicator`` holds the RSI over completed daily closes; the
+    current session's price is applied to a copy of it. ``volume`` is the
+    session's latest cumulative volume and ``volume_through`` the date (in
+    nanoseconds) of the last stored bar added to the volume history.
+    """
+
+    __slots__ = ('price', 'volume', 'volume_ratio', 'rsi', 'rsi_indicator', 'session', 'volume_through')
+
+    def __init__(self, rsi_period: int):
+        self.price = None
+        self.volume = None
+        self.volume_ratio = None
+        self.rsi = None
+        self.rsi_indicator = RSI(rsi_period)
+        self.session = None
+        self.volume_through = None
+
+
+class AlertEngine:
+    """Evaluates active alerts as quote ticks arrive.
+
+    A tick is a mapping with ``symbol`` and any of ``price``, ``volume``,
+    ``volume_ratio`` and ``change_percent``. Price rules live in a
+    ``PriceThresholdIndex``, so a tick visits only the price rules it
+    triggers. Other rules are indexed by symbol, so a tick only checks its
+    own symbol's rules. Volume alerts compare ``volume_ratio``, or
+    ``volume`` divided by the symbol's EMA baseline in ``volume_history``;
+    the history gets one print per completed session, from the daily bars
+    in ``store`` when one is given and otherwise from the session's last
+    tick volume.
+    Technical alerts compare a daily RSI: completed sessions contribute
+    their closes, seeded from the daily bars in ``store`` when one is given,
+    and each tick's price is the close of the forming bar. Alerts fire
+    once: a triggered rule leaves the index and waits in ``drain()`` until
+    it is recorded.
+    """
+
+    def __init__(self, volume_history=None, rsi_period: int = 14,
+                 on_trigger: Optional[Callable[[TriggeredAlert], None]] = None,
+                 store=None, seed_bars: int = 250):
+        if volume_history is None and store is not None:
+            volume_history = VolumeHistory()
+        self.volume_history = volume_history
+        self.rsi_period = rsi_period
+        self.on_trigger = on_trigger
+        self.store = store
+        self.seed_bars = seed_bars
+        self._lock = threading.Lock()
+        self._ids: Dict[int, AlertRule] = {}
+        self._prices = PriceThresholdIndex()
+        self._rules: Dict[str, Dict[int, AlertRule]] = {}
+        self._states: Dict[str, _SymbolState] = {}
+        self._triggered: deque = deque()
+        self.stats = {'ticks': 0, 'evaluations': 0, 'triggered': 0}
+
+    def _insert(self, rule: AlertRule) -> None:
+        self._ids[rule.id] = rule
+        if rule.alert_type == 'price':
+            self._prices.add(rule)
+        else:
+            self._rules.setdefault(rule.symbol, {})[rule.id] = rule
+
+    def _discard(self, rule: AlertRule) -> None:
+        del self._ids[rule.id]
+        if rule.alert_type == 'price':
+            self._prices.remove(rule)
+            return
+        rules = self._rules[rule.symbol]
+        del rules[rule.id]
+        if not rules:
+            del self._rules[rule.symbol]
+
+    def add(self, rule: AlertRule) -> None:
+        """Start evaluating a rule, replacing any loaded rule with its id."""
+        with self._lock:
+            existing = self._ids.get(rule.id)
+            if existing is not None:
+                self._discard(existing)
+            self._insert(rule)
+
+    def remove(self, alert_id: int) -> bool:
+        """Stop evaluating an alert; False if it was not loaded."""
+        with self._lock:
+            rule = self._ids.get(alert_id)
+            if rule is None:
+                return False
+            self._discard(rule)
+            return True
+
+    def load(self, alerts: Iterable) -> int:
+        """Sync the loaded rules with ``alerts`` (``Alert`` rows or ``AlertRule``s).
+
+        The indexes are updated incrementally: rules missing from ``alerts``
+        (deactivated or triggered) are removed, new or edited ones inserted,
+        and unchanged ones left alone. Symbol state such as the last price
+        and the RSI is kept, so reloading does not break ``crosses`` rules.
+        """
+        rules = {}
+        for alert in alerts:
+            try:
+                rule = alert if isinstance(alert, AlertRule) else AlertRule.from_model(alert)
+            except ValueError as e:
+                logger.warning(f"Skipping alert {getattr(alert, 'id', None)}: {str(e)}")
+                continue
+            rules[rule.id] = rule
+        with self._lock:
+            for alert_id, loaded in list(self._ids.items()):
+                rule = rules.get(alert_id)
+                if rule is None or self._key(rule) != self._key(loaded):
+                    self._discard(loaded)
+            for alert_id, rule in rules.items():
+                if alert_id not in self._ids:
+                    self._insert(rule)
+            return len(self._ids)
+
+    @staticmethod
+    def _key(rule: AlertRule) -> Tuple:
+        return (rule.symbol, rule.alert_type, rule.condition, rule.value)
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one loaded rule."""
+        with self._lock:
+            return list(dict.fromkeys(self._prices.symbols() + list(self._rules)))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids)
+
+    def _stored_bars(self, symbol: str, day: date) -> np.ndarray:
+        """Stored daily bars before ``day``, as many as the RSI and volume history can use."""
+        count = max(self.seed_bars, self.volume_history.capacity if self.volume_history is not None else 0)
+        try:
+            return np.array(self.store.bars(symbol, end_date=day - timedelta(days=1))[-count:])
+        except Exception as e:
+            logger.warning(f"Could not read stored bars for {symbol}: {str(e)}")
+            return np.empty(0, dtype=BAR_DTYPE)
+
+    def _start_session(self, symbol: str, state: _SymbolState, day: date) -> None:
+        """Fold the finished session into the daily RSI and the volume history.
+
+        With a store the RSI is rebuilt from the stored closes, plus the
+        last price seen in the finished session if the store has no bar
+        for it yet. Stored volumes seed a symbol missing from the volume
+        history, and later sessions add the bars stored since.
+        """
+        finished = state.session is not None
+        if self.store is None:
+            if finished and state.price is not None:
+                state.rsi_indicator.update(state.price)
+            if finished and state.volume is not None and self.volume_history is not None:
+                self.volume_history.append(symbol, state.volume)
+        else:
+            bars = self._stored_bars(symbol, day)
+            indicator = RSI(self.rsi_period)
+            for close in bars['Close'][-self.seed_bars:]:
+                indicator.update(float(close))
+            stored_through = (
+                np.datetime64(int(bars['date'][-1]), 'ns').astype('datetime64[D]').item() if len(bars) else None
+            )
+            if finished and state.price is not None and (stored_through is None or stored_through < state.session):
+                indicator.update(state.price)
+            state.rsi_indicator = indicator
+
+            if self.volume_history is not None and len(bars):
+                if symbol not in self.volume_history:
+                    new = bars
+                elif state.volume_through is not None:
+                    new = bars[bars['date'] > state.volume_through]
+                else:
+                    new = bars[:0]
+                for volume in new['Volume']:
+                    self.volume_history.append(symbol, float(volume))
+                if len(new):
+                    state.volume_through = int(bars['date'][-1])
+        state.session = day
+        state.volume = None
+
+    def _volume_ratio(self, symbol: str, tick: Mapping) -> Optional[float]:
+        ratio = tick.get('volume_ratio')
+        if ratio is not None:
+            return float(ratio)
+        volume = tick.get('volume')
+        if volume is None or self.volume_history is None or symbol not in self.volume_history:
+            return None
+        baseline = self.volume_history.ema(symbol)
+        return float(volume) / baseline if baseline > 0 else None
+
+    def process(self, tick: Mapping, at: Optional[datetime] = None) -> List[TriggeredAlert]:
+        """Evaluate one tick against its symbol's rules and return those that fired."""
+        symbol = str(tick['symbol']).upper()
+        price = tick.get('price')
+        price = None if price is None or math.isnan(price) else float(price)
+        change_percent = tick.get('change_percent')
+        day = session_day(at)
+
+        with self._lock:
+            self.stats['ticks'] += 1
+            state = self._states.get(symbol)
+            if state is None:
+                state = self._states[symbol] = _SymbolState(self.rsi_period)
+            if state.session != day:
+                self._start_session(symbol, state, day)
+            rules = self._rules.get(symbol)
+            technical = price is not None and rules and any(
+                rule.alert_type == 'technical' for rule in rules.values()
+            )
+            rsi = state.rsi_indicator.copy().update(price) if technical else float('nan')
+            triggered_at = at or datetime.utcnow()
+            fired = []
+
+            if price is not None:
+                for rule in self._prices.fire(symbol, state.price, price):
+                    del self._ids[rule.id]
+                    fired.append(TriggeredAlert(rule, price, triggered_at))
+                self.stats['evaluations'] += len(fired)
+
+            if rules:
+                metrics = {
+                    'volume': (self._volume_ratio(symbol, tick), state.volume_ratio),
+                    'technical': (rsi if rsi == rsi else None, state.rsi),
+                    'percent_change': (abs(float(change_percent)) if change_percent is not None else None, None)
+                }
+                for rule in list(rules.values()):
+                    current, previous = metrics[rule.alert_type]
+                    if current is None:
+                        continue
+                    self.stats['evaluations'] += 1
+                    if rule.matches(current, previous):
+                        self._discard(rule)
+                        fired.append(TriggeredAlert(rule, current, triggered_at))
+                if metrics['volume'][0] is not None:
+                    state.volume_ratio = metrics['volume'][0]
+
+            if price is not None:
+                state.price = price
+            if tick.get('volume') is not None:
+                state.volume = float(tick['volume'])
+            if rsi == rsi:
+                state.rsi = rsi
+            self.stats['triggered'] += len(fired)
+            self._triggered.extend(fired)
+
+        for triggered in fired:
+            logger.info(f"Alert {triggered.rule.id} triggered: {triggered.rule.symbol} {triggered.rule.alert_type} "
+                        f"{triggered.rule.condition} {triggered.rule.value} (observed {triggered.observed:.4g})")
+            if self.on_trigger:
+                self.on_trigger(triggered)
+        return fired
+
+    def process_many(self, ticks: Iterable[Mapping]) -> List[TriggeredAlert]:
+        fired = []
+        for tick in ticks:
+            fired.extend(self.process(tick))
+        return fired
+
+    def drain(self) -> List[TriggeredAlert]:
+        """Triggered alerts not yet handed out, oldest first."""
+        with self._lock:
+            triggered = list(self._triggered)
+            self._triggered.clear()
+        return triggered
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats, rules=len(self._ids),
+                        symbols=len(set(self._prices.symbols()) | set(self._rules)))
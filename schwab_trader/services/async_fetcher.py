@@ -0,0 +1,288 @@
+"""Concurrent historical bar fetching across providers with per-provider rate budgets."""
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import aiohttp
+import pandas as pd
+from schwab_trader.utils.circuit_breaker import get_breaker
+from schwab_trader.utils.error_utils import APIError, RateLimitError
+from schwab_trader.utils.single_flight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+# A job is (symbol, start_date, end_date) with inclusive dates
+Job = Tuple[str, Any, Any]
+
+
+def _frame(index, open_, high, low, close, volume) -> pd.DataFrame:
+    """Build a sorted OHLCV frame on a naive, day-normalized DatetimeIndex."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    data = pd.DataFrame(
+        {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+        index=index.normalize(),
+        dtype=float
+    )
+    return data[~data.index.duplicated(keep='last')].sort_index()
+
+
+class TokenBucket:
+    """Async token bucket allowing ``rate`` requests per ``per`` seconds.
+
+    ``capacity`` (default ``rate``) bounds the burst after an idle period.
+    Waiters are served in arrival order. The budget carries over between
+    event loops, so consecutive ``asyncio.run`` batches share it.
+    """
+
+    def __init__(self, rate: float, per: float = 1.0, capacity: Optional[float] = None):
+        self.rate = rate / per
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = None
+        self._loop = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class Provider(ABC):
+    """One data provider: its request budget and how to ask it for daily bars."""
+
+    name = 'provider'
+
+    def __init__(self, rate: float, per: float = 1.0, max_concurrency: int = 8):
+        self.rate = rate
+        self.per = per
+        self.max_concurrency = max_concurrency
+
+    @abstractmethod
+    def request(self, symbol: str, start: datetime, end: datetime) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        """Return ``(url, params, headers)`` for one history request."""
+        pass
+
+    @abstractmethod
+    def parse(self, payload: Dict[str, Any]) -> pd.DataFrame:
+        """Convert a JSON response to an OHLCV frame; raise on provider errors."""
+        pass
+
+
+class AlphaVantageProvider(Provider):
+    """Alpha Vantage ``TIME_SERIES_DAILY``; the free tier allows 5 requests a minute."""
+
+    name = 'alpha_vantage'
+    BASE_URL = 'https://www.alphavantage.co/query'
+
+    def __init__(self, api_key: str, base_url: str = BASE_URL, rate: float = 5, per: float = 60.0,
+                 max_concurrency: int = 5):
+        super().__init__(rate, per, max_concurrency)
+        self.api_key = api_key
+        self.base_url = base_url
+
+    def request(self, symbol, start, end):
+        # Compact responses hold the latest 100 bars
+        compact = start >= datetime.now() - timedelta(days=140)
+        return self.base_url, {
+            'function': 'TIME_SERIES_DAILY',
+            'symbol': symbol,
+            'outputsize': 'compact' if compact else 'full',
+            'apikey': self.api_key
+        }, {}
+
+    def parse(self, payload):
+        if 'Error Message' in payload:
+            raise APIError(payload['Error Message'])
+        if 'Note' in payload or 'Information' in payload:
+            raise RateLimitError(payload.get('Note') or payload['Information'])
+        series = payload.get('Time Series (Daily)', {})
+        dates = list(series)
+        values = [series[date] for date in dates]
+        return _frame(
+            pd.to_datetime(dates),
+            *([float(bar[key]) for bar in values] for key in ('1. open', '2. high', '3. low', '4. close', '5. volume'))
+        )
+
+
+class SchwabProvider(Provider):
+    """Schwab market data ``pricehistory``."""
+
+    name = 'schwab'
+    BASE_URL = 'https://api.schwabapi.com/marketdata/v1'
+
+    def __init__(self, token: str, base_url: str = BASE_URL, rate: float = 120, per: float = 60.0,
+                 max_concurrency: int = 16):
+        super().__init__(rate, per, max_concurrency)
+        self.token = token
+        self.base_url = base_url
+
+    def request(self, symbol, start, end):
+        return f"{self.base_url}/pricehistory", {
+            'symbol': symbol,
+            'periodType': 'year',
+            'frequencyType': 'daily',
+            'frequency': 1,
+            'startDate': int(pd.Timestamp(start).timestamp() * 1000),
+            'endDate': int(pd.Timestamp(end + timedelta(days=1)).timestamp() * 1000),
+            'needExtendedHoursData': 'false'
+        }, {
+            'Authorization': f'Bearer {self.token}',
+            'Accept': 'application/json'
+        }
+
+    def parse(self, payload):
+        if 'errors' in payload:
+            raise APIError(str(payload['errors']))
+        candles = payload.get('candles', [])
+        return _frame(
+            pd.to_datetime([candle['datetime'] for candle in candles], unit='ms'),
+            *([float(candle[key]) for candle in candles] for key in ('open', 'high', 'low', 'close', 'volume'))
+        )
+
+
+class YahooProvider(Provider):
+    """Yahoo Finance chart API, the endpoint behind ``yfinance``."""
+
+    name = 'yfinance'
+    BASE_URL = 'https://query1.finance.yahoo.com/v8/finance/chart'
+
+    def __init__(self, base_url: str = BASE_URL, rate: float = 2, per: float = 1.0, max_concurrency: int = 8):
+        super().__init__(rate, per, max_concurrency)
+        self.base_url = base_url
+
+    def request(self, symbol, start, end):
+        return f"{self.base_url}/{symbol}", {
+            'period1': int(pd.Timestamp(start).timestamp()),
+            'period2': int(pd.Timestamp(end + timedelta(days=1)).timestamp()),
+            'interval': '1d',
+            'events': 'div,splits'
+        }, {'User-Agent': 'Mozilla/5.0'}
+
+    def parse(self, payload):
+        chart = payload.get('chart', {})
+        if chart.get('error'):
+            raise APIError(str(chart['error']))
+        results = chart.get('result') or []
+        if not results or not results[0].get('timestamp'):
+            return _frame([], [], [], [], [], [])
+        result = results[0]
+        quote = result['indicators']['quote'][0]
+        data = _frame(
+            pd.to_datetime(result['timestamp'], unit='s'),
+            *(quote[key] for key in ('open', 'high', 'low', 'close', 'volume'))
+        )
+        return data.dropna(subset=['Close'])
+
+
+class AsyncFetcher:
+    """Runs batches of history jobs concurrently within each provider's budget.
+
+    Jobs try providers in order and fall back to the next one on errors or
+    empty responses; providers whose shared circuit breaker is open are
+    skipped. All requests share one pooled ``aiohttp`` session, and identical
+    jobs in flight at the same time, within a batch or across concurrent
+    ``fetch_all`` calls, are fetched once.
+    Each provider has a token bucket for its request rate and a semaphore
+    bounding its in-flight requests, so a slow budget such as Alpha
+    Vantage's only delays the jobs that end up waiting on it.
+    """
+
+    def __init__(self, providers: List[Provider], max_connections: int = 32, timeout: float = 30.0,
+                 retries: int = 2, retry_delay: float = 1.0):
+        if not providers:
+            raise ValueError("At least one provider is required")
+        self.providers = providers
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.buckets = {provider.name: TokenBucket(provider.rate, provider.per) for provider in providers}
+        self.stats = {provider.name: {'requests': 0, 'failures': 0} for provider in providers}
+        self._flight = AsyncSingleFlight()
+
+    async def fetch_all(self, jobs: Iterable[Job]) -> Dict[Job, Optional[pd.DataFrame]]:
+        """Fetch every job; failed jobs map to None."""
+        jobs = list(jobs)
+        self._slots = {provider.name: asyncio.Semaphore(provider.max_concurrency) for provider in self.providers}
+
+        connector = aiohttp.TCPConnector(limit=self.max_connections)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            results = await asyncio.gather(*(self._flight.do(job, self._fetch_job, session, job) for job in jobs))
+        return dict(zip(jobs, results))
+
+    def fetch(self, jobs: Iterable[Job]) -> Dict[Job, Optional[pd.DataFrame]]:
+        """Blocking wrapper around ``fetch_all`` for synchronous callers."""
+        return asyncio.run(self.fetch_all(jobs))
+
+    async def _fetch_job(self, session: aiohttp.ClientSession, job: Job) -> Optional[pd.DataFrame]:
+        symbol, start_date, end_date = job
+        start = pd.Timestamp(start_date).to_pydatetime()
+        end = pd.Timestamp(end_date).to_pydatetime()
+
+        for provider in self.providers:
+            breaker = get_breaker(provider.name)
+            if not breaker.allow_request():
+                continue
+            try:
+                data = await self._fetch_from(session, provider, symbol, start, end)
+            except Exception as e:
+                if breaker.is_failure(e):
+                    breaker.record_failure(e)
+                else:
+                    breaker.release()
+                self.stats[provider.name]['failures'] += 1
+                logger.warning(f"{provider.name} failed for {symbol}: {getattr(e, 'message', None) or str(e)}")
+                continue
+            breaker.record_success()
+            data = data[(data.index >= pd.Timestamp(start.date())) & (data.index <= pd.Timestamp(end.date()))]
+            if not data.empty:
+                return data
+
+        logger.error(f"Could not retrieve {symbol} {start.date()} to {end.date()} from any provider")
+        return None
+
+    async def _fetch_from(self, session, provider: Provider, symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
+        """One provider request with retries on rate limiting and server errors."""
+        url, params, headers = provider.request(symbol, start, end)
+        for attempt in range(self.retries + 1):
+            await self.buckets[provider.name].acquire()
+            async with self._slots[provider.name]:
+                self.stats[provider.name]['requests'] += 1
+                async with session.get(url, params=params, headers=headers) as response:
+                    status = response.status
+                    if status == 429 or status >= 500:
+                        payload = None
+                    else:
+                        response.raise_for_status()
+                        payload = await response.json(content_type=None)
+
+            if status == 429:
+                error = RateLimitError(f"{provider.name} returned HTTP 429")
+            elif payload is None:
+                error = APIError(f"{provider.name} returned HTTP {status}")
+            else:
+                try:
+                    return provider.parse(payload)
+                except RateLimitError as e:
+                    error = e
+            if attempt == self.retries:
+                raise error
+            await asyncio.sleep(self.retry_delay * 2 ** attempt)
@@ -4,19 +4,40 @@ import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 from flask import current_app
+from typing import Optional
 from schwab_trader.services.schwab_api import SchwabAPI
+from schwab_trader.services.ohlcv_store import OHLCVStore, covered_through
+from schwab_trader.services.fallback_policy import FallbackPolicy
 from alpha_vantage.timeseries import TimeSeries
-from schwab_trader.utils.api_utils import retry_on_failure, cache_response, handle_api_error
+from schwab_trader.utils.api_utils import cache_response, handle_api_error
+from schwab_trader.utils.circuit_breaker import OPEN, get_breaker
+from schwab_trader.utils.error_utils import RateLimitError
+from schwab_trader.utils.single_flight import default_group
 
 logger = logging.getLogger(__name__)
 
+SOURCES = ('schwab', 'alpha_vantage', 'yfinance')
+
+# Lookback periods accepted by SchwabAPI.get_historical_prices, in days
+SCHWAB_PERIODS = (('1m', 30), ('3m', 90), ('6m', 180), ('1y', 365), ('2y', 730), ('5y', 1825))
+
+# Providers whose client already calls through their breaker; wrapping them
+# again would let the outer call take the half-open trial and the inner one
+# reject it, so the circuit could never close.
+SELF_GUARDED = {'schwab'}
+
+# Shared by every DataManager so provider statistics survive across requests
+default_fallback_policy = FallbackPolicy(hedge_delay=1.5)
+
 class DataManager:
     """Manages data retrieval from multiple sources with fallbacks."""
     
-    def __init__(self):
-        """Initialize data sources."""
+    def __init__(self, store: Optional[OHLCVStore] = None, fallback: Optional[FallbackPolicy] = None):
+        """Initialize data sources, the local bar store and the provider fallback policy."""
         self.schwab_api = None
         self.alpha_vantage = None
+        self.store = store if store is not None else OHLCVStore()
+        self.fallback = fallback if fallback is not None else default_fallback_policy
         
         try:
             self.schwab_api = SchwabAPI()
@@ -31,55 +52,136 @@ class DataManager:
                 )
         except Exception as e:
             logger.warning(f"Could not initialize Alpha Vantage: {str(e)}")
-        
-        self.data_cache = {}
     
-    @retry_on_failure(max_retries=3, delay=1, backoff=2)
-    @handle_api_error
     def get_historical_data(self, symbol: str, start_date: datetime, end_date: datetime, source: str = 'auto') -> pd.DataFrame:
-        """Get historical data from preferred source with fallbacks."""
-        data = None
+        """Get daily OHLCV bars, serving stored ranges locally.
+
+        Only the parts of the range that were never fetched go to the
+        providers. Today's bar is still forming, so it is returned but not
+        counted as fetched, and a response missing trading days at its end
+        only counts as fetched through its last bar.
+        """
+        yesterday = (datetime.now() - timedelta(days=1)).date()
+        for gap_start, gap_end in self.store.missing_ranges(symbol, start_date, end_date):
+            fetched = self.fetch_bars(symbol, gap_start, gap_end, source)
+            if fetched is None:
+                continue
+            if gap_start <= yesterday:
+                settled = fetched[fetched.index.date <= yesterday]
+                # Coverage only reaches the last settled bar, unless no trading day follows it
+                covered_end = covered_through(settled, min(gap_end, yesterday))
+                if covered_end is not None:
+                    self.store.write(symbol, settled, gap_start, covered_end)
+            if gap_end > yesterday:
+                # Serve the forming bar without persisting it
+                live = fetched[fetched.index.date > yesterday]
+                stored = self.store.load(symbol, start_date, end_date)
+                return self._combine(stored, live)
         
-        # Try sources in order of preference
-        if source == 'auto':
-            sources = ['schwab', 'alpha_vantage', 'yfinance']
-        else:
-            sources = [source]
+        data = self.store.load(symbol, start_date, end_date)
+        if data.empty:
+            logger.error(f"Could not retrieve data for {symbol} from any source")
+            return None
+        return data
+    
+    def fetch_bars(self, symbol: str, start_date, end_date, source: str = 'auto') -> Optional[pd.DataFrame]:
+        """Fetch ``[start_date, end_date]`` from the providers as normalized OHLCV bars, bypassing the store.
+
+        Concurrent requests for the same symbol, range and source share one
+        upstream fetch; the returned frame is shared, so copy before mutating.
+        """
+        start = pd.Timestamp(start_date).to_pydatetime()
+        end = pd.Timestamp(end_date).to_pydatetime()
+        key = ('bars', symbol.upper(), start.date(), end.date(), source)
+        return default_group.do(key, self._fetch_bars, symbol, start, end, source)
+    
+    def _fetch_bars(self, symbol: str, start_date: datetime, end_date: datetime, source: str) -> Optional[pd.DataFrame]:
+        fetched = self._fetch_historical_data(symbol, start_date, end_date, source)
+        if fetched is None:
+            return None
+        return self._normalize_ohlcv(fetched)
+    
+    def _combine(self, stored: pd.DataFrame, live: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Append provisional bars to stored ones."""
+        data = pd.concat([stored, live]) if not live.empty else stored
+        return data if not data.empty else None
+    
+    def _normalize_ohlcv(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Map provider columns to Open/High/Low/Close/Volume on a sorted, naive DatetimeIndex."""
+        data = data.copy()
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
         
-        for source in sources:
-            try:
-                if source == 'schwab' and self.schwab_api:
-                    data = self._get_schwab_data(symbol, start_date, end_date)
-                elif source == 'alpha_vantage' and self.alpha_vantage:
-                    data = self._get_alpha_vantage_data(symbol, start_date, end_date)
-                elif source == 'yfinance':
-                    data = self._get_yfinance_data(symbol, start_date, end_date)
-                
-                if data is not None and not data.empty:
-                    logger.info(f"Successfully retrieved data for {symbol} from {source}")
+        renamed = {}
+        for column in data.columns:
+            # Alpha Vantage uses names like '4. close'
+            name = str(column).split('. ')[-1].strip().lower()
+            if name in ('open', 'high', 'low', 'close', 'volume') and name.capitalize() not in renamed.values():
+                renamed[column] = name.capitalize()
+        data = data.rename(columns=renamed)
+        
+        if not isinstance(data.index, pd.DatetimeIndex):
+            for column in ('datetime', 'date', 'Date'):
+                if column in data.columns:
+                    unit = 'ms' if column == 'datetime' else None
+                    data.index = pd.to_datetime(data.pop(column), unit=unit)
                     break
-            except Exception as e:
-                logger.warning(f"Failed to get data from {source} for {symbol}: {str(e)}")
-                continue
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        data.index = index.normalize()
+        return data[['Open', 'High', 'Low', 'Close', 'Volume']].sort_index()
+    
+    @handle_api_error
+    def _fetch_historical_data(self, symbol: str, start_date: datetime, end_date: datetime, source: str = 'auto') -> pd.DataFrame:
+        """Get historical data from the providers through the fallback policy.
+
+        With ``source='auto'`` every configured provider takes part, ordered
+        and hedged by ``self.fallback``; otherwise only ``source`` is asked.
+        Providers whose circuit breaker is open are skipped without a call;
+        the others run through their breaker exactly once.
+        """
+        fetchers = {
+            'schwab': (self.schwab_api, self._get_schwab_data),
+            'alpha_vantage': (self.alpha_vantage, self._get_alpha_vantage_data),
+            'yfinance': (True, self._get_yfinance_data)
+        }
+        sources = SOURCES if source == 'auto' else (source,)
+        calls = [
+            (name, lambda name=name, fetch=fetchers[name][1]: (
+                fetch(symbol, start_date, end_date) if name in SELF_GUARDED
+                else get_breaker(name).call(fetch, symbol, start_date, end_date)
+            ))
+            for name in sources
+            if name in fetchers and fetchers[name][0] and get_breaker(name).state != OPEN
+        ]
         
-        if data is None or data.empty:
+        name, data = self.fallback.run(calls)
+        if data is None:
             logger.error(f"Could not retrieve data for {symbol} from any source")
             return None
         
+        logger.info(f"Successfully retrieved data for {symbol} from {name}")
         return data
     
     def _get_schwab_data(self, symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
-        """Get data from Schwab API."""
-        try:
-            response = self.schwab_api.get_historical_prices(
-                symbol,
-                start_date=start_date,
-                end_date=end_date
-            )
-            return pd.DataFrame(response)
-        except Exception as e:
-            logger.warning(f"Schwab API failed: {str(e)}")
+        """Get data from Schwab API.
+
+        Schwab history is requested as a lookback period ending today, so the
+        shortest period reaching back to ``start_date`` is asked for and the
+        candles are cut to the range. Ranges starting more than five years
+        ago are left to the other providers.
+        """
+        days = (datetime.now() - start_date).days
+        period = next((name for name, length in SCHWAB_PERIODS if length >= days), None)
+        if period is None:
+            return None
+        
+        response = self.schwab_api.get_historical_prices(symbol, period=period)
+        candles = pd.DataFrame((response or {}).get('candles', []))
+        if candles.empty:
             return None
+        return self._normalize_ohlcv(candles)[start_date:end_date]
     
     def _get_alpha_vantage_data(self, symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """Get data from Alpha Vantage."""
@@ -88,25 +190,22 @@ class DataManager:
                 symbol=symbol,
                 outputsize='full'
             )
-            data = data[start_date:end_date]
-            return data
-        except Exception as e:
-            logger.warning(f"Alpha Vantage API failed: {str(e)}")
-            return None
+        except ValueError as e:
+            # The client reports rate limiting as a ValueError with the API's note
+            if 'call frequency' in str(e) or 'rate limit' in str(e).lower():
+                raise RateLimitError(str(e))
+            raise
+        return data[start_date:end_date]
     
     def _get_yfinance_data(self, symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """Get data from Yahoo Finance."""
-        try:
-            data = yf.download(
-                symbol,
-                start=start_date,
-                end=end_date,
-                progress=False
-            )
-            return data
-        except Exception as e:
-            logger.warning(f"Yahoo Finance failed: {str(e)}")
-            return None
+        # yfinance treats the end date as exclusive
+        return yf.download(
+            symbol,
+            start=start_date,
+            end=pd.Timestamp(end_date) + timedelta(days=1),
+            progress=False
+        )
     
     def analyze_market_periods(self, symbols: list, years: int = 20) -> dict:
         """Analyze market periods for given symbols."""
@@ -1,7 +1,8 @@
 import requests
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from schwab_trader.utils.error_utils import APIError, NetworkError, ValidationError
+from schwab_trader.utils.circuit_breaker import get_breaker
+from schwab_trader.utils.error_utils import APIError, NetworkError, RateLimitError, ValidationError
 from schwab_trader.utils.logging_utils import get_logger
 
 logger = get_logger(__name__)
@@ -13,22 +14,22 @@ class DataService:
         self.base_url = "https://www.alphavantage.co/query"
         
     def _make_request(self, function: str, params: Dict) -> Dict:
-        """Make a request to the Alpha Vantage API."""
+        """Make a request to the Alpha Vantage API.
+        
+        Requests go through the shared ``alpha_vantage`` circuit breaker, so
+        while Alpha Vantage is rate limiting or down this raises
+        ``CircuitOpenError`` at once instead of calling it.
+        """
         try:
             params.update({
                 'apikey': self.api_key,
                 'function': function
             })
             
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = get_breaker('alpha_vantage').call(self._get, params)
             
             if "Error Message" in data:
                 raise APIError(data["Error Message"])
-            if "Note" in data:
-                logger.warning(f"API Rate Limit Note: {data['Note']}")
             
             return data
             
@@ -37,6 +38,20 @@ class DataService:
         except ValueError as e:
             raise ValidationError(f"Invalid API response: {str(e)}")
     
+    def _get(self, params: Dict) -> Dict:
+        """Send one request; rate-limit notices are raised as ``RateLimitError``."""
+        response = requests.get(self.base_url, params=params)
+        response.raise_for_status()
+        
+        data = response.json()
+        
+        note = data.get("Note") or data.get("Information")
+        if note:
+            logger.warning(f"API Rate Limit Note: {note}")
+            raise RateLimitError(note)
+        
+        return data
+    
     def get_stock_quote(self, symbol: str) -> Dict:
         """Get real-time stock quote."""
         params = {
@@ -0,0 +1,193 @@
+"""Hedged, adaptively ordered fallback across data providers."""
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from flask import copy_current_request_context, current_app, has_app_context, has_request_context
+
+logger = logging.getLogger(__name__)
+
+
+def is_valid_result(result: Any) -> bool:
+    """Default validity check: not None and, for frames and sequences, not empty."""
+    if result is None:
+        return False
+    empty = getattr(result, 'empty', None)
+    if empty is not None:
+        return not empty
+    try:
+        return len(result) > 0
+    except TypeError:
+        return True
+
+
+def bind_context(func: Callable[[], Any]) -> Callable[[], Any]:
+    """Carry the caller's Flask request (or app) context into a worker thread.
+
+    Providers such as Schwab read the OAuth token from the session, which a
+    pool thread cannot see on its own.
+    """
+    if has_request_context():
+        return copy_current_request_context(func)
+    if has_app_context():
+        app = current_app._get_current_object()
+
+        @wraps(func)
+        def call():
+            with app.app_context():
+                return func()
+        return call
+    return func
+
+
+class ProviderStats:
+    """Exponentially weighted latency and error rate of one provider."""
+
+    __slots__ = ('latency', 'error_rate', 'calls')
+
+    def __init__(self):
+        self.latency = None
+        self.error_rate = 0.0
+        self.calls = 0
+
+    def record(self, latency: float, ok: bool, alpha: float) -> None:
+        self.calls += 1
+        self.latency = latency if self.latency is None else self.latency + alpha * (latency - self.latency)
+        self.error_rate += alpha * ((0.0 if ok else 1.0) - self.error_rate)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'latency': self.latency, 'error_rate': self.error_rate, 'calls': self.calls}
+
+
+class FallbackPolicy:
+    """Runs provider calls with hedging and learns which providers to try first.
+
+    The first provider is called and, if it has not produced a valid result
+    within ``hedge_delay`` seconds, the next one is started as well; a
+    failure starts the next one immediately. The first valid result wins and
+    slower calls are left to finish in the background, still feeding the
+    statistics. With ``hedge_delay=None`` providers run strictly one after
+    another. Calls see the caller's Flask request context.
+
+    Providers are ordered by expected cost, the latency EWMA plus
+    ``error_penalty`` seconds weighted by the error-rate EWMA. Providers
+    without history cost nothing, so each is tried at least once; ties keep
+    the configured order.
+    """
+
+    def __init__(self, hedge_delay: Optional[float] = 1.0, timeout: float = 30.0, alpha: float = 0.2,
+                 error_penalty: float = 10.0, adaptive: bool = True, max_workers: int = 8,
+                 is_valid: Callable[[Any], bool] = is_valid_result):
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.alpha = alpha
+        self.error_penalty = error_penalty
+        self.adaptive = adaptive
+        self.max_workers = max_workers
+        self.is_valid = is_valid
+        self._stats: Dict[str, ProviderStats] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='provider'
+                )
+            return self._executor
+
+    def cost(self, name: str) -> float:
+        """Expected seconds to a valid result from ``name``."""
+        stats = self._stats.get(name)
+        if stats is None or stats.latency is None:
+            return 0.0
+        return stats.latency + self.error_penalty * stats.error_rate
+
+    def order(self, names: Sequence[str]) -> List[str]:
+        """Providers in the order they should be tried."""
+        if not self.adaptive:
+            return list(names)
+        with self._lock:
+            return sorted(names, key=self.cost)
+
+    def record(self, name: str, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._stats.setdefault(name, ProviderStats()).record(latency, ok, self.alpha)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of every provider's statistics."""
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+    def _call(self, name: str, func: Callable[[], Any]) -> Any:
+        """Run one provider call and record how it went."""
+        start = time.monotonic()
+        try:
+            result = func()
+        except Exception:
+            self.record(name, time.monotonic() - start, False)
+            raise
+        self.record(name, time.monotonic() - start, self.is_valid(result))
+        return result
+
+    def run(self, calls: Sequence[Tuple[str, Callable[[], Any]]]) -> Tuple[Optional[str], Any]:
+        """Run ``(name, func)`` provider calls and return ``(name, result)`` of the first valid one.
+
+        Returns ``(None, None)`` when every provider fails or ``timeout``
+        passes first.
+        """
+        funcs = dict(calls)
+        queue = self.order([name for name, _ in calls])
+        if not queue:
+            return None, None
+        if self.hedge_delay is None:
+            return self._run_sequential(queue, funcs)
+        funcs = {name: bind_context(func) for name, func in funcs.items()}
+
+        pool = self._pool()
+        deadline = time.monotonic() + self.timeout
+        pending = {}
+
+        def launch():
+            name = queue.pop(0)
+            pending[pool.submit(self._call, name, funcs[name])] = name
+
+        launch()
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = min(self.hedge_delay, remaining) if queue else remaining
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"Provider {name} failed: {str(e)}")
+                    continue
+                if self.is_valid(result):
+                    return name, result
+
+            # Either the hedge delay passed or a provider failed
+            if queue:
+                launch()
+
+        logger.error(f"No valid result from providers {[name for name, _ in calls]}")
+        return None, None
+
+    def _run_sequential(self, queue: List[str], funcs: Dict[str, Callable[[], Any]]) -> Tuple[Optional[str], Any]:
+        for name in queue:
+            try:
+                result = self._call(name, funcs[name])
+            except Exception as e:
+                logger.warning(f"Provider {name} failed: {str(e)}")
+                continue
+            if self.is_valid(result):
+                return name, result
+        return None, None
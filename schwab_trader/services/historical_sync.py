@@ -0,0 +1,214 @@
+"""Incremental synchronization of daily bars into the local OHLCV store."""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from schwab_trader.services.data_manager import DataManager
+from schwab_trader.services.ohlcv_store import OHLCVStore, covered_through
+from schwab_trader.utils.market_calendar import calendar
+
+logger = logging.getLogger(__name__)
+
+Range = Tuple[date, date]
+
+
+def _business_days(start: date, end: date) -> int:
+    """NYSE trading days in ``[start, end]``."""
+    if end < start:
+        return 0
+    return int(np.busday_count(start, end + timedelta(days=1), holidays=calendar.holidays_between(start, end)))
+
+
+class HistoricalSync:
+    """Brings stored histories up to date with as few provider requests as possible.
+
+    For each symbol the sync requests only:
+
+    - bars after the stored coverage (normally just the days since the last run),
+    - bars before it when an earlier start date is asked for, and
+    - holes inside it: trading days without a stored bar, e.g. left by a
+      fetch that failed part way.
+
+    Ranges without trading days, such as weekends and holidays, are marked
+    covered without a request. A fetch only advances the coverage to its
+    last bar when trading days after it are missing, so a lagging or
+    truncated response is completed by the next sync. Holes the providers
+    return nothing for are recorded so they are not requested again.
+    Everything fetched for a symbol is merged into the store in one write.
+    ``sync`` can hand the requests for a whole universe to an
+    ``AsyncFetcher`` instead of making them one symbol at a time.
+    """
+
+    def __init__(self, data_manager: Optional[DataManager] = None, store: Optional[OHLCVStore] = None,
+                 max_workers: int = 8):
+        self.data_manager = data_manager if data_manager is not None else DataManager(store=store)
+        self.store = self.data_manager.store
+        self.max_workers = max_workers
+
+    def find_holes(self, symbol: str, start_date=None, end_date=None) -> List[Range]:
+        """Ranges inside the coverage holding trading days without a stored bar.
+
+        Ranges within a known gap, which providers have no bars for, are
+        left out.
+        """
+        covered = self.store.coverage(symbol)
+        if covered is None:
+            return []
+        first = max(covered[0], pd.Timestamp(start_date).date()) if start_date is not None else covered[0]
+        last = min(covered[1], pd.Timestamp(end_date).date()) if end_date is not None else covered[1]
+        if last < first:
+            return []
+
+        # The days just outside the range act as bars so its edges are checked too
+        dates = self.store.bars(symbol, first, last)['date'].astype('datetime64[ns]').astype('datetime64[D]')
+        bounds = np.concatenate([
+            [np.datetime64(first - timedelta(days=1), 'D')],
+            dates,
+            [np.datetime64(last + timedelta(days=1), 'D')]
+        ])
+        missing = np.busday_count(bounds[:-1] + 1, bounds[1:], holidays=calendar.holidays_between(first, last))
+        known = self.store.known_gaps(symbol)
+        holes = []
+        for i in np.nonzero(missing > 0)[0]:
+            hole_start, hole_end = (bounds[i] + 1).astype(object), (bounds[i + 1] - 1).astype(object)
+            if not any(start <= hole_start and hole_end <= end for start, end in known):
+                holes.append((hole_start, hole_end))
+        return holes
+
+    def plan(self, symbol: str, start_date, end_date) -> List[Range]:
+        """Calendar ranges to request for ``symbol``, oldest first."""
+        return sorted(
+            self.store.missing_ranges(symbol, start_date, end_date)
+            + self.find_holes(symbol, start_date, end_date)
+        )
+
+    def sync_symbol(self, symbol: str, start_date, end_date=None, source: str = 'auto') -> Dict[str, Any]:
+        """Fetch whatever ``symbol`` is missing between two dates and store it.
+
+        ``end_date`` defaults to yesterday and is capped there: today's bar
+        is not final until the close.
+
+        Returns:
+            Summary with the number of ``requests`` made, ``bars`` added,
+            the ``last_bar`` now stored and the ``missing`` ranges that
+            could not be fetched.
+        """
+        requests, free, holes = self._requests(symbol, start_date, end_date)
+        fetched = {}
+        for gap_start, gap_end in requests:
+            try:
+                fetched[(gap_start, gap_end)] = self.data_manager.fetch_bars(symbol, gap_start, gap_end, source)
+            except Exception as e:
+                logger.warning(f"Failed to fetch {symbol} {gap_start} to {gap_end}: {str(e)}")
+                fetched[(gap_start, gap_end)] = None
+        return self._apply(symbol, fetched, free, holes)
+
+    def _requests(self, symbol: str, start_date, end_date) -> Tuple[List[Range], List[Range], set]:
+        """Split the plan into ranges to request and trading-day-free ranges to mark covered."""
+        yesterday = (datetime.now() - timedelta(days=1)).date()
+        start = pd.Timestamp(start_date).date()
+        end = min(pd.Timestamp(end_date).date(), yesterday) if end_date is not None else yesterday
+        if end < start:
+            return [], [], set()
+
+        requests, free = [], []
+        for gap in self.plan(symbol, start, end):
+            (requests if _business_days(*gap) else free).append(gap)
+        return requests, free, set(self.find_holes(symbol, start, end))
+
+    def _apply(self, symbol: str, fetched: Dict[Range, Optional[pd.DataFrame]], free: List[Range],
+               holes: set) -> Dict[str, Any]:
+        """Merge fetched ranges into the store in one write and summarize."""
+        summary = {'symbol': symbol, 'requests': len(fetched), 'bars': 0, 'missing': [], 'status': 'success'}
+        frames, covered, empty_holes = [], list(free), []
+        for (gap_start, gap_end), data in sorted(fetched.items()):
+            if data is not None:
+                data = data[(data.index.date >= gap_start) & (data.index.date <= gap_end)]
+            end = covered_through(data, gap_end)
+            if end is not None:
+                frames.append(data)
+                covered.append((gap_start, end))
+                if end < gap_end:
+                    summary['missing'].append((end + timedelta(days=1), gap_end))
+            elif (gap_start, gap_end) in holes:
+                empty_holes.append((gap_start, gap_end))
+            else:
+                summary['missing'].append((gap_start, gap_end))
+
+        if covered:
+            bars = pd.concat(frames) if frames else pd.DataFrame(
+                columns=['Open', 'High', 'Low', 'Close', 'Volume'],
+                index=pd.DatetimeIndex([])
+            )
+            # Every covered range touches the stored coverage, so one write merges them all
+            self.store.write(
+                symbol,
+                bars,
+                min(gap[0] for gap in covered),
+                max(gap[1] for gap in covered)
+            )
+            summary['bars'] = int(len(bars))
+        self.store.record_gaps(symbol, empty_holes)
+
+        if summary['missing']:
+            summary['status'] = 'partial' if covered else 'failed'
+        summary['last_bar'] = self.store.last_bar(symbol)
+        return summary
+
+    def sync(self, symbols: List[str], start_date, end_date=None, source: str = 'auto',
+             fetcher=None) -> Dict[str, Any]:
+        """Sync many symbols concurrently.
+
+        Without ``fetcher`` symbols are synced on a thread pool through the
+        data manager. With an ``AsyncFetcher`` every symbol is planned first
+        and all requests go out as one batch within the providers' budgets.
+
+        Returns:
+            Dictionary with per-symbol ``results`` and the total ``requests``
+            and ``bars`` added.
+        """
+        def failed(symbol, error):
+            logger.error(f"Error syncing {symbol}: {str(error)}")
+            return {'symbol': symbol, 'requests': 0, 'bars': 0, 'missing': [], 'status': 'failed',
+                    'error': str(error)}
+
+        if fetcher is not None:
+            results = self._sync_batch(symbols, start_date, end_date, fetcher, failed)
+        else:
+            def run(symbol):
+                try:
+                    return self.sync_symbol(symbol, start_date, end_date, source)
+                except Exception as e:
+                    return failed(symbol, e)
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(run, symbols))
+
+        summary = {
+            'results': results,
+            'requests': sum(result['requests'] for result in results),
+            'bars': sum(result['bars'] for result in results),
+            'failed': [result['symbol'] for result in results if result['status'] == 'failed']
+        }
+        logger.info(
+            f"Synced {len(symbols)} symbols with {summary['requests']} requests, "
+            f"{summary['bars']} new bars, {len(summary['failed'])} failed"
+        )
+        return summary
+
+    def _sync_batch(self, symbols, start_date, end_date, fetcher, failed) -> List[Dict[str, Any]]:
+        """Plan every symbol, fetch all ranges in one async batch, then store them."""
+        plans = {symbol: self._requests(symbol, start_date, end_date) for symbol in symbols}
+        jobs = [(symbol, *gap) for symbol, (requests, _, _) in plans.items() for gap in requests]
+        fetched = fetcher.fetch(jobs)
+
+        results = []
+        for symbol, (requests, free, holes) in plans.items():
+            try:
+                ranges = {gap: fetched.get((symbol, *gap)) for gap in requests}
+                results.append(self._apply(symbol, ranges, free, holes))
+            except Exception as e:
+                results.append(failed(symbol, e))
+        return results
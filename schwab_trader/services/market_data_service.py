@@ -5,12 +5,19 @@ import yfinance as yf
 import requests
 from datetime import datetime, timedelta
 from flask import current_app, session
+from schwab_trader.utils.circuit_breaker import get_breaker
+from schwab_trader.utils.error_utils import RateLimitError
 from schwab_trader.utils.logging_utils import get_logger
+from schwab_trader.utils.single_flight import single_flight
 
 logger = get_logger(__name__)
 
 class MarketDataService:
-    """Service for handling market data with fallback options."""
+    """Service for handling market data with fallback options.
+    
+    Concurrent quote requests for the same symbol and provider share one
+    upstream call.
+    """
     
     def __init__(self):
         """Initialize the market data service."""
@@ -50,27 +57,35 @@ class MarketDataService:
             logger.error(f"Error getting fallback data: {str(e)}")
             return {"error": str(e)}
     
+    @single_flight(key=lambda self, symbol: symbol.upper())
     def _get_alpha_vantage_data(self, symbol: str) -> Optional[Dict]:
-        """Get data from Alpha Vantage."""
+        """Get data from Alpha Vantage; None when it fails or its circuit is open."""
         try:
-            url = f"https://www.alphavantage.co/query"
-            params = {
-                "function": "GLOBAL_QUOTE",
-                "symbol": symbol,
-                "apikey": self.alpha_vantage_key
-            }
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return get_breaker('alpha_vantage').call(self._request_alpha_vantage, symbol)
         except Exception as e:
-            logger.warning(f"Alpha Vantage fetch failed: {str(e)}")
+            logger.warning(f"Alpha Vantage fetch failed: {getattr(e, 'message', None) or str(e)}")
             return None
     
+    def _request_alpha_vantage(self, symbol: str) -> Dict:
+        url = f"https://www.alphavantage.co/query"
+        params = {
+            "function": "GLOBAL_QUOTE",
+            "symbol": symbol,
+            "apikey": self.alpha_vantage_key
+        }
+        response = requests.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
+        note = data.get("Note") or data.get("Information")
+        if note:
+            raise RateLimitError(note)
+        return data
+    
+    @single_flight(key=lambda self, symbol: symbol.upper())
     def _get_yfinance_data(self, symbol: str) -> Dict:
         """Get data from yfinance."""
         try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
+            info = get_breaker('yfinance').call(lambda: yf.Ticker(symbol).info)
             return {
                 "symbol": symbol,
                 "price": info.get("regularMarketPrice"),
@@ -0,0 +1,139 @@
+"""Shared market data publisher fanning quote updates out to stream subscribers."""
+import logging
+import queue
+import threading
+from typing import Dict, Iterable, Optional, Set
+from schwab_trader.services.quote_batcher import QuoteBatcher
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One subscriber's bounded queue of frames.
+
+    A frame maps each subscribed symbol to its latest quote. When the
+    subscriber falls behind and the queue is full, the oldest frame is
+    dropped to make room, so a slow client sees fresh data late rather
+    than stale data forever and memory stays bounded.
+    """
+
+    def __init__(self, publisher: 'MarketStreamPublisher', symbols: Iterable[str], maxsize: int):
+        self.publisher = publisher
+        self.symbols: Set[str] = {symbol.upper() for symbol in symbols}
+        self.dropped = 0
+        self.closed = False
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+
+    def offer(self, frame: Dict) -> None:
+        """Queue a frame, dropping the oldest one if the queue is full."""
+        while True:
+            try:
+                self._queue.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Next frame, or None if none arrived within ``timeout`` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.publisher.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MarketStreamPublisher:
+    """Polls quotes for the union of subscribed symbols and fans them out.
+
+    However many clients are connected, each poll requests every symbol
+    once through the quote batcher. Every subscriber then receives a frame
+    with its own symbols. The polling thread starts with the first
+    subscriber and stops after the last one leaves.
+    """
+
+    def __init__(self, quotes: QuoteBatcher, interval: float = 1.0, queue_size: int = 16):
+        self.quotes = quotes
+        self.interval = interval
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self.stats = {'polls': 0, 'frames': 0, 'dropped': 0, 'errors': 0}
+
+    def subscribe(self, symbols: Iterable[str]) -> Subscription:
+        subscription = Subscription(self, symbols, self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='market-stream', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+            self.stats['dropped'] += subscription.dropped
+            subscription.dropped = 0
+            if not self._subscribers:
+                self._wake.set()
+
+    def symbols(self) -> Set[str]:
+        """Union of every subscriber's symbols."""
+        with self._lock:
+            return set().union(*(subscription.symbols for subscription in self._subscribers))
+
+    def publish_once(self) -> int:
+        """Poll once and deliver a frame to every subscriber; returns the frames delivered."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        symbols = set().union(*(subscription.symbols for subscription in subscribers))
+        if not symbols:
+            return 0
+        latest = self.quotes.get_many(sorted(symbols))
+        for subscription in subscribers:
+            subscription.offer({symbol: latest.get(symbol) for symbol in subscription.symbols})
+        with self._lock:
+            self.stats['polls'] += 1
+            self.stats['frames'] += len(subscribers)
+        return len(subscribers)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+                self._wake.clear()
+            try:
+                self.publish_once()
+            except Exception as e:
+                with self._lock:
+                    self.stats['errors'] += 1
+                logger.error(f"Error publishing market data: {getattr(e, 'message', None) or str(e)}")
+            self._wake.wait(self.interval)
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(
+                self.stats,
+                subscribers=len(self._subscribers),
+                dropped=self.stats['dropped'] + sum(subscription.dropped for subscription in self._subscribers)
+            )
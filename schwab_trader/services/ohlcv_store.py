@@ -0,0 +1,240 @@
+"""Persistent per-symbol store of daily OHLCV bars."""
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from schwab_trader.config.market_config import get_directory_path
+from schwab_trader.utils.market_calendar import calendar
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within a process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+BAR_DTYPE = np.dtype([('date', '<i8')] + [(column, '<f8') for column in COLUMNS])
+
+
+# One lock per bars file, shared by every OHLCVStore in the process
+_symbol_locks: Dict[str, threading.Lock] = {}
+_symbol_locks_guard = threading.Lock()
+
+
+def _to_date(value) -> date:
+    """Normalize a datetime, Timestamp, date or ISO string to a date."""
+    return pd.Timestamp(value).date()
+
+
+def _to_ns(value: date) -> int:
+    return pd.Timestamp(value).as_unit('ns').value
+
+
+def covered_through(data: Optional[pd.DataFrame], end_date) -> Optional[date]:
+    """Last day a fetch requested through ``end_date`` actually covers.
+
+    That is ``end_date`` when no trading day falls after the last returned
+    bar, and the last bar's date otherwise, so days a lagging or truncated
+    response left out are requested again. None when nothing was returned.
+    """
+    if data is None or data.empty:
+        return None
+    end = _to_date(end_date)
+    last = pd.Timestamp(data.index.max()).date()
+    if last >= end or calendar.next_trading_day(last) > end:
+        return end
+    return last
+
+
+class OHLCVStore:
+    """Daily OHLCV bars on disk, one memory-mappable NumPy file per symbol.
+
+    Each symbol has ``<SYMBOL>.npy``, a date-sorted structured array of
+    ``BAR_DTYPE`` records, and ``<SYMBOL>.json`` holding the calendar range
+    already fetched from providers, the date of the last stored bar and any
+    gaps the providers are known to have no bars for. The coverage is
+    tracked separately from the bars because weekends and holidays have
+    none.
+
+    Writers of a symbol are serialized by a per-symbol lock, plus a
+    ``<SYMBOL>.lock`` file lock across processes, so concurrent fetches of
+    different ranges cannot lose each other's bars. Files are replaced
+    atomically and the metadata is always written last: a crash in between
+    leaves the coverage behind the bars, which only costs a refetch. The
+    last bar is read from the bars file itself.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or get_directory_path('store')
+
+    def _bars_path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol.upper()}.npy")
+
+    def _meta_path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol.upper()}.json")
+
+    @contextmanager
+    def _locked(self, symbol: str):
+        """Hold the write lock for ``symbol``."""
+        path = self._bars_path(symbol)
+        with _symbol_locks_guard:
+            lock = _symbol_locks.setdefault(os.path.abspath(path), threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, f"{symbol.upper()}.lock"), 'a') as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _meta(self, symbol: str) -> Optional[dict]:
+        try:
+            with open(self._meta_path(symbol)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, symbol: str, meta: dict) -> None:
+        self._replace(self._meta_path(symbol), lambda f: f.write(json.dumps(meta).encode()))
+
+    def coverage(self, symbol: str) -> Optional[Tuple[date, date]]:
+        """First and last calendar day already fetched, or None."""
+        meta = self._meta(symbol)
+        if meta is None:
+            return None
+        return _to_date(meta['start']), _to_date(meta['end'])
+
+    def last_bar(self, symbol: str) -> Optional[date]:
+        """Date of the latest stored bar, or None."""
+        bars = self._read(symbol)
+        if bars is None or not len(bars):
+            return None
+        return pd.Timestamp(int(bars['date'][-1]), unit='ns').date()
+
+    def known_gaps(self, symbol: str) -> List[Tuple[date, date]]:
+        """Ranges inside the coverage that providers returned no bars for."""
+        meta = self._meta(symbol) or {}
+        return [(_to_date(start), _to_date(end)) for start, end in meta.get('gaps', [])]
+
+    def record_gaps(self, symbol: str, gaps: List[Tuple[date, date]]) -> None:
+        """Remember ranges that were requested and came back empty."""
+        if not gaps:
+            return
+        with self._locked(symbol):
+            meta = self._meta(symbol)
+            if meta is None:
+                return
+            known = {tuple(gap) for gap in meta.get('gaps', [])}
+            known.update((_to_date(start).isoformat(), _to_date(end).isoformat()) for start, end in gaps)
+            meta['gaps'] = sorted([list(gap) for gap in known])
+            self._write_meta(symbol, meta)
+
+    def missing_ranges(self, symbol: str, start_date, end_date) -> List[Tuple[date, date]]:
+        """Calendar ranges within ``[start_date, end_date]`` not fetched yet."""
+        start, end = _to_date(start_date), _to_date(end_date)
+        covered = self.coverage(symbol)
+        if covered is None:
+            return [(start, end)]
+
+        covered_start, covered_end = covered
+        missing = []
+        if start < covered_start:
+            missing.append((start, min(end, covered_start - timedelta(days=1))))
+        if end > covered_end:
+            missing.append((max(start, covered_end + timedelta(days=1)), end))
+        return missing
+
+    def _read(self, symbol: str, mmap: bool = True) -> Optional[np.ndarray]:
+        path = self._bars_path(symbol)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    def bars(self, symbol: str, start_date=None, end_date=None) -> np.ndarray:
+        """Bars between two dates (inclusive) as a memory-mapped ``BAR_DTYPE`` array."""
+        bars = self._read(symbol)
+        if bars is None:
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        dates = bars['date']
+        first = np.searchsorted(dates, _to_ns(_to_date(start_date)), side='left') if start_date else 0
+        last = (
+            np.searchsorted(dates, _to_ns(_to_date(end_date)), side='right')
+            if end_date else len(dates)
+        )
+        return bars[first:last]
+
+    def load(self, symbol: str, start_date=None, end_date=None) -> pd.DataFrame:
+        """Bars between two dates (inclusive) as an OHLCV DataFrame."""
+        window = np.array(self.bars(symbol, start_date, end_date))
+        return pd.DataFrame(
+            {column: window[column] for column in COLUMNS},
+            index=pd.DatetimeIndex(pd.to_datetime(window['date'], unit='ns'), name='Date')
+        )
+
+    def write(self, symbol: str, data: pd.DataFrame, start_date, end_date) -> None:
+        """Merge fetched bars for ``[start_date, end_date]`` into the store.
+
+        ``data`` must have a DatetimeIndex and the ``COLUMNS`` columns. Bars
+        for dates already stored are replaced. The fetched range extends the
+        coverage when it touches or overlaps it; a disjoint range replaces
+        it, because the gap in between was never fetched.
+        """
+        start, end = _to_date(start_date), _to_date(end_date)
+        new = np.empty(len(data), dtype=BAR_DTYPE)
+        new['date'] = pd.DatetimeIndex(data.index).normalize().as_unit('ns').asi8
+        for column in COLUMNS:
+            new[column] = data[column].to_numpy(dtype=float)
+
+        with self._locked(symbol):
+            existing = self._read(symbol, mmap=False)
+            if existing is not None and len(existing):
+                # New bars win on duplicate dates
+                merged = np.concatenate([new, existing])
+                _, keep = np.unique(merged['date'], return_index=True)
+                bars = merged[keep]
+            else:
+                _, keep = np.unique(new['date'], return_index=True)
+                bars = new[keep]
+
+            previous = self._meta(symbol)
+            gaps = []
+            if previous is not None:
+                covered_start, covered_end = _to_date(previous['start']), _to_date(previous['end'])
+                if start <= covered_end + timedelta(days=1) and end >= covered_start - timedelta(days=1):
+                    start, end = min(start, covered_start), max(end, covered_end)
+                    gaps = previous.get('gaps', [])
+
+            self._replace(self._bars_path(symbol), lambda f: np.save(f, bars))
+            meta = {
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'bars': int(len(bars)),
+                'last_bar': (
+                    pd.Timestamp(int(bars['date'][-1]), unit='ns').date().isoformat()
+                    if len(bars) else None
+                ),
+                'updated': datetime.now().isoformat(timespec='seconds')
+            }
+            if gaps:
+                meta['gaps'] = gaps
+            self._write_meta(symbol, meta)
+        logger.debug(f"Stored {len(new)} bars for {symbol}; coverage {start} to {end}")
+
+    def _replace(self, path: str, write) -> None:
+        """Write a file through a temporary and rename it into place."""
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,266 @@
+"""Batched quotes: demands collected over a short window share chunked multi-symbol requests."""
+import logging
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+import requests
+from schwab_trader.utils.circuit_breaker import get_breaker
+from schwab_trader.utils.error_utils import CircuitOpenError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+Quote = Dict[str, Any]
+
+_batchers: 'weakref.WeakSet[QuoteBatcher]' = weakref.WeakSet()
+
+
+def _number(value: Any) -> Optional[float]:
+    """Parse provider numbers such as ``'1.25'`` or ``'-0.48%'``."""
+    if value is None or value == '':
+        return None
+    try:
+        return float(str(value).replace('%', '').replace(',', ''))
+    except ValueError:
+        return None
+
+
+def make_quote(symbol: str, price: Any, change: Any = None, change_percent: Any = None,
+               volume: Any = None, source: str = '') -> Quote:
+    """Quote in the shape every consumer reads."""
+    return {
+        'symbol': symbol,
+        'price': _number(price),
+        'change': _number(change),
+        'change_percent': _number(change_percent),
+        'volume': _number(volume),
+        'source': source
+    }
+
+
+class QuoteSource(ABC):
+    """Fetches quotes for up to ``max_batch`` symbols per request."""
+
+    name = 'quotes'
+    max_batch = 100
+
+    @abstractmethod
+    def fetch(self, symbols: List[str]) -> Dict[str, Quote]:
+        """Quotes keyed by upper-case symbol; symbols without a quote are left out."""
+        pass
+
+
+class SchwabQuoteSource(QuoteSource):
+    """Schwab market data quotes; ``client.get_quotes`` takes a list of symbols."""
+
+    name = 'schwab'
+    max_batch = 100
+
+    def __init__(self, client):
+        self.client = client
+
+    def fetch(self, symbols: List[str]) -> Dict[str, Quote]:
+        data = self.client.get_quotes(symbols) or {}
+        quotes = {}
+        for symbol, entry in data.items():
+            if not isinstance(entry, dict):
+                continue
+            quote = entry.get('quote', entry)
+            quotes[symbol.upper()] = make_quote(
+                symbol.upper(),
+                quote.get('lastPrice', quote.get('mark')),
+                quote.get('netChange'),
+                quote.get('netPercentChange', quote.get('netPercentChangeInDouble')),
+                quote.get('totalVolume'),
+                self.name
+            )
+        return quotes
+
+
+class AlphaVantageQuoteSource(QuoteSource):
+    """Alpha Vantage bulk quotes, falling back to one ``GLOBAL_QUOTE`` per symbol.
+
+    ``REALTIME_BULK_QUOTES`` returns up to 100 symbols per request but needs a
+    premium key; the first refusal switches this source to single quotes.
+    When single quotes hit the rate limit part-way, the quotes already
+    fetched are returned and the remaining symbols are left out.
+    """
+
+    name = 'alpha_vantage'
+    max_batch = 100
+
+    def __init__(self, api_key: str, base_url: str = 'https://www.alphavantage.co/query', timeout: float = 30.0):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.bulk = True
+        self._session = requests.Session()
+
+    def _get(self, params: Dict[str, str]) -> Dict[str, Any]:
+        response = self._session.get(self.base_url, params={**params, 'apikey': self.api_key}, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        note = data.get('Note')
+        if note:
+            raise RateLimitError(note)
+        return data
+
+    def fetch(self, symbols: List[str]) -> Dict[str, Quote]:
+        breaker = get_breaker(self.name)
+        if self.bulk:
+            data = breaker.call(self._get, {'function': 'REALTIME_BULK_QUOTES', 'symbol': ','.join(symbols)})
+            if isinstance(data.get('data'), list):
+                return {
+                    row['symbol'].upper(): make_quote(
+                        row['symbol'].upper(), row.get('close'), row.get('change'),
+                        row.get('change_percent'), row.get('volume'), self.name
+                    )
+                    for row in data['data'] if row.get('symbol')
+                }
+            logger.info(f"Alpha Vantage bulk quotes unavailable, using single quotes: "
+                        f"{data.get('Information') or data.get('message') or data}")
+            self.bulk = False
+
+        quotes = {}
+        for i, symbol in enumerate(symbols):
+            try:
+                data = breaker.call(self._get, {'function': 'GLOBAL_QUOTE', 'symbol': symbol})
+                if data.get('Information'):
+                    raise RateLimitError(data['Information'])
+            except (RateLimitError, CircuitOpenError) as e:
+                if not quotes:
+                    raise
+                # Keep what was fetched; the remaining symbols come back without a quote
+                logger.warning(f"Alpha Vantage quotes stopped after {i} of {len(symbols)} symbols: "
+                               f"{getattr(e, 'message', None) or str(e)}")
+                break
+            quote = data.get('Global Quote')
+            if quote:
+                quotes[symbol] = make_quote(
+                    symbol, quote.get('05. price'), quote.get('09. change'),
+                    quote.get('10. change percent'), quote.get('06. volume'), self.name
+                )
+        return quotes
+
+
+class QuoteBatcher:
+    """Collects quote demands from any thread and fetches them together.
+
+    The first demand opens a ``window``-second collection window; every
+    symbol asked for meanwhile, by any caller, joins the same batch, and a
+    batch reaching the source's ``max_batch`` symbols is sent at once. A
+    symbol asked for twice is fetched once. Batches are split into chunks of
+    ``max_batch`` and requested concurrently, and each caller receives its
+    own symbols from the results.
+    """
+
+    def __init__(self, source: QuoteSource, window: float = 0.05, max_batch: Optional[int] = None,
+                 max_workers: int = 4):
+        self.source = source
+        self.window = window
+        self.max_batch = max_batch or source.max_batch
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='quotes')
+        self.stats = {'demands': 0, 'symbols': 0, 'requests': 0, 'failures': 0}
+        _batchers.add(self)
+
+    def submit(self, symbol: str) -> Future:
+        """Future resolving to the quote for ``symbol``, or None when the source has none."""
+        symbol = symbol.upper()
+        full = None
+        with self._lock:
+            self.stats['demands'] += 1
+            future = self._pending.get(symbol)
+            if future is None:
+                future = Future()
+                self._pending[symbol] = future
+            if len(self._pending) >= self.max_batch:
+                full = self._take()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self._dispatch(full)
+        return future
+
+    def get(self, symbol: str, timeout: Optional[float] = None) -> Optional[Quote]:
+        """Quote for one symbol; raises if its batch failed."""
+        return self.submit(symbol).result(timeout)
+
+    def get_many(self, symbols: Iterable[str], timeout: Optional[float] = None) -> Dict[str, Optional[Quote]]:
+        """Quotes keyed by the symbols as given; failed or unknown symbols map to None."""
+        futures = {symbol: self.submit(symbol) for symbol in dict.fromkeys(symbols)}
+        quotes = {}
+        for symbol, future in futures.items():
+            try:
+                quotes[symbol] = future.result(timeout)
+            except Exception as e:
+                logger.warning(f"No quote for {symbol}: {getattr(e, 'message', None) or str(e)}")
+                quotes[symbol] = None
+        return quotes
+
+    def flush(self) -> None:
+        """Send everything collected so far without waiting for the window."""
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._dispatch(batch)
+
+    def _take(self) -> Dict[str, Future]:
+        batch, self._pending = self._pending, {}
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _dispatch(self, batch: Dict[str, Future]) -> None:
+        symbols = list(batch)
+        for i in range(0, len(symbols), self.max_batch):
+            chunk = {symbol: batch[symbol] for symbol in symbols[i:i + self.max_batch]}
+            self._executor.submit(self._fetch, chunk)
+
+    def _fetch(self, chunk: Dict[str, Future]) -> None:
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['symbols'] += len(chunk)
+        try:
+            quotes = self.source.fetch(list(chunk))
+        except Exception as e:
+            with self._lock:
+                self.stats['failures'] += 1
+            logger.error(f"{self.source.name} quotes failed for {len(chunk)} symbols: "
+                         f"{getattr(e, 'message', None) or str(e)}")
+            for future in chunk.values():
+                future.set_exception(e)
+            return
+        for symbol, future in chunk.items():
+            future.set_result(quotes.get(symbol))
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def close(self) -> None:
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+@lru_cache(maxsize=None)
+def alpha_vantage_batcher(api_key: str) -> QuoteBatcher:
+    """Process-wide Alpha Vantage batcher, so every consumer's demands share batches."""
+    return QuoteBatcher(AlphaVantageQuoteSource(api_key))
+
+
+def quote_batcher_metrics() -> Dict[str, Dict[str, int]]:
+    """Counters of the live batchers summed per quote source."""
+    totals: Dict[str, Dict[str, int]] = {}
+    for batcher in list(_batchers):
+        source = totals.setdefault(batcher.source.name, {})
+        for name, value in batcher.metrics().items():
+            source[name] = source.get(name, 0) + value
+    return totals
@@ -4,6 +4,8 @@ from datetime import datetime, timedelta
 from flask import current_app
 from schwab_trader.utils.schwab_oauth import SchwabOAuth
 from schwab_trader.utils.api_utils import retry_on_failure, cache_response, handle_api_error
+from schwab_trader.utils.circuit_breaker import circuit_breaker
+from schwab_trader.utils.market_calendar import market_ttl
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +35,8 @@ class SchwabAPI:
     
     @retry_on_failure(max_retries=3, delay=1, backoff=2)
     @handle_api_error
-    @cache_response(timeout=300)  # Cache for 5 minutes
+    @cache_response(timeout=300, per_user=True)  # Cache each user's accounts for 5 minutes
+    @circuit_breaker('schwab')
     def get_accounts(self):
         """Get all accounts associated with the token."""
         session = self._get_session()
@@ -43,7 +46,8 @@ class SchwabAPI:
     
     @retry_on_failure(max_retries=3, delay=1, backoff=2)
     @handle_api_error
-    @cache_response(timeout=300)  # Cache for 5 minutes
+    @cache_response(timeout=300, per_user=True)  # Cache each user's accounts for 5 minutes
+    @circuit_breaker('schwab')
     def get_positions(self, account_id):
         """Get positions for a specific account."""
         session = self._get_session()
@@ -53,7 +57,8 @@ class SchwabAPI:
     
     @retry_on_failure(max_retries=3, delay=1, backoff=2)
     @handle_api_error
-    @cache_response(timeout=60)  # Cache for 1 minute (quotes change frequently)
+    @cache_response(timeout=market_ttl(60))  # 1 minute while trading, until the next open otherwise
+    @circuit_breaker('schwab')
     def get_quotes(self, symbols):
         """Get quotes for multiple symbols."""
         session = self._get_session()
@@ -66,7 +71,8 @@ class SchwabAPI:
     
     @retry_on_failure(max_retries=3, delay=1, backoff=2)
     @handle_api_error
-    @cache_response(timeout=3600)  # Cache for 1 hour (historical data changes less frequently)
+    @cache_response(timeout=market_ttl(3600))  # 1 hour while trading; closed-market bars are final
+    @circuit_breaker('schwab')
     def get_historical_prices(self, symbol, period="1y", frequency="daily"):
         """Get historical price data for a symbol."""
         # Convert period to start date
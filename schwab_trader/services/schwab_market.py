@@ -3,6 +3,7 @@ import logging
 from datetime import datetime, timedelta
 import requests
 from schwab_trader.services.auth import get_schwab_token
+from schwab_trader.services.quote_batcher import QuoteBatcher, SchwabQuoteSource
 
 logger = logging.getLogger('schwab_market')
 handler = logging.FileHandler('logs/schwab_market_{}.log'.format(datetime.now().strftime('%Y%m%d')))
@@ -22,6 +23,8 @@ class SchwabMarketAPI:
             'Authorization': f'Bearer {self.token}',
             'Accept': 'application/json'
         }
+        # Single-symbol demands from every caller are sent as /quotes batches
+        self.quotes = QuoteBatcher(SchwabQuoteSource(self))
     
     def get_quote(self, symbol):
         """Get real-time quote for a symbol."""
@@ -34,6 +37,18 @@ class SchwabMarketAPI:
             logger.error(f"Error getting quote for {symbol}: {str(e)}")
             raise
     
+    def get_quotes(self, symbols):
+        """Get real-time quotes for several symbols in one request."""
+        try:
+            url = f"{self.BASE_URL}/quotes"
+            params = {'symbols': ','.join(symbols)}
+            response = requests.get(url, headers=self.headers, params=params)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error getting quotes for {len(symbols)} symbols: {str(e)}")
+            raise
+    
     def get_historical_prices(self, symbol, period="1y", frequency="daily"):
         """Get historical price data for a symbol."""
         try:
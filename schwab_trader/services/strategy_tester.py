@@ -1,13 +1,25 @@
 """Strategy testing framework with realistic market conditions."""
+import copy
 import logging
+from functools import partial
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from schwab_trader.services.data_manager import DataManager
+from schwab_trader import indicators
+from schwab_trader.strategies.volume_strategy import add_indicator_columns
+from schwab_trader.utils.performance_metrics import compute_metrics, trade_arrays
+from schwab_trader.utils.walk_forward import walk_forward_windows
 
 logger = logging.getLogger(__name__)
 
+
+def _window_metrics(tester, symbols, frames, strategy_func, aligned, start, end):
+    """Metrics of one walk-forward window, simulated on a copy of ``tester``."""
+    return copy.copy(tester)._simulate(symbols, frames, strategy_func, aligned, start, end)['metrics']
+
+
 class StrategyTester:
     """Simulates trading with realistic market conditions."""
     
@@ -37,6 +49,8 @@ class StrategyTester:
         self.trades: List[Dict] = []
         self.portfolio_value = initial_capital
         self.daily_returns: List[float] = []
+        self.equity_curve: List[float] = []
+        self.last_prices: Dict[str, float] = {}  # symbol -> last close
         
     def load_market_data(self, symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """Load and prepare market data with realistic conditions."""
@@ -46,7 +60,7 @@ class StrategyTester:
         
         # Add realistic market conditions
         data['Spread'] = data['High'] - data['Low']
-        data['Volume_MA'] = data['Volume'].rolling(window=20).mean()
+        data['Volume_MA'] = indicators.volume_ma(data['Volume'].to_numpy(dtype=float), 20)
         data['Liquidity'] = data['Volume'] / data['Volume_MA']
         
         # Add realistic price impact
@@ -56,6 +70,9 @@ class StrategyTester:
             data['Spread'] * 0.1   # Lower impact in high liquidity
         )
         
+        # Indicators used by the strategy functions, computed once per run
+        add_indicator_columns(data)
+        
         return data
     
     def calculate_position_size(self, price: float, risk: float) -> int:
@@ -79,13 +96,27 @@ class StrategyTester:
         shares: int,
         price: float,
         is_buy: bool,
-        timestamp: datetime
+        timestamp: datetime,
+        price_impact: float = 0.0
     ) -> Tuple[bool, float]:
-        """Execute a trade with realistic conditions."""
-        # Calculate total cost including slippage and commission
+        """Execute a trade with realistic conditions.
+
+        ``price_impact`` is the per-share impact from ``load_market_data`` and
+        moves the fill against the trade on top of the percentage slippage.
+        """
+        if shares <= 0:
+            return False, 0.0
+        if np.isnan(price_impact):
+            price_impact = 0.0
+
+        # Calculate fill price including slippage and market impact
         slippage = price * self.slippage_percent / 100
-        execution_price = price + (slippage if is_buy else -slippage)
-        total_cost = (execution_price * shares) + self.commission_per_trade
+        adverse = slippage + price_impact
+        execution_price = price + (adverse if is_buy else -adverse)
+        if is_buy:
+            total_cost = (execution_price * shares) + self.commission_per_trade
+        else:
+            total_cost = (execution_price * shares) - self.commission_per_trade
         
         # Check if we have enough cash for buy
         if is_buy and total_cost > self.cash:
@@ -99,6 +130,8 @@ class StrategyTester:
         else:
             self.positions[symbol] = self.positions.get(symbol, 0) - shares
             self.cash += total_cost
+        if self.positions[symbol] == 0:
+            del self.positions[symbol]
         
         # Record trade
         self.trades.append({
@@ -109,48 +142,37 @@ class StrategyTester:
             'type': 'buy' if is_buy else 'sell',
             'cost': total_cost,
             'slippage': slippage * shares,
+            'price_impact': price_impact * shares,
             'commission': self.commission_per_trade
         })
         
         return True, execution_price
     
-    def calculate_portfolio_value(self, data: pd.DataFrame, timestamp: datetime) -> float:
-        """Calculate current portfolio value."""
+    def calculate_portfolio_value(self) -> float:
+        """Calculate current portfolio value at the last marked prices."""
         position_value = 0.0
         for symbol, shares in self.positions.items():
-            if symbol in data.columns:
-                price = data.loc[timestamp, symbol]
-                position_value += price * shares
+            position_value += shares * self.last_prices.get(symbol, 0.0)
         
         return position_value + self.cash
     
     def calculate_metrics(self) -> Dict:
         """Calculate performance metrics."""
-        returns = pd.Series(self.daily_returns)
-        
-        # Basic metrics
-        total_return = (self.portfolio_value / self.initial_capital) - 1
-        annual_return = (1 + total_return) ** (252 / len(returns)) - 1
-        
-        # Risk metrics
-        volatility = returns.std() * np.sqrt(252)
-        sharpe_ratio = (annual_return - self.risk_free_rate) / volatility
-        
-        # Trade metrics
-        total_trades = len(self.trades)
-        winning_trades = len([t for t in self.trades if t['type'] == 'buy' and t['price'] < self.portfolio_value])
-        win_rate = winning_trades / total_trades if total_trades > 0 else 0
-        
-        return {
-            'total_return': total_return,
-            'annual_return': annual_return,
-            'volatility': volatility,
-            'sharpe_ratio': sharpe_ratio,
-            'total_trades': total_trades,
-            'win_rate': win_rate,
-            'max_drawdown': (returns.cumsum().expanding().max() - returns.cumsum()).max(),
-            'avg_trade_return': np.mean([t['price'] / t['cost'] - 1 for t in self.trades]) if self.trades else 0
-        }
+        equity = [self.initial_capital] + self.equity_curve
+        trades = None
+        if self.trades:
+            trades = trade_arrays(
+                self.trades,
+                side_key='type',
+                quantity_key='shares',
+                price_key='price',
+                fee_key='commission'
+            )
+
+        metrics = compute_metrics(equity, trades, risk_free_rate=self.risk_free_rate)
+        metrics['annual_return'] = metrics['annualized_return']
+        metrics['total_trades'] = metrics['num_trades']
+        return metrics
     
     def run_strategy(
         self,
@@ -160,46 +182,122 @@ class StrategyTester:
         strategy_func: callable
     ) -> Dict:
         """Run a strategy with realistic market conditions."""
-        # Load and prepare data
-        data = self.load_market_data(symbol, start_date, end_date)
-        
-        # Run strategy for each day
-        for timestamp in data.index:
-            # Get current portfolio value
-            current_value = self.calculate_portfolio_value(data, timestamp)
-            self.portfolio_value = current_value
-            
-            # Get strategy signals
-            signals = strategy_func(data, timestamp)
+        return self.run_portfolio([symbol], start_date, end_date, strategy_func)
+    
+    def run_portfolio(
+        self,
+        symbols: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        strategy_func: callable
+    ) -> Dict:
+        """Run a strategy over several symbols sharing one cash balance.
+
+        Every symbol's data is aligned on the union of their timestamps. At
+        each timestamp the strategy is called as ``strategy_func(data,
+        timestamp)`` for the symbols that have a bar, and held positions are
+        marked at their latest close.
+        """
+        frames = {symbol: self.load_market_data(symbol, start_date, end_date) for symbol in symbols}
+        return self._simulate(symbols, frames, strategy_func, self._align(symbols, frames))
+    
+    def walk_forward(
+        self,
+        symbols: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        strategy_func: callable,
+        train_size: int,
+        test_size: int,
+        step: Optional[int] = None,
+        expanding: bool = False,
+        max_workers: Optional[int] = None
+    ) -> Dict:
+        """Walk-forward evaluation of ``strategy_func`` over ``symbols``.
+
+        Data and indicator columns are loaded once for the whole range. Each
+        fold then replays its training and test windows from the initial
+        capital, with the bars before a window serving as indicator warm-up.
+        Every window trades on its own copy of this tester, so windows run
+        in parallel and this tester's state is left alone. See
+        ``walk_forward_windows`` for the result.
+        """
+        frames = {symbol: self.load_market_data(symbol, start_date, end_date) for symbol in symbols}
+        aligned = self._align(symbols, frames)
+
+        # Windows only need the loaded data, not the data manager
+        tester = copy.copy(self)
+        tester.data_manager = None
+        run_window = partial(_window_metrics, tester, symbols, frames, strategy_func, aligned)
+        return walk_forward_windows(aligned[0], run_window, train_size, test_size, step, expanding, max_workers)
+    
+    def _align(self, symbols: List[str], frames: Dict[str, pd.DataFrame]) -> Tuple:
+        """Align the symbols' closes and price impacts on the union of their timestamps.
+
+        Returns ``(index, closes, impacts, bounds, columns)``; the symbols
+        with a bar at row ``i`` are ``columns[bounds[i]:bounds[i + 1]]``.
+        """
+        index = frames[symbols[0]].index
+        for symbol in symbols[1:]:
+            index = index.union(frames[symbol].index)
+
+        closes = np.column_stack([
+            frames[symbol]['Close'].reindex(index).to_numpy(dtype=float) for symbol in symbols
+        ])
+        impacts = np.column_stack([
+            frames[symbol]['Price_Impact'].reindex(index).to_numpy(dtype=float) for symbol in symbols
+        ])
+
+        # Symbols with a bar at each timestamp, so each step only visits those
+        rows, columns = np.nonzero(~np.isnan(closes))
+        bounds = np.searchsorted(rows, np.arange(len(index) + 1)).tolist()
+        return index, closes, impacts, bounds, columns.tolist()
+    
+    def _simulate(
+        self,
+        symbols: List[str],
+        frames: Dict[str, pd.DataFrame],
+        strategy_func: callable,
+        aligned: Tuple,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> Dict:
+        """Trade from the initial capital over the aligned bars ``[start, end)``."""
+        self._reset_state()
+        index, closes, impacts, bounds, columns = aligned
+        end = len(index) if end is None else end
+        previous_value = self.initial_capital
+
+        for i in range(start, end):
+            timestamp = index[i]
+            active = columns[bounds[i]:bounds[i + 1]]
+            for j in active:
+                self.last_prices[symbols[j]] = float(closes[i, j])
+            self.portfolio_value = self.calculate_portfolio_value()
             
-            # Execute trades based on signals
-            for signal in signals:
-                if signal['action'] == 'buy':
-                    shares = self.calculate_position_size(
-                        data.loc[timestamp, 'Close'],
-                        signal.get('risk', 0.1)
-                    )
-                    success, price = self.execute_trade(
-                        symbol,
-                        shares,
-                        data.loc[timestamp, 'Close'],
-                        True,
-                        timestamp
-                    )
-                elif signal['action'] == 'sell':
-                    current_shares = self.positions.get(symbol, 0)
-                    if current_shares > 0:
-                        success, price = self.execute_trade(
-                            symbol,
-                            current_shares,
-                            data.loc[timestamp, 'Close'],
-                            False,
-                            timestamp
-                        )
+            for j in active:
+                symbol = symbols[j]
+                price = float(closes[i, j])
+                price_impact = float(impacts[i, j])
+
+                # Get strategy signals
+                signals = strategy_func(frames[symbol], timestamp)
+                
+                # Execute trades based on signals
+                for signal in signals:
+                    if signal['action'] == 'buy':
+                        shares = self.calculate_position_size(price, signal.get('risk', 0.1))
+                        self.execute_trade(symbol, shares, price, True, timestamp, price_impact)
+                    elif signal['action'] == 'sell':
+                        current_shares = self.positions.get(symbol, 0)
+                        if current_shares > 0:
+                            self.execute_trade(symbol, current_shares, price, False, timestamp, price_impact)
             
-            # Record daily return
-            daily_return = (current_value / self.portfolio_value) - 1
-            self.daily_returns.append(daily_return)
+            # Record end-of-bar value and its return over the previous bar's close
+            end_value = self.calculate_portfolio_value()
+            self.daily_returns.append(end_value / previous_value - 1)
+            previous_value = self.portfolio_value = end_value
+            self.equity_curve.append(end_value)
         
         # Calculate final metrics
         metrics = self.calculate_metrics()
@@ -208,5 +306,17 @@ class StrategyTester:
             'metrics': metrics,
             'trades': self.trades,
             'final_portfolio_value': self.portfolio_value,
-            'daily_returns': self.daily_returns
-        } 
\ No newline at end of file
+            'daily_returns': self.daily_returns,
+            'equity_curve': pd.Series(self.equity_curve, index=index[start:end]),
+            'positions': dict(self.positions)
+        }
+    
+    def _reset_state(self):
+        """Clear trading state from any previous run."""
+        self.positions = {}
+        self.last_prices = {}
+        self.cash = self.initial_capital
+        self.trades = []
+        self.portfolio_value = self.initial_capital
+        self.daily_returns = []
+        self.equity_curve = []
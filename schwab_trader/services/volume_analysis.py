@@ -1,51 +1,42 @@
 """Centralized volume analysis service."""
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
 from schwab_trader.services.logging_service import LoggingService
+from schwab_trader.services.volume_history import VolumeHistory
 
 class VolumeAnalysisService:
     def __init__(self):
-        self.volume_baselines: Dict[str, float] = {}
-        self.volume_history: Dict[str, List[float]] = {}
         self.min_volume = 100000  # Minimum volume threshold
         self.volume_increase_threshold = 1.15  # 15% above baseline
         self.volume_decrease_threshold = 1.05  # 5% above baseline
         self.lookback_days = 30  # Days to consider for baseline
+        self.history_days = 90  # Prints kept per symbol
+        self.volume_history = VolumeHistory(capacity=self.history_days, span=self.lookback_days)
         self.logger = LoggingService()
 
     def calculate_volume_baseline(self, volumes: List[float]) -> float:
         """Calculate volume baseline using exponential moving average."""
         if not volumes:
-            self.logger.log('WARNING', "No volume data provided for baseline calculation")
+            self.logger.warning("No volume data provided for baseline calculation")
             return 0.0
         
         try:
             # Use EMA to give more weight to recent volumes
             ema = pd.Series(volumes).ewm(span=self.lookback_days, adjust=False).mean()
             baseline = ema.iloc[-1]
-            self.logger.log('INFO', f"Calculated volume baseline: {baseline:,.0f}", {
-                'baseline': baseline,
-                'lookback_days': self.lookback_days
-            })
+            self.logger.debug(f"Calculated volume baseline: {baseline:,.0f} (lookback {self.lookback_days} days)")
             return baseline
         except Exception as e:
-            self.logger.log('ERROR', f"Error calculating volume baseline: {str(e)}", {
-                'error': str(e),
-                'volumes_length': len(volumes)
-            })
+            self.logger.error(f"Error calculating volume baseline from {len(volumes)} volumes: {str(e)}")
             return 0.0
 
     def analyze_volume_pattern(self, symbol: str, volumes: List[float]) -> Dict:
         """Analyze volume patterns and generate detailed analysis."""
         try:
             if len(volumes) < self.lookback_days:
-                self.logger.log('WARNING', f"Insufficient data for {symbol}", {
-                    'symbol': symbol,
-                    'days_available': len(volumes),
-                    'days_required': self.lookback_days
-                })
+                self.logger.warning(f"Insufficient data for {symbol}: {len(volumes)} of {self.lookback_days} days")
                 return {
                     'error': f'Insufficient data. Need {self.lookback_days} days, got {len(volumes)}',
                     'current_volume': volumes[-1] if volumes else 0,
@@ -54,64 +45,17 @@ class VolumeAnalysisService:
                     'signal': 'HOLD'
                 }
 
-            # Update or calculate baseline
-            if symbol not in self.volume_baselines:
-                self.volume_baselines[symbol] = self.calculate_volume_baseline(volumes)
+            baseline = self.calculate_volume_baseline(volumes)
             
-            current_volume = volumes[-1]
-            baseline = self.volume_baselines[symbol]
-            volume_ratio = current_volume / baseline if baseline > 0 else 0
-
-            # Generate analysis
-            analysis = {
-                'current_volume': current_volume,
-                'baseline': baseline,
-                'volume_ratio': volume_ratio,
-                'signal': 'HOLD',
-                'details': {
-                    'volume_trend': 'stable',
-                    'volume_momentum': 0,
-                    'unusual_activity': False
-                }
-            }
-
             # Calculate volume momentum (rate of change)
+            momentum = 0
             if len(volumes) >= 5:
                 recent_volumes = volumes[-5:]
                 momentum = (recent_volumes[-1] - recent_volumes[0]) / recent_volumes[0]
-                analysis['details']['volume_momentum'] = momentum
-
-            # Determine volume trend
-            if volume_ratio > self.volume_increase_threshold:
-                analysis['signal'] = 'BUY'
-                analysis['details']['volume_trend'] = 'increasing'
-                analysis['details']['unusual_activity'] = True
-                self.logger.log('INFO', f"Buy signal detected for {symbol}", {
-                    'symbol': symbol,
-                    'volume_ratio': volume_ratio,
-                    'threshold': self.volume_increase_threshold
-                })
-            elif volume_ratio < 1.0:
-                analysis['signal'] = 'SELL'
-                analysis['details']['volume_trend'] = 'decreasing'
-                self.logger.log('INFO', f"Sell signal detected for {symbol}", {
-                    'symbol': symbol,
-                    'volume_ratio': volume_ratio
-                })
-            elif volume_ratio > 1.0:
-                analysis['details']['volume_trend'] = 'stable_high'
-
-            self.logger.log('INFO', f"Volume analysis for {symbol}", {
-                'symbol': symbol,
-                'analysis': analysis
-            })
-            return analysis
+
+            return self._build_analysis(symbol, volumes[-1], baseline, momentum)
         except Exception as e:
-            self.logger.log('ERROR', f"Error analyzing volume pattern for {symbol}", {
-                'symbol': symbol,
-                'error': str(e),
-                'volumes_length': len(volumes)
-            })
+            self.logger.error(f"Error analyzing volume pattern for {symbol}: {str(e)}")
             return {
                 'error': f'Error analyzing volume pattern: {str(e)}',
                 'current_volume': volumes[-1] if volumes else 0,
@@ -120,6 +64,170 @@ class VolumeAnalysisService:
                 'signal': 'HOLD'
             }
 
+    def _build_analysis(self, symbol: str, current_volume: float, baseline: float, momentum: float) -> Dict:
+        """Signal and trend for a print measured against its baseline."""
+        volume_ratio = current_volume / baseline if baseline > 0 else 0
+        analysis = {
+            'current_volume': current_volume,
+            'baseline': baseline,
+            'volume_ratio': volume_ratio,
+            'signal': 'HOLD',
+            'details': {
+                'volume_trend': 'stable',
+                'volume_momentum': momentum,
+                'unusual_activity': False
+            }
+        }
+
+        # Determine volume trend
+        if volume_ratio > self.volume_increase_threshold:
+            analysis['signal'] = 'BUY'
+            analysis['details']['volume_trend'] = 'increasing'
+            analysis['details']['unusual_activity'] = True
+            self.logger.debug(f"Buy signal detected for {symbol}: {volume_ratio:.2f}x baseline")
+        elif volume_ratio < 1.0:
+            analysis['signal'] = 'SELL'
+            analysis['details']['volume_trend'] = 'decreasing'
+            self.logger.debug(f"Sell signal detected for {symbol}: {volume_ratio:.2f}x baseline")
+        elif volume_ratio > 1.0:
+            analysis['details']['volume_trend'] = 'stable_high'
+        return analysis
+
+    def volume_matrix(self, histories: Dict[str, Sequence[float]]) -> Tuple[List[str], np.ndarray]:
+        """Stack per-symbol volume histories into a (symbols x days) matrix.
+
+        Rows are aligned on the most recent day; shorter histories are
+        padded with NaN at the start.
+        """
+        symbols = list(histories)
+        days = max((len(volumes) for volumes in histories.values()), default=0)
+        matrix = np.full((len(symbols), days), np.nan)
+        for row, symbol in enumerate(symbols):
+            volumes = histories[symbol]
+            if len(volumes):
+                matrix[row, days - len(volumes):] = volumes
+        return symbols, matrix
+
+    def ema_baselines(self, matrix: np.ndarray) -> np.ndarray:
+        """Last value of each row's EMA, matching ``calculate_volume_baseline`` per row.
+
+        The recursive EMA unrolls to fixed weights ``alpha * (1 - alpha) ** age``,
+        with the first observation weighted ``(1 - alpha) ** age``, so the whole
+        universe takes one matrix-vector product. Leading NaNs are skipped.
+        """
+        days = matrix.shape[1]
+        alpha = 2.0 / (self.lookback_days + 1)
+        decay = (1.0 - alpha) ** np.arange(days - 1, -1, -1)
+        valid = ~np.isnan(matrix)
+        filled = np.where(valid, matrix, 0.0)
+        baselines = filled @ (alpha * decay)
+        first = np.where(valid.any(axis=1), valid.argmax(axis=1), days - 1)
+        seeds = filled[np.arange(len(matrix)), first]
+        return baselines + seeds * decay[first] * (1.0 - alpha)
+
+    def analyze_universe(self, symbols: Sequence[str], volumes) -> pd.DataFrame:
+        """Analyze a (symbols x days) volume matrix in one vectorized pass.
+
+        Gives the same figures as ``analyze_volume_pattern`` for every row:
+        baseline, volume ratio, 5-day momentum, trend and signal. Rows with
+        fewer than ``lookback_days`` volumes are marked ``sufficient_data``
+        False and get a zero baseline and a HOLD signal. Histories of
+        different lengths can be aligned with ``volume_matrix``.
+        """
+        matrix = np.asarray(volumes, dtype=float)
+        if matrix.ndim != 2 or matrix.shape[0] != len(symbols):
+            raise ValueError(f"Expected a ({len(symbols)} x days) volume matrix, got shape {matrix.shape}")
+
+        if matrix.shape[1] == 0:
+            matrix = np.full((len(symbols), 1), np.nan)
+        sufficient = (~np.isnan(matrix)).sum(axis=1) >= self.lookback_days
+        current = np.nan_to_num(matrix[:, -1])
+        baseline = np.where(sufficient, self.ema_baselines(matrix), 0.0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(baseline > 0, current / baseline, 0.0)
+            if matrix.shape[1] >= 5:
+                start = matrix[:, -5]
+                momentum = np.where(sufficient & (start > 0), (current - start) / start, 0.0)
+            else:
+                momentum = np.zeros(len(symbols))
+
+        increasing = sufficient & (ratio > self.volume_increase_threshold)
+        decreasing = sufficient & (ratio < 1.0)
+        frame = pd.DataFrame({
+            'current_volume': current,
+            'baseline': baseline,
+            'volume_ratio': ratio,
+            'volume_momentum': momentum,
+            'volume_trend': np.select(
+                [increasing, decreasing, sufficient & (ratio > 1.0)],
+                ['increasing', 'decreasing', 'stable_high'],
+                'stable'
+            ),
+            'signal': np.select([increasing, decreasing], ['BUY', 'SELL'], 'HOLD'),
+            'unusual_activity': increasing,
+            'sufficient_data': sufficient
+        }, index=pd.Index(list(symbols), name='symbol'))
+
+        self.logger.info(
+            f"Volume scan of {len(frame)} symbols: {int(increasing.sum())} BUY, "
+            f"{int(decreasing.sum())} SELL, {int((~sufficient).sum())} with insufficient data"
+        )
+        return frame
+
+    def to_analyses(self, frame: pd.DataFrame) -> Dict[str, Dict]:
+        """Per-symbol analyses from ``analyze_universe`` in ``analyze_volume_pattern``'s shape."""
+        analyses = {}
+        for symbol, row in frame.iterrows():
+            analysis = {
+                'current_volume': float(row['current_volume']),
+                'baseline': float(row['baseline']),
+                'volume_ratio': float(row['volume_ratio']),
+                'signal': row['signal'],
+                'details': {
+                    'volume_trend': row['volume_trend'],
+                    'volume_momentum': float(row['volume_momentum']),
+                    'unusual_activity': bool(row['unusual_activity'])
+                }
+            }
+            if not row['sufficient_data']:
+                analysis['error'] = f'Insufficient data. Need {self.lookback_days} days'
+            analyses[symbol] = analysis
+        return analyses
+
+    def alerts_for(self, analysis: Dict) -> List[str]:
+        """Alert messages for one symbol's analysis."""
+        alerts = []
+        details = analysis.get('details', {})
+        if details.get('unusual_activity'):
+            alerts.append(
+                f"Unusual volume activity detected: {analysis['current_volume']:,.0f} shares "
+                f"({analysis['volume_ratio']:.2f}x baseline)"
+            )
+        if details.get('volume_momentum', 0) > 0.2:
+            alerts.append(f"Strong volume momentum: {details['volume_momentum']:.1%} increase in last 5 days")
+        return alerts
+
+    def analyze_latest(self, symbol: str) -> Dict:
+        """Analyze the latest print in ``volume_history`` in O(1).
+
+        Uses the running EMA kept by the history instead of recomputing it
+        from the stored prints.
+        """
+        count = self.volume_history.count(symbol)
+        if count < self.lookback_days:
+            return {
+                'error': f'Insufficient data. Need {self.lookback_days} days, got {count}',
+                'current_volume': self.volume_history.latest(symbol) if count else 0,
+                'baseline': 0,
+                'volume_ratio': 0,
+                'signal': 'HOLD'
+            }
+        current_volume = self.volume_history.latest(symbol)
+        start = self.volume_history.latest(symbol, back=4)
+        momentum = (current_volume - start) / start if start > 0 else 0
+        return self._build_analysis(symbol, current_volume, self.volume_history.ema(symbol), momentum)
+
     def get_volume_alerts(self, symbol: str) -> List[str]:
         """Generate alerts based on volume patterns."""
         alerts = []
@@ -127,56 +235,26 @@ class VolumeAnalysisService:
             if symbol not in self.volume_history:
                 return alerts
 
-            analysis = self.analyze_volume_pattern(symbol, self.volume_history[symbol])
-            
-            if analysis['details']['unusual_activity']:
-                alert = f"Unusual volume activity detected: {analysis['current_volume']:,.0f} shares ({analysis['volume_ratio']:.2f}x baseline)"
-                alerts.append(alert)
-                self.logger.log('WARNING', alert, {
-                    'symbol': symbol,
-                    'current_volume': analysis['current_volume'],
-                    'volume_ratio': analysis['volume_ratio']
-                })
-            
-            if analysis['details']['volume_momentum'] > 0.2:
-                alert = f"Strong volume momentum: {analysis['details']['volume_momentum']:.1%} increase in last 5 days"
-                alerts.append(alert)
-                self.logger.log('INFO', alert, {
-                    'symbol': symbol,
-                    'momentum': analysis['details']['volume_momentum']
-                })
+            alerts = self.alerts_for(self.analyze_latest(symbol))
+            for alert in alerts:
+                self.logger.info(f"{symbol}: {alert}")
             
             return alerts
         except Exception as e:
-            self.logger.log('ERROR', f"Error generating volume alerts for {symbol}", {
-                'symbol': symbol,
-                'error': str(e)
-            })
+            self.logger.error(f"Error generating volume alerts for {symbol}: {str(e)}")
             return []
 
     def update_volume_data(self, symbol: str, new_volume: float) -> Dict:
         """Update volume data and return analysis."""
         try:
-            if symbol not in self.volume_history:
-                self.volume_history[symbol] = []
-            
-            self.volume_history[symbol].append(new_volume)
-            
-            # Keep only last 90 days of data
-            if len(self.volume_history[symbol]) > 90:
-                self.volume_history[symbol] = self.volume_history[symbol][-90:]
-            
-            return self.analyze_volume_pattern(symbol, self.volume_history[symbol])
+            self.volume_history.append(symbol, new_volume)
+            return self.analyze_latest(symbol)
         except Exception as e:
-            self.logger.log('ERROR', f"Error updating volume data for {symbol}", {
-                'symbol': symbol,
-                'new_volume': new_volume,
-                'error': str(e)
-            })
+            self.logger.error(f"Error updating volume data for {symbol}: {str(e)}")
             return {
                 'error': f'Error updating volume data: {str(e)}',
                 'current_volume': new_volume,
                 'baseline': 0,
                 'volume_ratio': 0,
                 'signal': 'HOLD'
-            } 
\ No newline at end of file
+            }
@@ -0,0 +1,119 @@
+"""Fixed-capacity volume history for many symbols with running baselines."""
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+
+
+class VolumeHistory:
+    """One shared (symbols x capacity) ring buffer of volume prints.
+
+    Each symbol owns a row. A print overwrites the row's oldest slot and
+    updates the symbol's running EMA and rolling-window sum in O(1), without
+    copying the history. The rolling sum is recomputed from the buffer each
+    time a row wraps around, so floating-point drift cannot build up. The
+    EMA covers every print since the symbol was first seen, not only those
+    still in the buffer.
+    """
+
+    def __init__(self, capacity: int = 90, span: int = 30, window: Optional[int] = None, initial_symbols: int = 64):
+        self.capacity = capacity
+        self.alpha = 2.0 / (span + 1)
+        self.window = min(window or span, capacity)
+        self._rows: Dict[str, int] = {}
+        self._data = np.zeros((initial_symbols, capacity))
+        self._next = np.zeros(initial_symbols, dtype=np.int64)
+        self._count = np.zeros(initial_symbols, dtype=np.int64)
+        self._ema = np.zeros(initial_symbols)
+        self._window_sum = np.zeros(initial_symbols)
+
+    def _row(self, symbol: str) -> int:
+        row = self._rows.get(symbol)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self._data):
+                self._grow()
+            self._rows[symbol] = row
+        return row
+
+    def _grow(self) -> None:
+        size = len(self._data)
+        self._data = np.vstack([self._data, np.zeros((size, self.capacity))])
+        for name in ('_next', '_count', '_ema', '_window_sum'):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+
+    def append(self, symbol: str, volume: float) -> None:
+        """Record a volume print for ``symbol``."""
+        row = self._row(symbol)
+        slot = self._next[row]
+        count = self._count[row]
+
+        if count >= self.window:
+            self._window_sum[row] -= self._data[row, (slot - self.window) % self.capacity]
+        self._window_sum[row] += volume
+        self._ema[row] = volume if count == 0 else self._ema[row] + self.alpha * (volume - self._ema[row])
+
+        self._data[row, slot] = volume
+        self._next[row] = (slot + 1) % self.capacity
+        self._count[row] = min(count + 1, self.capacity)
+        if self._next[row] == 0:
+            self._window_sum[row] = self.values(symbol)[-self.window:].sum()
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __getitem__(self, symbol: str) -> np.ndarray:
+        if symbol not in self._rows:
+            raise KeyError(symbol)
+        return self.values(symbol)
+
+    def symbols(self) -> List[str]:
+        return list(self._rows)
+
+    def count(self, symbol: str) -> int:
+        """Prints held for ``symbol``, at most ``capacity``."""
+        row = self._rows.get(symbol)
+        return 0 if row is None else int(self._count[row])
+
+    def values(self, symbol: str) -> np.ndarray:
+        """Held prints for ``symbol`` in chronological order (a copy)."""
+        row = self._rows.get(symbol)
+        if row is None:
+            return np.empty(0)
+        count, slot = self._count[row], self._next[row]
+        if count < self.capacity:
+            return self._data[row, :count].copy()
+        return np.concatenate([self._data[row, slot:], self._data[row, :slot]])
+
+    def latest(self, symbol: str, back: int = 0) -> float:
+        """The print ``back`` steps before the most recent one."""
+        row = self._rows[symbol]
+        if back >= self._count[row]:
+            raise IndexError(f"{symbol} has only {self._count[row]} prints")
+        return float(self._data[row, (self._next[row] - 1 - back) % self.capacity])
+
+    def ema(self, symbol: str) -> float:
+        """Running EMA of every print for ``symbol``."""
+        return float(self._ema[self._rows[symbol]])
+
+    def rolling_mean(self, symbol: str) -> float:
+        """Mean of the last ``window`` prints (fewer while the history is short)."""
+        row = self._rows[symbol]
+        return float(self._window_sum[row] / min(self._count[row], self.window))
+
+    def clear(self, symbol: Optional[str] = None) -> None:
+        """Forget one symbol's prints, or every symbol's."""
+        if symbol is None:
+            self._rows.clear()
+            for array in (self._next, self._count, self._ema, self._window_sum):
+                array[:] = 0
+            return
+        row = self._rows.get(symbol)
+        if row is not None:
+            self._next[row] = self._count[row] = 0
+            self._ema[row] = self._window_sum[row] = 0.0
@@ -5,7 +5,15 @@ from typing import List, Dict, Any, Optional
 import time
 import json
 from requests.exceptions import RequestException
+import numpy as np
 import pandas as pd
+from schwab_trader.utils.cache import get_cache, make_key
+from schwab_trader.utils.market_calendar import market_ttl
+
+# Shared by every YFinanceAPI; evicted ranges spill to disk. Bars fetched
+# while the market is closed are final until the next session.
+history_cache = get_cache('yfinance_history', max_entries=512, max_bytes=64 * 1024 * 1024,
+                          ttl=market_ttl(3600), disk=True)
 
 class YFinanceAPI:
     def __init__(self, max_retries: int = 3, retry_delay: float = 2.0):
@@ -14,14 +22,14 @@ class YFinanceAPI:
         self.retry_delay = retry_delay
         self.last_request_time = 0
         self.min_request_interval = 0.5  # Minimum time between requests in seconds
-        self._cache = {}  # Initialize cache dictionary
+        self._cache = history_cache
         
         # Configure yfinance to use a proxy if needed
         yf.set_tz_cache_location("yfinance_cache")
 
     def _get_cache_key(self, symbol: str, start_date: datetime, end_date: datetime) -> str:
         """Generate a unique cache key for the given parameters"""
-        return f"{symbol}_{start_date.strftime('%Y-%m-%d')}_{end_date.strftime('%Y-%m-%d')}"
+        return make_key('yfinance_history', symbol.upper(), start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
 
     def _wait_for_rate_limit(self):
         """Ensure we don't exceed rate limits by waiting between requests"""
@@ -45,9 +53,10 @@ class YFinanceAPI:
         """
         # Check cache first
         cache_key = self._get_cache_key(symbol, start_date, end_date)
-        if cache_key in self._cache:
+        cached_data = self._cache.get(cache_key)
+        if cached_data is not None:
             self.logger.info(f"Retrieved cached data for {symbol}")
-            return self._cache[cache_key]
+            return cached_data
             
         retries = 0
         while retries < self.max_retries:
@@ -78,31 +87,36 @@ class YFinanceAPI:
                     time.sleep(self.retry_delay * (retries + 1))
                     continue
                 
-                # Convert DataFrame to list of dictionaries
-                data = []
-                for index, row in df.iterrows():
-                    try:
-                        data_point = {
-                            'date': index.strftime('%Y-%m-%d'),
-                            'open': float(row['Open']),
-                            'high': float(row['High']),
-                            'low': float(row['Low']),
-                            'close': float(row['Close']),
-                            'volume': int(row['Volume'])
-                        }
-                        # Validate data point values
-                        if all(v is not None and v > 0 for k, v in data_point.items() if k != 'date'):
-                            data.append(data_point)
-                        else:
-                            self.logger.warning(f"Skipping invalid data point for {symbol} on {data_point['date']}")
-                    except (ValueError, TypeError) as e:
-                        self.logger.warning(f"Error processing data point for {symbol}: {str(e)}")
-                        continue
+                # Convert DataFrame to list of dictionaries, column by column
+                prices = df[required_columns].apply(pd.to_numeric, errors='coerce')
+                valid = (prices > 0).all(axis=1)
+                skipped = int((~valid).sum())
+                if skipped:
+                    self.logger.warning(f"Skipping {skipped} invalid data points for {symbol}")
+                prices = prices[valid]
+                data = [
+                    {
+                        'date': date,
+                        'open': open_,
+                        'high': high,
+                        'low': low,
+                        'close': close,
+                        'volume': volume
+                    }
+                    for date, open_, high, low, close, volume in zip(
+                        prices.index.strftime('%Y-%m-%d'),
+                        prices['Open'].to_numpy(dtype=float).tolist(),
+                        prices['High'].to_numpy(dtype=float).tolist(),
+                        prices['Low'].to_numpy(dtype=float).tolist(),
+                        prices['Close'].to_numpy(dtype=float).tolist(),
+                        prices['Volume'].to_numpy(dtype=np.int64).tolist()
+                    )
+                ]
                 
                 if data:
                     self.logger.info(f"Retrieved {len(data)} valid data points from Yahoo Finance for {symbol}")
                     # Cache the results
-                    self._cache[cache_key] = data
+                    self._cache.set(cache_key, data)
                     return data
                 else:
                     self.logger.warning(f"No valid data points found for {symbol}, attempt {retries + 1}/{self.max_retries}")
@@ -3,6 +3,28 @@ from datetime import datetime
 import pandas as pd
 import numpy as np
 
+# Signal codes used by signal matrices
+SIGNAL_SELL = -1
+SIGNAL_HOLD = 0
+SIGNAL_BUY = 1
+SIGNAL_ACTIONS = {SIGNAL_BUY: 'BUY', SIGNAL_SELL: 'SELL', SIGNAL_HOLD: 'HOLD'}
+
+def rolling_mean(values, window):
+    """Trailing mean along axis 0; NaN until a full window of valid values."""
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0), axis=0)
+    counts = np.cumsum(valid, axis=0)
+    pad = np.zeros((1,) + values.shape[1:])
+    sums = np.concatenate([pad, sums])
+    counts = np.concatenate([pad, counts])
+    
+    result = np.full(values.shape, np.nan)
+    if window <= len(values):
+        window_sums = sums[window:] - sums[:-window]
+        window_counts = counts[window:] - counts[:-window]
+        result[window - 1:] = np.where(window_counts == window, window_sums / window, np.nan)
+    return result
+
 class TradingStrategy(ABC):
     """Base class for trading strategies"""
     
@@ -17,6 +39,15 @@ class TradingStrategy(ABC):
         """Generate trading signals based on strategy rules"""
         pass
     
+    def generate_signal_matrix(self, panel):
+        """Generate a (dates x symbols) array of SIGNAL_* codes for a PricePanel.
+        
+        Strategies that can evaluate a whole panel in one vectorized pass
+        override this. Returning None tells callers to fall back to
+        generate_signals.
+        """
+        return None
+    
     def calculate_performance(self, portfolio):
         """Calculate strategy performance metrics"""
         total_value = portfolio.total_value
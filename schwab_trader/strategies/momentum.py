@@ -1,4 +1,4 @@
-from .base import TradingStrategy
+from .base import TradingStrategy, SIGNAL_BUY, SIGNAL_SELL, rolling_mean
 import pandas as pd
 import numpy as np
 
@@ -46,6 +46,23 @@ class MomentumStrategy(TradingStrategy):
         self.signals.extend(signals)
         return signals
     
+    def generate_signal_matrix(self, panel):
+        """Vectorized momentum signals for every date and symbol of a PricePanel"""
+        close = panel.close
+        volume = panel.volume
+        
+        # Day-over-day price change and volume relative to its trailing average
+        previous_close = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_change = close / previous_close - 1
+            volume_ratio = volume / rolling_mean(volume, self.lookback_period)
+        
+        strong_volume = volume_ratio > self.volume_threshold
+        signals = np.zeros(close.shape, dtype=np.int8)
+        signals[(price_change > self.price_threshold) & strong_volume] = SIGNAL_BUY
+        signals[(price_change < -self.price_threshold) & strong_volume] = SIGNAL_SELL
+        return signals
+    
     def calculate_position_size(self, portfolio, signal):
         """Calculate position size based on portfolio value and risk parameters"""
         if signal['action'] == 'HOLD':
@@ -1,4 +1,4 @@
-from .base import TradingStrategy
+from .base import TradingStrategy, SIGNAL_BUY, SIGNAL_SELL, rolling_mean
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -87,6 +87,25 @@ class SentimentVolumeStrategy(TradingStrategy):
         self.signals.extend(signals)
         return signals
     
+    def generate_signal_matrix(self, panel):
+        """Vectorized volume baseline signals for every date and symbol of a PricePanel
+        
+        The baseline is the trailing ``lookback_days`` mean, so it follows
+        the volume level instead of being fixed at the first observation.
+        """
+        volume = panel.volume
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = volume / rolling_mean(volume, self.lookback_days)
+        
+        liquid = volume >= self.min_volume
+        buy = liquid & (volume_ratio >= self.volume_increase_threshold)
+        sell = liquid & ~buy & (volume_ratio <= 1.0)
+        
+        signals = np.zeros(volume.shape, dtype=np.int8)
+        signals[buy] = SIGNAL_BUY
+        signals[sell] = SIGNAL_SELL
+        return signals
+    
     def calculate_position_size(self, portfolio, signal):
         """Calculate position size based on portfolio value and risk parameters"""
         if signal['action'] == 'HOLD':
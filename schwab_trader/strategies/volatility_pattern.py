@@ -1,4 +1,4 @@
-from .base import TradingStrategy
+from .base import TradingStrategy, SIGNAL_BUY, SIGNAL_SELL, rolling_mean
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -161,6 +161,56 @@ class VolatilityPatternStrategy(TradingStrategy):
         self.signals.extend(signals)
         return signals
     
+    def generate_signal_matrix(self, panel):
+        """Vectorized volume pattern signals for every date and symbol of a PricePanel
+        
+        The top 15 volatile stocks are picked once from the first
+        ``pattern_lookback`` bars, mirroring generate_signals. Volume is
+        compared to its trailing ``pattern_lookback`` mean; the profit target
+        depends on entry prices, so that part steps through dates with each
+        step vectorized across symbols.
+        """
+        close = panel.close
+        volume = panel.volume
+        n_dates, n_symbols = close.shape
+        signals = np.zeros(close.shape, dtype=np.int8)
+        lookback = self.pattern_lookback
+        if n_dates < lookback:
+            return signals
+        
+        # Select top volatile stocks from the first lookback window
+        window = close[:lookback]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volatility = np.std(np.diff(window, axis=0) / window[:-1], axis=0)
+        eligible = (
+            ~np.isnan(volatility) &
+            (close[lookback - 1] >= self.min_price) &
+            (volume[lookback - 1] >= self.min_volume)
+        )
+        candidates = np.flatnonzero(eligible)
+        ranked = candidates[np.argsort(-volatility[candidates], kind='stable')][:15]
+        top = np.zeros(n_symbols, dtype=bool)
+        top[ranked] = True
+        self.top_stocks = {panel.symbols[j] for j in ranked}
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = volume / rolling_mean(volume, lookback)
+        buy = top & (volume_ratio >= self.volume_increase_threshold)
+        volume_sell = top & ~buy & (volume_ratio >= self.volume_decrease_threshold)
+        
+        # Walk forward for the profit target, which depends on entry prices
+        entry_prices = np.full(n_symbols, np.nan)
+        for i in range(lookback - 1, n_dates):
+            with np.errstate(invalid='ignore'):
+                profit = (close[i] - entry_prices) >= self.price_profit_target
+            sell = volume_sell[i] | (top & ~buy[i] & profit)
+            signals[i, buy[i]] = SIGNAL_BUY
+            signals[i, sell] = SIGNAL_SELL
+            entry_prices = np.where(buy[i], close[i], entry_prices)
+            entry_prices[sell] = np.nan
+        
+        return signals
+    
     def calculate_position_size(self, portfolio, signal):
         """Calculate position size based on portfolio value and risk parameters"""
         if signal['action'] == 'HOLD':
@@ -1,22 +1,44 @@
 """Example volume-based trading strategy."""
 import pandas as pd
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from datetime import datetime
+from schwab_trader import indicators
+
+INDICATOR_COLUMNS = ('SMA_20', 'SMA_50', 'RSI', 'MACD', 'Signal_Line')
+
+def add_indicator_columns(data: pd.DataFrame) -> pd.DataFrame:
+    """Attach the indicator columns the strategies read, computed once over the whole history.
+
+    Every indicator only looks backwards, so the value at a timestamp equals
+    what recomputing over ``data.loc[:timestamp]`` would give.
+    """
+    close = data['Close'].to_numpy(dtype=float)
+    data['SMA_20'] = indicators.sma(close, 20)
+    data['SMA_50'] = indicators.sma(close, 50)
+    data['RSI'] = indicators.rsi(close)
+    data['MACD'], data['Signal_Line'], _ = indicators.macd(close)
+    return data
+
+def _ensure_indicators(data: pd.DataFrame) -> None:
+    """Add indicator columns when a caller did not precompute them."""
+    if any(column not in data.columns for column in INDICATOR_COLUMNS):
+        add_indicator_columns(data)
 
 def volume_strategy(data: pd.DataFrame, timestamp: datetime) -> List[Dict]:
     """Volume-based trading strategy with realistic signals."""
     signals = []
+    _ensure_indicators(data)
     
     # Calculate volume indicators
-    current_volume = data.loc[timestamp, 'Volume']
-    volume_ma = data.loc[timestamp, 'Volume_MA']
-    liquidity = data.loc[timestamp, 'Liquidity']
+    current_volume = data.at[timestamp, 'Volume']
+    volume_ma = data.at[timestamp, 'Volume_MA']
+    liquidity = data.at[timestamp, 'Liquidity']
     
     # Calculate price momentum
-    price = data.loc[timestamp, 'Close']
-    price_ma_20 = data.loc[:timestamp, 'Close'].rolling(window=20).mean().iloc[-1]
-    price_ma_50 = data.loc[:timestamp, 'Close'].rolling(window=50).mean().iloc[-1]
+    price = data.at[timestamp, 'Close']
+    price_ma_20 = data.at[timestamp, 'SMA_20']
+    price_ma_50 = data.at[timestamp, 'SMA_50']
     
     # Volume breakout signal
     if current_volume > volume_ma * 1.5:  # 50% above average volume
@@ -57,11 +79,12 @@ def volume_strategy(data: pd.DataFrame, timestamp: datetime) -> List[Dict]:
 def momentum_strategy(data: pd.DataFrame, timestamp: datetime) -> List[Dict]:
     """Momentum-based trading strategy."""
     signals = []
+    _ensure_indicators(data)
     
     # Calculate momentum indicators
-    price = data.loc[timestamp, 'Close']
-    rsi = calculate_rsi(data.loc[:timestamp, 'Close'])
-    macd, signal_line = calculate_macd(data.loc[:timestamp, 'Close'])
+    rsi = data.at[timestamp, 'RSI']
+    macd = data.at[timestamp, 'MACD']
+    signal_line = data.at[timestamp, 'Signal_Line']
     
     # RSI signals
     if rsi < 30:  # Oversold
@@ -91,18 +114,11 @@ def momentum_strategy(data: pd.DataFrame, timestamp: datetime) -> List[Dict]:
     
     return signals
 
-def calculate_rsi(prices: pd.Series, period: int = 14) -> float:
+def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
     """Calculate Relative Strength Index."""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
+    return pd.Series(indicators.rsi(prices.to_numpy(dtype=float), period), index=prices.index)
 
 def calculate_macd(prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[float, float]:
     """Calculate MACD indicator."""
-    exp1 = prices.ewm(span=fast, adjust=False).mean()
-    exp2 = prices.ewm(span=slow, adjust=False).mean()
-    macd = exp1 - exp2
-    signal_line = macd.ewm(span=signal, adjust=False).mean()
-    return macd.iloc[-1], signal_line.iloc[-1] 
\ No newline at end of file
+    macd, signal_line, _ = indicators.macd(prices.to_numpy(dtype=float), fast, slow, signal)
+    return macd[-1], signal_line[-1]
@@ -0,0 +1,73 @@
+import os
+import time
+import logging
+from threading import Event, Thread
+from schwab_trader.services.alert_engine import AlertEngine
+from schwab_trader.services.quote_batcher import alpha_vantage_batcher
+
+logger = logging.getLogger('alert_monitor')
+
+
+def load_active_alerts(engine):
+    """Load every active, untriggered alert into the engine."""
+    from schwab_trader.models import Alert
+    alerts = Alert.query.filter_by(active=True, triggered=False).all()
+    count = engine.load(alerts)
+    logger.info(f"Loaded {count} active alerts for {len(engine.symbols())} symbols")
+    return count
+
+
+def record_triggered(engine):
+    """Mark alerts the engine has fired as triggered."""
+    from schwab_trader.models import db, Alert
+    triggered = engine.drain()
+    if not triggered:
+        return 0
+    by_id = {item.rule.id: item for item in triggered}
+    for alert in Alert.query.filter(Alert.id.in_(list(by_id))).all():
+        alert.triggered = True
+        alert.triggered_at = by_id[alert.id].triggered_at
+    db.session.commit()
+    return len(triggered)
+
+
+def run_alert_cycle(engine, quotes):
+    """Quote every symbol with alerts in batched requests and evaluate the ticks."""
+    symbols = engine.symbols()
+    if not symbols:
+        return []
+    ticks = [quote for quote in quotes.get_many(symbols).values() if quote]
+    return engine.process_many(ticks)
+
+
+def start_alert_monitor(app, engine=None, quotes=None, interval_seconds=15, reload_seconds=60):
+    """Evaluate alerts against fresh quotes in a background thread.
+
+    Returns the thread and an event that stops it when set.
+    """
+    engine = engine or AlertEngine(volume_history=getattr(getattr(app, 'volume_analysis', None), 'volume_history', None))
+    if quotes is None:
+        api_key = os.getenv('ALPHA_VANTAGE_API_KEY')
+        if not api_key:
+            raise ValueError("ALPHA_VANTAGE_API_KEY environment variable not set")
+        quotes = alpha_vantage_batcher(api_key)
+    stop = Event()
+
+    def monitor_loop():
+        loaded_at = 0.0
+        while not stop.is_set():
+            try:
+                with app.app_context():
+                    if time.monotonic() - loaded_at >= reload_seconds:
+                        load_active_alerts(engine)
+                        loaded_at = time.monotonic()
+                    run_alert_cycle(engine, quotes)
+                    record_triggered(engine)
+            except Exception as e:
+                logger.error(f"Error in alert monitor loop: {str(e)}")
+            stop.wait(interval_seconds)
+
+    thread = Thread(target=monitor_loop, daemon=True)
+    thread.start()
+    logger.info(f"Alert monitor started with {interval_seconds} second interval")
+    return thread, stop
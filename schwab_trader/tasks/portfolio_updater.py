@@ -7,6 +7,9 @@ import requests
 from flask import current_app
 from collections import defaultdict
 from threading import Thread
+from schwab_trader.services.quote_batcher import alpha_vantage_batcher
+from schwab_trader.utils.cache import cached, get_cache
+from schwab_trader.utils.single_flight import single_flight
 
 # Configure logging
 logger = logging.getLogger('portfolio_updater')
@@ -20,8 +23,9 @@ class AlphaVantageAPI:
         self.api_key = api_key
         self.base_url = 'https://www.alphavantage.co/query'
         
+    @single_flight(key=lambda self, symbol: symbol.upper())
     def get_quote(self, symbol):
-        """Get real-time quote for a symbol."""
+        """Get real-time quote for a symbol; concurrent requests for it share one call."""
         params = {
             'function': 'GLOBAL_QUOTE',
             'symbol': symbol,
@@ -33,8 +37,9 @@ class AlphaVantageAPI:
             return data['Global Quote']
         return None
         
+    @cached(get_cache('company_overview', max_entries=2048), ttl=86400)
     def get_company_info(self, symbol):
-        """Get company overview including sector and additional metrics."""
+        """Get company overview including sector and additional metrics; cached for a day."""
         params = {
             'function': 'OVERVIEW',
             'symbol': symbol,
@@ -61,6 +66,7 @@ def update_portfolio_data():
         if not api_key:
             raise ValueError("ALPHA_VANTAGE_API_KEY environment variable not set")
         api = AlphaVantageAPI(api_key)
+        quotes = alpha_vantage_batcher(api_key)
         
         with current_app.app_context():
             from schwab_trader.models import db, Portfolio, Position, Sector
@@ -81,10 +87,12 @@ def update_portfolio_data():
             total_cost = 0
             total_day_change = 0
             
+            # Quote every position in a few batched requests
+            position_quotes = quotes.get_many(position.symbol for position in positions)
+            
             for position in positions:
                 try:
-                    # Get real-time quote
-                    quote = api.get_quote(position.symbol)
+                    quote = position_quotes.get(position.symbol)
                     if not quote:
                         logger.warning(f"Could not get quote for {position.symbol}")
                         continue
@@ -93,10 +101,10 @@ def update_portfolio_data():
                     company_info = api.get_company_info(position.symbol)
                     
                     # Update position data
-                    position.price = float(quote['05. price'])
+                    position.price = quote['price']
                     position.market_value = position.quantity * position.price
-                    position.day_change_dollar = float(quote['09. change'])
-                    position.day_change_percent = float(quote['10. change percent'].replace('%', ''))
+                    position.day_change_dollar = quote['change'] or 0.0
+                    position.day_change_percent = quote['change_percent'] or 0.0
                     
                     # Add additional metrics if available
                     if company_info:
@@ -107,7 +115,7 @@ def update_portfolio_data():
                         position.dividend_yield = float(company_info.get('DividendYield', 0))
                         position.eps = float(company_info.get('EPS', 0))
                         position.beta = float(company_info.get('Beta', 0))
-                        position.volume = float(quote.get('06. volume', 0))
+                        position.volume = quote['volume'] or 0.0
                     
                     # Update totals
                     sector_totals[position.sector] += position.market_value
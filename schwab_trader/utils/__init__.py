@@ -17,8 +17,15 @@ from .auth_decorators import require_schwab_auth, require_schwab_token
 from .config_utils import get_config
 from .data_validation import DataValidator
 from .api_utils import retry_on_failure, cache_response, handle_api_error
+from .cache import LRUCache, DiskCache, cached, get_cache
+from .circuit_breaker import CircuitBreaker, circuit_breaker, get_breaker
+from .market_calendar import MarketCalendar, market_ttl
+from .single_flight import SingleFlight, AsyncSingleFlight, single_flight
 from .visualization import TechnicalAnalysisVisualizer
 from .backtester import StrategyBacktester
+from .price_panel import PricePanel
+from .parameter_sweep import ParameterSweep
+from .walk_forward import WalkForwardValidator, walk_forward_splits, walk_forward_windows
 
 __all__ = [
     'AlphaVantageAPI',
@@ -34,6 +41,23 @@ __all__ = [
     'retry_on_failure',
     'cache_response',
     'handle_api_error',
+    'LRUCache',
+    'DiskCache',
+    'cached',
+    'get_cache',
+    'CircuitBreaker',
+    'MarketCalendar',
+    'market_ttl',
+    'circuit_breaker',
+    'get_breaker',
+    'SingleFlight',
+    'AsyncSingleFlight',
+    'single_flight',
     'TechnicalAnalysisVisualizer',
-    'StrategyBacktester'
+    'StrategyBacktester',
+    'PricePanel',
+    'ParameterSweep',
+    'WalkForwardValidator',
+    'walk_forward_splits',
+    'walk_forward_windows'
 ]
@@ -1,17 +1,23 @@
 """Utility functions for API interactions."""
+import hashlib
 import logging
 import time
 from functools import wraps
-from flask import current_app
-from flask_caching import Cache
+from flask import current_app, has_request_context, session
+from .cache import cached, function_key, get_cache
+from .error_utils import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
-# Initialize cache
-cache = Cache(config={'CACHE_TYPE': 'SimpleCache'})
+# Responses of every cache_response-decorated call
+api_response_cache = get_cache('api_responses', max_entries=2048, max_bytes=64 * 1024 * 1024)
 
 def retry_on_failure(max_retries=3, delay=1, backoff=2):
-    """Decorator to retry API calls on failure."""
+    """Decorator to retry API calls on failure.
+    
+    An open circuit breaker is raised at once: retrying could only sleep
+    until the provider is allowed again.
+    """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -19,6 +25,8 @@ def retry_on_failure(max_retries=3, delay=1, backoff=2):
             for attempt in range(max_retries):
                 try:
                     return func(*args, **kwargs)
+                except CircuitOpenError:
+                    raise
                 except Exception as e:
                     last_exception = e
                     if attempt < max_retries - 1:
@@ -32,28 +40,36 @@ def retry_on_failure(max_retries=3, delay=1, backoff=2):
         return wrapper
     return decorator
 
-def cache_response(timeout=300):
-    """Decorator to cache API responses."""
+def caller_identity():
+    """Hash of the signed-in user's access token, or None outside a session."""
+    if not has_request_context():
+        return None
+    token = (session.get('oauth_token') or {}).get('access_token')
+    return hashlib.sha1(token.encode('utf-8')).hexdigest() if token else None
+
+def cache_response(timeout=300, per_user=False):
+    """Decorator to cache API responses in the shared ``api_responses`` cache.
+    
+    Keys are built from the bound arguments without ``self``, so every client
+    instance shares entries. Account data must pass ``per_user=True``: keys
+    then include the caller's token hash, and calls made without a signed-in
+    user bypass the cache.
+    """
+    if not per_user:
+        return cached(api_response_cache, ttl=timeout)
+
     def decorator(func):
+        @cached(api_response_cache, ttl=timeout, key=lambda *args, **kwargs: (
+            caller_identity(), function_key(func, args, kwargs)
+        ))
+        def user_cached(*args, **kwargs):
+            return func(*args, **kwargs)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Create a cache key from function name and arguments
-            cache_key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
-            
-            # Try to get cached response
-            cached_response = cache.get(cache_key)
-            if cached_response is not None:
-                logger.debug(f"Cache hit for {cache_key}")
-                return cached_response
-            
-            # If not in cache, call the function
-            response = func(*args, **kwargs)
-            
-            # Cache the response
-            cache.set(cache_key, response, timeout=timeout)
-            logger.debug(f"Cached response for {cache_key}")
-            
-            return response
+            if caller_identity() is None:
+                return func(*args, **kwargs)
+            return user_cached(*args, **kwargs)
         return wrapper
     return decorator
 
@@ -1,8 +1,126 @@
 import pandas as pd
 import numpy as np
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 from collections import defaultdict
 import plotly.graph_objects as go
+from .price_panel import PricePanel
+from .performance_metrics import compute_metrics, trade_arrays, rolling_volatility, returns_from_equity
+from schwab_trader.strategies.base import SIGNAL_ACTIONS, SIGNAL_HOLD
+
+class Position:
+    """One held symbol's column of a ``SimulatedPortfolio`` ledger."""
+    __slots__ = ('ledger', 'column')
+
+    def __init__(self, ledger, column):
+        self.ledger = ledger
+        self.column = column
+
+    @property
+    def symbol(self):
+        return self.ledger.symbols[self.column]
+
+    @property
+    def quantity(self):
+        return float(self.ledger.quantities[self.column])
+
+    @property
+    def cost_basis(self):
+        return float(self.ledger.cost_basis[self.column])
+
+    @property
+    def price(self):
+        return float(self.ledger.prices[self.column])
+
+    @property
+    def market_value(self):
+        return self.quantity * self.price
+
+
+class SimulatedPortfolio:
+    """Cash and positions ledger for a backtest.
+
+    Held quantities, average costs and last mark prices are arrays indexed
+    by symbol column, in the order of ``symbols`` (the panel's symbols when
+    run by ``StrategyBacktester``); symbols first seen in a fill get a new
+    column. The market value of all positions is kept as a running total:
+    ``mark_prices`` revalues a whole row of closes with one dot product over
+    the held columns whose close changed, and fills only apply the change
+    for their symbol, so valuing the portfolio never walks every position.
+    ``positions`` maps each held symbol to a ``Position`` view of its column.
+    """
+    __slots__ = ('cash_value', 'market_value', 'positions', 'symbols', 'symbol_index',
+                 'quantities', 'cost_basis', 'prices')
+
+    def __init__(self, initial_capital, symbols=()):
+        self.cash_value = initial_capital
+        self.market_value = 0.0
+        self.positions = {}
+        self.symbols = list(symbols)
+        self.symbol_index = {symbol: j for j, symbol in enumerate(self.symbols)}
+        self.quantities = np.zeros(len(self.symbols))
+        self.cost_basis = np.zeros(len(self.symbols))
+        self.prices = np.zeros(len(self.symbols))
+
+    @property
+    def total_value(self):
+        return self.cash_value + self.market_value
+
+    def _column(self, symbol):
+        j = self.symbol_index.get(symbol)
+        if j is None:
+            j = self.symbol_index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.quantities = np.append(self.quantities, 0.0)
+            self.cost_basis = np.append(self.cost_basis, 0.0)
+            self.prices = np.append(self.prices, 0.0)
+        return j
+
+    def mark(self, symbol, price):
+        """Revalue a held symbol at ``price``."""
+        j = self.symbol_index.get(symbol)
+        if j is not None and self.quantities[j] != 0 and price != self.prices[j]:
+            self.market_value += self.quantities[j] * (price - self.prices[j])
+            self.prices[j] = price
+
+    def mark_prices(self, prices):
+        """Revalue every held symbol at a row of closes, one per symbol column.
+
+        Columns whose close is NaN keep their last mark.
+        """
+        columns = np.flatnonzero(
+            (self.quantities[:len(prices)] != 0) & ~np.isnan(prices) & (prices != self.prices[:len(prices)])
+        )
+        if len(columns):
+            marks = prices[columns]
+            self.market_value += float(self.quantities[columns] @ (marks - self.prices[columns]))
+            self.prices[columns] = marks
+
+    def update_position(self, symbol, quantity, price):
+        """Apply a fill of ``quantity`` shares (negative to sell) at ``price``."""
+        j = self._column(symbol)
+        held = self.quantities[j]
+        if held == 0:
+            self.prices[j] = price
+            self.cost_basis[j] = 0.0
+        else:
+            self.mark(symbol, price)
+
+        if quantity > 0:
+            # Average cost across buys
+            self.cost_basis[j] = (held * self.cost_basis[j] + quantity * price) / (held + quantity)
+        self.quantities[j] = held + quantity
+        self.market_value += quantity * price
+        self.cash_value -= quantity * price
+
+        if self.quantities[j] == 0:
+            self.positions.pop(symbol, None)
+            if not self.positions:
+                # Drop rounding drift accumulated in the running total
+                self.market_value = 0.0
+        elif symbol not in self.positions:
+            self.positions[symbol] = Position(self, j)
+
 
 class StrategyBacktester:
     def __init__(self, strategy, initial_capital=100000):
@@ -10,77 +128,74 @@ class StrategyBacktester:
         self.initial_capital = initial_capital
         self.results = None
         
-    def simulate_portfolio(self):
-        """Simulate a portfolio to be used with the strategy"""
-        class SimulatedPortfolio:
-            def __init__(self, initial_capital):
-                self.total_value = initial_capital
-                self.cash_value = initial_capital
-                self.positions = {}
-                
-            def update_position(self, symbol, quantity, price):
-                if symbol not in self.positions:
-                    self.positions[symbol] = {'quantity': 0, 'cost_basis': 0}
-                
-                self.positions[symbol]['quantity'] += quantity
-                if quantity > 0:
-                    self.positions[symbol]['cost_basis'] = price
-                
-                if self.positions[symbol]['quantity'] == 0:
-                    del self.positions[symbol]
-                
-                self.cash_value -= quantity * price
-                self.total_value = self.cash_value + sum(
-                    pos['quantity'] * price 
-                    for pos in self.positions.values()
-                )
-        
-        return SimulatedPortfolio(self.initial_capital)
+    def simulate_portfolio(self, symbols=()):
+        """Simulate a portfolio to be used with the strategy, with a ledger column per symbol"""
+        return SimulatedPortfolio(self.initial_capital, symbols)
 
-    def backtest(self, historical_data, start_date=None, end_date=None):
-        """Run backtest on historical data"""
+    def backtest(self, historical_data, start_date=None, end_date=None, signal_matrix=None):
+        """Run backtest on historical data.
+
+        ``historical_data`` is either ``{symbol: [bar, ...]}`` or a
+        ``PricePanel``; records are packed into a panel once and the loop then
+        steps through dates by integer offset. A precomputed ``signal_matrix``
+        for the whole panel may be passed to skip signal generation, e.g. when
+        several date windows share one set of indicators.
+        """
         # Initialize results storage
         self.results = {
             'trades': [],
             'portfolio_values': [],
             'metrics': defaultdict(list)
         }
-        
+
         # Convert dates if provided
         if start_date:
             start_date = pd.to_datetime(start_date)
         if end_date:
             end_date = pd.to_datetime(end_date)
-        
-        # Initialize portfolio
-        portfolio = self.simulate_portfolio()
-        
-        # Process each day
-        dates = sorted(list(set(
-            d['date'] for data in historical_data.values() 
-            for d in data
-        )))
-        
-        for date in dates:
-            if start_date and date < start_date:
-                continue
-            if end_date and date > end_date:
-                break
-            
-            # Prepare daily data
-            daily_data = {
-                symbol: [d for d in data if d['date'] == date]
-                for symbol, data in historical_data.items()
-            }
-            
+
+        # Pack bars into aligned (dates x symbols) arrays
+        if isinstance(historical_data, PricePanel):
+            panel = historical_data
+        else:
+            panel = PricePanel.from_records(historical_data)
+
+        # Initialize portfolio, its ledger columns matching the panel's
+        portfolio = self.simulate_portfolio(panel.symbols)
+
+        dates = panel.dates
+        first = bisect_left(dates, start_date) if start_date else 0
+        last = bisect_right(dates, end_date) if end_date else len(dates)
+        closes = panel.close
+
+        # Use the strategy's vectorized signals when it provides them
+        generate_signal_matrix = getattr(self.strategy, 'generate_signal_matrix', None)
+        if signal_matrix is None and generate_signal_matrix is not None:
+            signal_matrix = generate_signal_matrix(panel)
+
+        symbol_index = panel.symbol_index
+
+        for i in range(first, last):
+            date = dates[i]
+
+            # Mark held symbols to today's close before sizing new trades
+            portfolio.mark_prices(closes[i])
+
             # Generate signals
-            signals = self.strategy.generate_signals(daily_data)
-            
+            if signal_matrix is not None:
+                signals = self._signals_from_matrix_row(panel, signal_matrix[i])
+            else:
+                daily_data = panel.bars(i)
+                signals = self.strategy.generate_signals(daily_data)
+
             # Execute trades
             for signal in signals:
                 symbol = signal['symbol']
-                price = daily_data[symbol][0]['close']
-                
+                price = closes[i, symbol_index[symbol]]
+                if np.isnan(price):
+                    continue
+                price = float(price)
+
                 if signal['action'] == 'BUY':
                     # Calculate position size
                     position_value = self.strategy.calculate_position_size(portfolio, signal)
@@ -100,7 +215,7 @@ class StrategyBacktester:
                 
                 elif signal['action'] == 'SELL':
                     if symbol in portfolio.positions:
-                        quantity = portfolio.positions[symbol]['quantity']
+                        quantity = portfolio.positions[symbol].quantity
                         portfolio.update_position(symbol, -quantity, price)
                         self.results['trades'].append({
                             'date': date,
@@ -127,6 +242,13 @@ class StrategyBacktester:
         
         return self.results
 
+    def _signals_from_matrix_row(self, panel, row):
+        """Convert one date's row of signal codes into signal dicts"""
+        return [
+            {'symbol': panel.symbols[j], 'action': SIGNAL_ACTIONS[code]}
+            for j, code in zip(np.flatnonzero(row).tolist(), row[row != SIGNAL_HOLD].tolist())
+        ]
+
     def _calculate_daily_metrics(self, date, portfolio):
         """Calculate daily performance metrics"""
         self.results['metrics']['dates'].append(date)
@@ -148,59 +270,14 @@ class StrategyBacktester:
 
     def _calculate_performance_metrics(self):
         """Calculate overall performance metrics"""
-        returns = pd.Series(self.results['metrics']['daily_returns'])
-        
-        self.results['performance'] = {
-            'total_return': (
-                self.results['metrics']['portfolio_value'][-1] / 
-                self.initial_capital - 1
-            ),
-            'annualized_return': (
-                (1 + returns.mean()) ** 252 - 1
-                if len(returns) > 0 else 0
-            ),
-            'sharpe_ratio': (
-                np.sqrt(252) * returns.mean() / returns.std()
-                if len(returns) > 0 and returns.std() > 0 else 0
-            ),
-            'max_drawdown': self._calculate_max_drawdown(
-                self.results['metrics']['portfolio_value']
-            ),
-            'win_rate': self._calculate_win_rate(
-                self.results['trades']
-            )
-        }
+        equity = np.array([self.initial_capital] + self.results['metrics']['portfolio_value'], dtype=float)
+        trades = trade_arrays(self.results['trades']) if self.results['trades'] else None
 
-    def _calculate_max_drawdown(self, portfolio_values):
-        """Calculate maximum drawdown"""
-        peak = portfolio_values[0]
-        max_drawdown = 0
-        
-        for value in portfolio_values:
-            if value > peak:
-                peak = value
-            drawdown = (peak - value) / peak
-            max_drawdown = max(max_drawdown, drawdown)
-        
-        return max_drawdown
-
-    def _calculate_win_rate(self, trades):
-        """Calculate win rate from trades"""
-        if not trades:
-            return 0
-            
-        profitable_trades = sum(
-            1 for trade in trades
-            if trade['action'] == 'SELL' and
-            trade['price'] > trade.get('entry_price', 0)
-        )
-        
-        total_trades = sum(
-            1 for trade in trades
-            if trade['action'] == 'SELL'
-        )
-        
-        return profitable_trades / total_trades if total_trades > 0 else 0
+        self.results['performance'] = compute_metrics(equity, trades)
+        # One entry per simulated day, aligned with metrics['dates']
+        self.results['metrics']['rolling_volatility'] = rolling_volatility(
+            returns_from_equity(equity), window=21
+        ).tolist()
 
     def plot_results(self, visualizer=None):
         """Plot backtest results"""
@@ -0,0 +1,389 @@
+"""Bounded LRU/TTL caches with an optional disk tier, shared across the app."""
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timedelta
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from schwab_trader.config.market_config import get_directory_path
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+def _canonical(value: Any) -> str:
+    """A representation of ``value`` that is equal for equal arguments across processes."""
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return repr(value)
+    if isinstance(value, (datetime, date, dt_time, pd.Timestamp)):
+        return f"{type(value).__name__}({value.isoformat()})"
+    if isinstance(value, timedelta):
+        return f"timedelta({value.total_seconds()})"
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}({','.join(_canonical(item) for item in value)})"
+    if isinstance(value, (set, frozenset)):
+        return f"set({','.join(sorted(_canonical(item) for item in value))})"
+    if isinstance(value, dict):
+        items = sorted((_canonical(key), _canonical(item)) for key, item in value.items())
+        return f"dict({','.join(f'{key}:{item}' for key, item in items)})"
+    if isinstance(value, np.ndarray):
+        return f"ndarray({value.dtype},{value.shape},{hashlib.sha1(value.tobytes()).hexdigest()})"
+    if isinstance(value, np.generic):
+        return repr(value.item())
+    return repr(value)
+
+
+def make_key(*parts: Any) -> str:
+    """Stable cache key for a sequence of values."""
+    return hashlib.sha1(_canonical(parts).encode('utf-8')).hexdigest()
+
+
+def function_key(func: Callable, args: tuple, kwargs: dict) -> str:
+    """Key for a call of ``func``, ignoring ``self``/``cls``.
+
+    Arguments are bound to the signature with defaults applied, so
+    ``f('AAPL')``, ``f('AAPL', period='1y')`` and ``f(symbol='AAPL')`` share
+    an entry when ``period`` defaults to ``'1y'``; instances of a class share
+    entries for the same arguments.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+    try:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+    except (TypeError, ValueError):
+        return make_key(name, args, kwargs)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    for skipped in ('self', 'cls'):
+        arguments.pop(skipped, None)
+    return make_key(name, arguments)
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate size of a cached value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class CacheStats:
+    """Hit, miss and eviction counters of one cache."""
+
+    __slots__ = ('hits', 'misses', 'sets', 'evictions', 'expirations', 'disk_hits', 'spills')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        lookups = self.hits + self.misses
+        stats['hit_rate'] = self.hits / lookups if lookups else 0.0
+        return stats
+
+
+class DiskCache:
+    """Pickled entries in a directory, bounded by total bytes.
+
+    Each entry is one file named after its key; the oldest files are removed
+    when the directory grows past ``max_bytes``.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.pkl")
+
+    def get(self, key: str) -> Any:
+        """The value, or ``MISSING`` if absent, expired or unreadable."""
+        return self.entry(key)[0]
+
+    def entry(self, key: str) -> Tuple[Any, Optional[float]]:
+        """``(value, expires_at)``, with ``MISSING`` as the value if there is no live entry."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                stored_key, expires_at, value = pickle.load(f)
+        except FileNotFoundError:
+            return MISSING, None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache file {path}: {str(e)}")
+            self._remove(path)
+            return MISSING, None
+        if stored_key != key:
+            return MISSING, None
+        if expires_at is not None and expires_at <= time.time():
+            self._remove(path)
+            return MISSING, None
+        return value, expires_at
+
+    def set(self, key: str, value: Any, expires_at: Optional[float] = None) -> None:
+        """Write an entry; ``expires_at`` is wall-clock time since entries outlive the process."""
+        path = self._path(key)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp, 'wb') as f:
+                pickle.dump((key, expires_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, path)
+        except Exception as e:
+            logger.warning(f"Could not write cache file {path}: {str(e)}")
+            self._remove(temp)
+            return
+        self._trim()
+
+    def delete(self, key: str) -> None:
+        self._remove(self._path(key))
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            self._remove(entry.path)
+
+    def _entries(self):
+        try:
+            return [entry for entry in os.scandir(self.directory) if entry.name.endswith('.pkl')]
+        except FileNotFoundError:
+            return []
+
+    def _trim(self) -> None:
+        with self._lock:
+            entries = []
+            for entry in self._entries():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class LRUCache:
+    """Thread-safe in-memory cache bounded by entries and bytes, with per-entry TTL.
+
+    The least recently used entries are evicted first. With a ``disk`` tier,
+    evicted entries that have not expired spill to it, and memory misses are
+    looked up there and promoted back.
+    """
+
+    def __init__(self, name: str = 'cache', max_entries: int = 1024, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = 300.0, disk: Optional[DiskCache] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk = disk
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        # key -> (value, monotonic expiry or None, size in bytes)
+        self._entries: 'OrderedDict[str, Tuple[Any, Optional[float], int]]' = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._get(key)
+        return default if value is MISSING else value
+
+    def _get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return value
+                self._discard(key)
+                self.stats.expirations += 1
+
+        if self.disk is not None:
+            value, expires_at = self.disk.entry(key)
+            if value is not MISSING:
+                with self._lock:
+                    self.stats.hits += 1
+                    self.stats.disk_hits += 1
+                self.set(key, value, expires_at - time.time() if expires_at is not None else None)
+                return value
+
+        with self._lock:
+            self.stats.misses += 1
+        return MISSING
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = MISSING) -> None:
+        """Store ``value``; ``ttl`` overrides the cache default and ``None`` never expires.
+
+        Either TTL may be a callable returning seconds, evaluated when the
+        value is stored, e.g. ``market_calendar.market_ttl``.
+        """
+        ttl = self.ttl if ttl is MISSING else ttl
+        if callable(ttl):
+            ttl = ttl()
+        if ttl is not None and ttl <= 0:
+            return
+        size = estimate_size(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"Not caching {size} byte value in {self.name}")
+            return
+
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            self.stats.sets += 1
+            evicted = self._evict()
+
+        self._spill(evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk is not None:
+            self.disk.clear()
+
+    def get_or_set(self, key: str, factory: Callable[[], Any], ttl: Optional[float] = MISSING) -> Any:
+        """Cached value for ``key``, computing and storing it with ``factory`` on a miss."""
+        value = self._get(key)
+        if value is MISSING:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _evict(self):
+        """Drop least recently used entries until within bounds; returns those worth spilling."""
+        evicted = []
+        now = time.monotonic()
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key, (value, expires_at, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            if expires_at is not None and expires_at <= now:
+                self.stats.expirations += 1
+                continue
+            self.stats.evictions += 1
+            evicted.append((key, value, expires_at))
+        return evicted
+
+    def _spill(self, evicted) -> None:
+        if self.disk is None or not evicted:
+            return
+        now_monotonic, now_wall = time.monotonic(), time.time()
+        for key, value, expires_at in evicted:
+            wall_expiry = now_wall + (expires_at - now_monotonic) if expires_at is not None else None
+            self.disk.set(key, value, wall_expiry)
+        with self._lock:
+            self.stats.spills += len(evicted)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats.to_dict(),
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes
+            }
+
+
+_caches: Dict[str, LRUCache] = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(name: str, max_entries: int = 1024, max_bytes: Optional[int] = None, ttl: Optional[float] = 300.0,
+              disk: bool = False, disk_max_bytes: int = 256 * 1024 * 1024) -> LRUCache:
+    """Return the process-wide cache called ``name``, creating it on first use.
+
+    With ``disk=True`` evicted entries spill to ``data/cache/<name>``.
+    """
+    with _registry_lock:
+        if name not in _caches:
+            tier = DiskCache(os.path.join(get_directory_path('cache'), name), disk_max_bytes) if disk else None
+            _caches[name] = LRUCache(name, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, disk=tier)
+        return _caches[name]
+
+
+def cache_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every registered cache, keyed by name."""
+    with _registry_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.metrics() for cache in caches}
+
+
+def cached(cache: Optional[LRUCache] = None, ttl: Optional[float] = MISSING,
+           key: Optional[Callable[..., Any]] = None):
+    """Decorator caching a function's results.
+
+    Keys come from ``function_key`` unless ``key`` is given, in which case
+    it receives the call's arguments. ``None`` results are not cached.
+    """
+    def decorator(func):
+        store = cache if cache is not None else get_cache('functions')
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = function_key(func, args, kwargs) if key is None else make_key(name, key(*args, **kwargs))
+            value = store.get(cache_key, MISSING)
+            if value is not MISSING:
+                return value
+            value = func(*args, **kwargs)
+            if value is not None:
+                store.set(cache_key, value, ttl)
+            return value
+
+        wrapper.cache = store
+        return wrapper
+    return decorator
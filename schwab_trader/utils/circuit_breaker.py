@@ -0,0 +1,198 @@
+"""Per-provider circuit breakers shared across the market data clients."""
+import logging
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+from .error_utils import APIError, CircuitOpenError, NetworkError, RateLimitError, TimeoutError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """Whether an exception says the provider is unhealthy.
+
+    Network errors, timeouts, rate limiting and HTTP 5xx count; client-side
+    problems such as a 404 for an unknown symbol or a missing login do not.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (RateLimitError, NetworkError, APIError, TimeoutError)):
+        return True
+    # requests errors carry the response; aiohttp errors carry the status
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is None:
+        status = getattr(error, 'status', None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    # requests exceptions are OSErrors too
+    return isinstance(error, OSError)
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker for one provider.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail immediately with ``CircuitOpenError`` for
+    ``recovery_timeout`` seconds; rate limiting opens it at once for
+    ``rate_limit_timeout``. Then up to ``half_open_max_calls`` trial calls
+    are let through: a success closes the circuit, a failure opens it again.
+    Checks never sleep, so callers can move on to another provider.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 rate_limit_timeout: float = 60.0, half_open_max_calls: int = 1,
+                 is_failure: Callable[[Exception], bool] = is_provider_failure):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.rate_limit_timeout = rate_limit_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.is_failure = is_failure
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._open_for = recovery_timeout
+        self._trials = 0
+        self._counts = {'successes': 0, 'failures': 0, 'rejections': 0, 'opens': 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._open_for:
+            self._state = HALF_OPEN
+            self._trials = 0
+        return self._state
+
+    def _retry_after(self) -> float:
+        if self._current_state() != OPEN:
+            return 0.0
+        return max(0.0, self._open_for - (time.monotonic() - self._opened_at))
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a trial call through."""
+        with self._lock:
+            return self._retry_after()
+
+    def allow_request(self) -> bool:
+        """Reserve a call if the circuit permits one; every reserved call must be recorded."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._trials < self.half_open_max_calls:
+                self._trials += 1
+                return True
+            self._counts['rejections'] += 1
+            return False
+
+    def check(self) -> None:
+        """Reserve a call or raise ``CircuitOpenError``."""
+        if not self.allow_request():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._counts['successes'] += 1
+            self._failures = 0
+            if self._state != CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self._state = CLOSED
+
+    def release(self) -> None:
+        """Give back a reserved call that never reached the provider."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def record_failure(self, error: Optional[Exception] = None) -> None:
+        with self._lock:
+            self._counts['failures'] += 1
+            self._failures += 1
+            rate_limited = isinstance(error, RateLimitError) or (
+                getattr(getattr(error, 'response', None), 'status_code', None) == 429
+            )
+            if self._state == HALF_OPEN or rate_limited or self._failures >= self.failure_threshold:
+                self._open(self.rate_limit_timeout if rate_limited else self.recovery_timeout)
+
+    def _open(self, duration: float) -> None:
+        if self._state != OPEN:
+            self._counts['opens'] += 1
+            logger.warning(f"Circuit {self.name} opened for {duration:.0f}s after {self._failures} failures")
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._open_for = duration
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run ``func`` through the breaker."""
+        self.check()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure(e)
+            else:
+                self.release()
+            raise
+        self.record_success()
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trials = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self._current_state(),
+                'consecutive_failures': self._failures,
+                'retry_after': self._retry_after(),
+                **self._counts
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str, **options) -> CircuitBreaker:
+    """Return the process-wide breaker for a provider, creating it on first use."""
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **options)
+        return _breakers[name]
+
+
+def breaker_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every breaker, keyed by provider."""
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.metrics() for breaker in breakers}
+
+
+def reset_breakers() -> None:
+    """Close every breaker, e.g. after fixing credentials or between tests."""
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    for breaker in breakers:
+        breaker.reset()
+
+
+def circuit_breaker(name: str, **options):
+    """Decorator routing calls through the breaker for provider ``name``."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_breaker(name, **options).call(func, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -139,6 +139,18 @@ class RateLimitError(AppError):
             code="RATE_LIMIT_ERROR"
         )
 
+class CircuitOpenError(AppError):
+    """Raised without calling a provider whose circuit breaker is open."""
+    def __init__(self, provider: str, retry_after: float = 0.0):
+        super().__init__(
+            message=f"{provider} is unavailable; retry in {retry_after:.0f}s",
+            status_code=503,
+            code="CIRCUIT_OPEN",
+            payload={'provider': provider, 'retry_after': retry_after}
+        )
+        self.provider = provider
+        self.retry_after = retry_after
+
 def handle_error(error: Exception) -> tuple:
     """Global error handler for the application."""
     if isinstance(error, AppError):
@@ -0,0 +1,237 @@
+"""NYSE trading calendar: sessions, holidays, early closes and market-aware cache TTLs."""
+import logging
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+MARKET_TIMEZONE = ZoneInfo('America/New_York')
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+# One-off closures not covered by the holiday rules
+SPECIAL_CLOSURES = {
+    date(2012, 10, 29): 'Hurricane Sandy',
+    date(2012, 10, 30): 'Hurricane Sandy',
+    date(2018, 12, 5): 'National Day of Mourning for George H.W. Bush',
+    date(2025, 1, 9): 'National Day of Mourning for Jimmy Carter',
+}
+
+
+def _easter(year: int) -> date:
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The ``n``-th ``weekday`` (Monday is 0) of a month; ``n=-1`` is the last."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays are observed on Friday, Sunday ones on Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def nyse_holidays(year: int) -> Dict[date, str]:
+    """Full-day NYSE closures in ``year``."""
+    holidays = {}
+    new_year = date(year, 1, 1)
+    # A Saturday New Year's Day is not observed on the Friday before
+    if new_year.weekday() != 5:
+        holidays[_observed(new_year)] = "New Year's Day"
+    if year >= 1998:
+        holidays[_nth_weekday(year, 1, 0, 3)] = 'Martin Luther King Jr. Day'
+    holidays[_nth_weekday(year, 2, 0, 3)] = "Washington's Birthday"
+    holidays[_easter(year) - timedelta(days=2)] = 'Good Friday'
+    holidays[_nth_weekday(year, 5, 0, -1)] = 'Memorial Day'
+    if year >= 2022:
+        holidays[_observed(date(year, 6, 19))] = 'Juneteenth'
+    holidays[_observed(date(year, 7, 4))] = 'Independence Day'
+    holidays[_nth_weekday(year, 9, 0, 1)] = 'Labor Day'
+    holidays[_nth_weekday(year, 11, 3, 4)] = 'Thanksgiving Day'
+    holidays[_observed(date(year, 12, 25))] = 'Christmas Day'
+    holidays.update({day: name for day, name in SPECIAL_CLOSURES.items() if day.year == year})
+    return holidays
+
+
+@lru_cache(maxsize=None)
+def nyse_early_closes(year: int) -> Dict[date, str]:
+    """Sessions closing at 1:00 PM ET in ``year``."""
+    early = {}
+    independence_day = date(year, 7, 4)
+    if independence_day.weekday() in (1, 2, 3, 4):
+        early[date(year, 7, 3)] = 'Independence Day Eve'
+    early[_nth_weekday(year, 11, 3, 4) + timedelta(days=1)] = 'Day after Thanksgiving'
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() in (0, 1, 2, 3):
+        early[christmas_eve] = 'Christmas Eve'
+    return early
+
+
+class MarketCalendar:
+    """Regular NYSE sessions in Eastern time.
+
+    Datetimes passed in may be naive, in which case they are taken as
+    Eastern time, or aware in any zone; returned datetimes are aware.
+    """
+
+    def __init__(self, timezone: ZoneInfo = MARKET_TIMEZONE, open_time: time = MARKET_OPEN,
+                 close_time: time = MARKET_CLOSE, early_close_time: time = EARLY_CLOSE):
+        self.timezone = timezone
+        self.open_time = open_time
+        self.close_time = close_time
+        self.early_close_time = early_close_time
+
+    def now(self) -> datetime:
+        return datetime.now(self.timezone)
+
+    def _localize(self, at: Optional[datetime]) -> datetime:
+        if at is None:
+            return self.now()
+        if at.tzinfo is None:
+            return at.replace(tzinfo=self.timezone)
+        return at.astimezone(self.timezone)
+
+    def holiday(self, day: date) -> Optional[str]:
+        """Name of the holiday closing the market on ``day``, if any."""
+        return nyse_holidays(day.year).get(day)
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in nyse_holidays(day.year)
+
+    def holidays_between(self, start: date, end: date) -> List[date]:
+        """Weekday holidays in ``[start, end]``, e.g. for ``numpy.busday_count``."""
+        return sorted(
+            day
+            for year in range(start.year, end.year + 1)
+            for day in nyse_holidays(year)
+            if start <= day <= end and day.weekday() < 5
+        )
+
+    def is_early_close(self, day: date) -> bool:
+        return self.is_trading_day(day) and day in nyse_early_closes(day.year)
+
+    def session(self, day: date) -> Optional[Tuple[datetime, datetime]]:
+        """Open and close of ``day``'s session, or None when the market is closed all day."""
+        if not self.is_trading_day(day):
+            return None
+        close_time = self.early_close_time if day in nyse_early_closes(day.year) else self.close_time
+        return (
+            datetime.combine(day, self.open_time, tzinfo=self.timezone),
+            datetime.combine(day, close_time, tzinfo=self.timezone)
+        )
+
+    def next_trading_day(self, day: date) -> date:
+        """First trading day after ``day``."""
+        day += timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return day
+
+    def previous_trading_day(self, day: date) -> date:
+        """Last trading day before ``day``."""
+        day -= timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return day
+
+    def is_open(self, at: Optional[datetime] = None) -> bool:
+        """Whether the regular session is in progress."""
+        at = self._localize(at)
+        session = self.session(at.date())
+        return session is not None and session[0] <= at < session[1]
+
+    def next_open(self, at: Optional[datetime] = None) -> datetime:
+        """Start of the next session beginning after ``at``."""
+        at = self._localize(at)
+        session = self.session(at.date())
+        if session is not None and at < session[0]:
+            return session[0]
+        return self.session(self.next_trading_day(at.date()))[0]
+
+    def next_close(self, at: Optional[datetime] = None) -> datetime:
+        """End of the session in progress at ``at``, or of the next one."""
+        at = self._localize(at)
+        session = self.session(at.date())
+        if session is not None and at < session[1]:
+            return session[1]
+        return self.session(self.next_trading_day(at.date()))[1]
+
+    def last_close(self, at: Optional[datetime] = None) -> datetime:
+        """End of the most recent session that closed at or before ``at``."""
+        at = self._localize(at)
+        session = self.session(at.date())
+        if session is not None and session[1] <= at:
+            return session[1]
+        return self.session(self.previous_trading_day(at.date()))[1]
+
+    def minutes_to_close(self, at: Optional[datetime] = None) -> Optional[float]:
+        """Minutes left in the session in progress, or None when closed."""
+        at = self._localize(at)
+        if not self.is_open(at):
+            return None
+        return (self.session(at.date())[1] - at).total_seconds() / 60
+
+    def ttl(self, open_ttl: float, at: Optional[datetime] = None, settle: float = 900) -> float:
+        """Seconds market data fetched at ``at`` stays valid.
+
+        During a session it is ``open_ttl``, cut off at the close so the
+        closing prints are fetched. Within ``settle`` seconds after a close
+        it stays ``open_ttl`` while late prints and official closes arrive.
+        After that quotes and daily bars are final until the next open.
+        """
+        at = self._localize(at)
+        if self.is_open(at):
+            until_close = (self.next_close(at) - at).total_seconds()
+            return max(1.0, min(open_ttl, until_close))
+        since_close = (at - self.last_close(at)).total_seconds()
+        if since_close < settle:
+            return min(open_ttl, settle - since_close)
+        return (self.next_open(at) - at).total_seconds()
+
+    def status(self, at: Optional[datetime] = None) -> Dict[str, object]:
+        """Summary of the market state for display."""
+        at = self._localize(at)
+        is_open = self.is_open(at)
+        return {
+            'is_open': is_open,
+            'holiday': self.holiday(at.date()),
+            'early_close': self.is_early_close(at.date()),
+            'next_open': self.next_open(at).isoformat(),
+            'next_close': self.next_close(at).isoformat(),
+            'timestamp': at.isoformat()
+        }
+
+
+calendar = MarketCalendar()
+
+
+def market_ttl(open_ttl: float, settle: float = 900) -> Callable[[], float]:
+    """TTL callable for caches: ``open_ttl`` while trading, until the next open otherwise."""
+    def ttl() -> float:
+        return calendar.ttl(open_ttl, settle=settle)
+    ttl.__name__ = f"market_ttl_{open_ttl:g}"
+    return ttl
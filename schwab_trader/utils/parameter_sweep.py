@@ -0,0 +1,170 @@
+"""Grid and random parameter sweeps for StrategyBacktester runs."""
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .backtester import StrategyBacktester
+from .price_panel import PricePanel
+
+logger = logging.getLogger(__name__)
+
+# Panel attached once per worker process by _init_worker
+_worker_panel = None
+
+
+def _init_worker(spec):
+    """Attach the shared price panel in a worker process."""
+    global _worker_panel
+    _worker_panel = PricePanel.attach(spec)
+
+
+def _run_point(strategy_class, params, initial_capital, backtest_kwargs, panel=None):
+    """Run one backtest and return its parameters with the performance metrics."""
+    strategy = strategy_class(**params)
+    backtester = StrategyBacktester(strategy, initial_capital=initial_capital)
+    results = backtester.backtest(panel if panel is not None else _worker_panel, **backtest_kwargs)
+    return {**params, **results['performance']}
+
+
+def _run_chunk(strategy_class, param_sets, initial_capital, backtest_kwargs):
+    """Run several sweep points in one task to amortize IPC overhead."""
+    return [
+        _run_point(strategy_class, params, initial_capital, backtest_kwargs)
+        for params in param_sets
+    ]
+
+
+class ParameterSweep:
+    """Fans StrategyBacktester runs over a process pool.
+
+    The price panel is published once, by path for a memory-mapped panel or
+    through shared memory otherwise; each worker attaches to it when it starts
+    instead of receiving a pickled copy per run.
+    """
+
+    def __init__(self, strategy_class, initial_capital=100000, max_workers=None,
+                 rank_by='sharpe_ratio', ascending=False):
+        self.strategy_class = strategy_class
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.rank_by = rank_by
+        self.ascending = ascending
+
+    @staticmethod
+    def grid(param_grid):
+        """Expand ``{name: [values, ...]}`` into every combination."""
+        names = list(param_grid)
+        return [
+            dict(zip(names, combination))
+            for combination in itertools.product(*(param_grid[name] for name in names))
+        ]
+
+    @staticmethod
+    def random(param_space, n_iter, seed=None):
+        """Sample ``n_iter`` parameter sets.
+
+        Each entry of ``param_space`` is either a list of choices or a
+        ``(low, high)`` tuple; tuples of ints sample integers (inclusive),
+        otherwise floats are drawn uniformly.
+        """
+        rng = np.random.default_rng(seed)
+        param_sets = []
+        for _ in range(n_iter):
+            params = {}
+            for name, space in param_space.items():
+                if isinstance(space, tuple):
+                    low, high = space
+                    if isinstance(low, int) and isinstance(high, int):
+                        params[name] = int(rng.integers(low, high + 1))
+                    else:
+                        params[name] = float(rng.uniform(low, high))
+                else:
+                    params[name] = space[rng.integers(len(space))]
+            param_sets.append(params)
+        return param_sets
+
+    def grid_search(self, historical_data, param_grid, **backtest_kwargs):
+        """Run every combination in ``param_grid``."""
+        return self.run(historical_data, self.grid(param_grid), **backtest_kwargs)
+
+    def random_search(self, historical_data, param_space, n_iter, seed=None, **backtest_kwargs):
+        """Run ``n_iter`` randomly sampled parameter sets."""
+        return self.run(historical_data, self.random(param_space, n_iter, seed), **backtest_kwargs)
+
+    def run(self, historical_data, param_sets, start_date=None, end_date=None):
+        """Backtest every parameter set and return a ranked table.
+
+        Args:
+            historical_data: ``{symbol: [bar, ...]}`` records or a PricePanel
+            param_sets: List of keyword-argument dicts for the strategy class
+            start_date: Optional first date to simulate
+            end_date: Optional last date to simulate
+
+        Returns:
+            DataFrame with one row per parameter set, the performance metrics
+            and a ``rank`` column, sorted best first by ``rank_by``.
+        """
+        if isinstance(historical_data, PricePanel):
+            panel = historical_data
+        else:
+            panel = PricePanel.from_records(historical_data)
+        backtest_kwargs = {'start_date': start_date, 'end_date': end_date}
+
+        if self.max_workers == 1 or len(param_sets) <= 1:
+            rows = [
+                _run_point(self.strategy_class, params, self.initial_capital, backtest_kwargs, panel)
+                for params in param_sets
+            ]
+        else:
+            rows = self._run_parallel(panel, param_sets, backtest_kwargs)
+
+        return self._rank(rows)
+
+    def _run_parallel(self, panel, param_sets, backtest_kwargs):
+        """Run sweep points in worker processes sharing one copy of the panel."""
+        # A few chunks per worker keeps them busy without per-point IPC
+        chunk_size = max(1, len(param_sets) // (self.max_workers * 4))
+        chunks = [param_sets[i:i + chunk_size] for i in range(0, len(param_sets), chunk_size)]
+
+        shm, spec = panel.share()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(spec,)
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        _run_chunk,
+                        self.strategy_class,
+                        chunk,
+                        self.initial_capital,
+                        backtest_kwargs
+                    )
+                    for chunk in chunks
+                ]
+                rows = []
+                for future in futures:
+                    rows.extend(future.result())
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+        logger.info(f"Completed {len(rows)} sweep points with {self.max_workers} workers")
+        return rows
+
+    def _rank(self, rows):
+        """Sort sweep rows by the ranking metric."""
+        results = pd.DataFrame(rows)
+        if results.empty:
+            return results
+        results = results.sort_values(
+            self.rank_by,
+            ascending=self.ascending,
+            kind='stable'
+        ).reset_index(drop=True)
+        results.insert(0, 'rank', np.arange(1, len(results) + 1))
+        return results
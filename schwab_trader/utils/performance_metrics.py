@@ -0,0 +1,183 @@
+"""NumPy performance metrics shared by the backtesters.
+
+All functions take plain arrays so they run in a handful of vectorized
+passes regardless of how long the equity curve is.
+"""
+import numpy as np
+
+TRADING_DAYS = 252
+
+
+def returns_from_equity(equity):
+    """Simple period returns of an equity curve (one shorter than ``equity``)."""
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) < 2:
+        return np.empty(0)
+    return equity[1:] / equity[:-1] - 1
+
+
+def drawdown_stats(equity):
+    """Maximum drawdown and the longest time spent below a previous peak.
+
+    Returns:
+        ``(max_drawdown, max_duration)``; the drawdown is a positive fraction
+        of the peak and the duration is counted in periods.
+    """
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) == 0:
+        return 0.0, 0
+
+    peaks = np.maximum.accumulate(equity)
+    drawdowns = np.where(peaks > 0, (peaks - equity) / peaks, 0.0)
+
+    # Periods since the last new peak; the longest stretch is the duration
+    at_peak = equity >= peaks
+    positions = np.arange(len(equity))
+    last_peak = np.maximum.accumulate(np.where(at_peak, positions, 0))
+    return float(drawdowns.max()), int((positions - last_peak).max())
+
+
+def rolling_volatility(returns, window, periods_per_year=TRADING_DAYS):
+    """Annualized trailing standard deviation of ``returns``.
+
+    The first ``window - 1`` entries are NaN.
+    """
+    returns = np.asarray(returns, dtype=float)
+    result = np.full(len(returns), np.nan)
+    if window < 2 or len(returns) < window:
+        return result
+
+    sums = np.cumsum(np.concatenate(([0.0], returns)))
+    squares = np.cumsum(np.concatenate(([0.0], returns * returns)))
+    total = sums[window:] - sums[:-window]
+    total_sq = squares[window:] - squares[:-window]
+    variance = (total_sq - total * total / window) / (window - 1)
+    result[window - 1:] = np.sqrt(np.maximum(variance, 0.0) * periods_per_year)
+    return result
+
+
+def trade_arrays(trades, side_key='action', quantity_key='quantity', price_key='price',
+                 fee_key=None):
+    """Pack trade dicts into ``(symbols, signed_quantities, prices, fees)`` arrays.
+
+    Buys are positive quantities and sells negative; any side value other
+    than ``'buy'`` (case-insensitive) counts as a sell.
+    """
+    n = len(trades)
+    symbols = np.array([trade['symbol'] for trade in trades], dtype=object)
+    sides = np.fromiter(
+        (1.0 if str(trade[side_key]).lower() == 'buy' else -1.0 for trade in trades),
+        dtype=float,
+        count=n
+    )
+    quantities = np.fromiter((trade[quantity_key] for trade in trades), dtype=float, count=n)
+    prices = np.fromiter((trade[price_key] for trade in trades), dtype=float, count=n)
+    if fee_key is None:
+        fees = np.zeros(n)
+    else:
+        fees = np.fromiter((trade.get(fee_key, 0.0) for trade in trades), dtype=float, count=n)
+    return symbols, sides * quantities, prices, fees
+
+
+def round_trip_pnl(symbols, quantities, prices, fees=None):
+    """Profit of every completed round trip.
+
+    A round trip runs from the first fill that opens a position in a symbol
+    until the position is flat again, so scaling in or out is one trip.
+    Positions still open at the end are not included.
+
+    Args:
+        symbols: Symbol of each fill, in time order
+        quantities: Signed fill quantities (buys positive)
+        prices: Fill prices
+        fees: Optional per-fill costs
+
+    Returns:
+        Array of realized profit per closed round trip.
+    """
+    quantities = np.asarray(quantities, dtype=float)
+    if len(quantities) == 0:
+        return np.empty(0)
+    prices = np.asarray(prices, dtype=float)
+    fees = np.zeros(len(quantities)) if fees is None else np.asarray(fees, dtype=float)
+
+    # Group fills by symbol, keeping time order within each symbol
+    _, codes = np.unique(np.asarray(symbols, dtype=object).astype(str), return_inverse=True)
+    order = np.lexsort((np.arange(len(codes)), codes))
+    codes = codes[order]
+    quantities = quantities[order]
+    cash = -quantities * prices[order] - fees[order]
+
+    # Running position within each symbol
+    held = np.cumsum(quantities)
+    group_start = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    offsets = np.repeat(held[group_start] - quantities[group_start], np.diff(np.r_[group_start, len(codes)]))
+    held -= offsets
+
+    closed = np.isclose(held, 0.0)
+    group_end = np.r_[codes[1:] != codes[:-1], True]
+    boundary = closed | group_end
+    trip = np.r_[0, np.cumsum(boundary)[:-1]]
+    pnl = np.bincount(trip, weights=cash)
+    return pnl[closed[boundary]]
+
+
+def compute_metrics(equity, trades=None, periods_per_year=TRADING_DAYS, risk_free_rate=0.0):
+    """Summary statistics for an equity curve and its trades.
+
+    Args:
+        equity: Portfolio value per period, starting with the initial capital
+        trades: Optional ``(symbols, signed_quantities, prices, fees)`` from
+            ``trade_arrays``
+        periods_per_year: Periods used to annualize returns and volatility
+        risk_free_rate: Annual risk-free rate for Sharpe and Sortino
+
+    Returns:
+        Dict of scalar metrics.
+    """
+    equity = np.asarray(equity, dtype=float)
+    returns = returns_from_equity(equity)
+    n = len(returns)
+
+    total_return = float(equity[-1] / equity[0] - 1) if len(equity) and equity[0] else 0.0
+    annualized_return = (
+        float((1 + total_return) ** (periods_per_year / n) - 1)
+        if n and total_return > -1 else 0.0
+    )
+
+    excess = returns - risk_free_rate / periods_per_year
+    volatility = float(returns.std(ddof=1)) if n > 1 else 0.0
+    downside = float(np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2))) if n else 0.0
+    annualizer = np.sqrt(periods_per_year)
+
+    max_drawdown, drawdown_duration = drawdown_stats(equity)
+
+    metrics = {
+        'total_return': total_return,
+        'annualized_return': annualized_return,
+        'volatility': volatility * annualizer,
+        'sharpe_ratio': float(annualizer * excess.mean() / volatility) if volatility > 0 else 0.0,
+        'sortino_ratio': float(annualizer * excess.mean() / downside) if downside > 0 else 0.0,
+        'max_drawdown': max_drawdown,
+        'max_drawdown_duration': drawdown_duration,
+        'calmar_ratio': annualized_return / max_drawdown if max_drawdown > 0 else 0.0,
+        'num_trades': 0,
+        'turnover': 0.0,
+        'round_trips': 0,
+        'win_rate': 0.0
+    }
+
+    if trades is not None and len(trades[0]):
+        symbols, quantities, prices, fees = trades
+        traded_value = float(np.abs(quantities * prices).sum())
+        mean_equity = float(equity.mean())
+        years = n / periods_per_year
+        pnl = round_trip_pnl(symbols, quantities, prices, fees)
+
+        metrics['num_trades'] = len(quantities)
+        # Annualized: traded value per year as a multiple of average equity
+        metrics['turnover'] = traded_value / mean_equity / years if mean_equity > 0 and years > 0 else 0.0
+        metrics['round_trips'] = len(pnl)
+        metrics['win_rate'] = float((pnl > 0).mean()) if len(pnl) else 0.0
+
+    return metrics
@@ -0,0 +1,299 @@
+"""Aligned (dates x symbols) OHLCV price panels backed by NumPy arrays."""
+import json
+import os
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# Files of a panel saved with PricePanel.save
+VALUES_FILE = 'values.npy'
+DATES_FILE = 'dates.npy'
+SYMBOLS_FILE = 'symbols.json'
+
+
+def share_array(array):
+    """Copy an array into a new shared memory block.
+
+    Returns ``(shm, spec)`` where ``spec`` is a picklable description for
+    ``attach_array``. The caller must ``close()`` and ``unlink()`` ``shm``.
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    shared[...] = array
+    return shm, {'name': shm.name, 'shape': array.shape, 'dtype': array.dtype.str}
+
+
+def attach_array(spec):
+    """Map an array published with ``share_array``; returns ``(shm, array)``."""
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    return shm, np.ndarray(spec['shape'], dtype=np.dtype(spec['dtype']), buffer=shm.buf)
+
+
+def _naive_index(index):
+    """Nanosecond DatetimeIndex without a timezone."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit('ns')
+
+
+def _to_datetimes(dates):
+    """Convert int64 nanosecond dates to a list of datetimes."""
+    return list(pd.to_datetime(np.asarray(dates, dtype=np.int64), unit='ns').to_pydatetime())
+
+
+def _write_index(path, dates, symbols):
+    """Write the date and symbol files of a saved panel."""
+    dates_path = os.path.join(path, DATES_FILE)
+    symbols_path = os.path.join(path, SYMBOLS_FILE)
+    with open(f"{dates_path}.{os.getpid()}.tmp", 'wb') as f:
+        np.save(f, np.asarray(dates, dtype=np.int64))
+    with open(f"{symbols_path}.{os.getpid()}.tmp", 'w') as f:
+        json.dump(list(symbols), f)
+    os.replace(f"{dates_path}.{os.getpid()}.tmp", dates_path)
+    os.replace(f"{symbols_path}.{os.getpid()}.tmp", symbols_path)
+
+
+class PricePanel:
+    """OHLCV data for a universe of symbols packed into aligned arrays.
+
+    ``values`` has shape ``(len(FIELDS), len(dates), len(symbols))``. Bars a
+    symbol does not have on a given date are NaN. When the panel is built from
+    bar records the original records are kept so per-date bar lists can be
+    handed to strategies unchanged.
+
+    A panel saved to a directory with ``save`` (or built there by
+    ``from_store``) is opened with ``load`` as a read-only memory map: the
+    values are paged in from the file on demand, and every process that opens
+    the same directory shares the operating system's single cached copy.
+    """
+
+    def __init__(self, dates, symbols, values, records=None, starts=None, ends=None, path=None):
+        self.dates = list(dates)
+        self.symbols = list(symbols)
+        self.values = values
+        self.symbol_index = {symbol: j for j, symbol in enumerate(self.symbols)}
+        self.path = path
+        self._records = records
+        self._starts = starts
+        self._ends = ends
+
+    @classmethod
+    def from_records(cls, historical_data):
+        """Build a panel from ``{symbol: [{'date': ..., 'close': ...}, ...]}``."""
+        symbols = list(historical_data.keys())
+        dates = sorted(set(
+            bar['date'] for bars in historical_data.values()
+            for bar in bars
+        ))
+        date_index = {date: i for i, date in enumerate(dates)}
+        n_dates, n_symbols = len(dates), len(symbols)
+
+        values = np.full((len(FIELDS), n_dates, n_symbols), np.nan)
+        starts = np.zeros((n_dates, n_symbols), dtype=np.int64)
+        ends = np.zeros((n_dates, n_symbols), dtype=np.int64)
+        records = []
+        positions = np.arange(n_dates)
+
+        for j, symbol in enumerate(symbols):
+            bars = historical_data[symbol]
+            rows = np.fromiter(
+                (date_index[bar['date']] for bar in bars),
+                dtype=np.int64,
+                count=len(bars)
+            )
+            # Stable sort keeps same-date bars in their original order
+            order = np.argsort(rows, kind='stable')
+            rows = rows[order]
+            sorted_bars = [bars[k] for k in order]
+            records.append(sorted_bars)
+
+            starts[:, j] = np.searchsorted(rows, positions, side='left')
+            ends[:, j] = np.searchsorted(rows, positions, side='right')
+
+            # The first bar of each date populates the arrays
+            present = ends[:, j] > starts[:, j]
+            first = starts[present, j]
+            columns = np.array(
+                [tuple(bar.get(field, np.nan) for field in FIELDS) for bar in sorted_bars],
+                dtype=float
+            ).reshape(len(sorted_bars), len(FIELDS))
+            values[:, present, j] = columns[first].T
+
+        return cls(dates, symbols, values, records=records, starts=starts, ends=ends)
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Build a panel from ``{symbol: DataFrame}`` with a DatetimeIndex.
+
+        Column names may be ``Open``..``Volume`` or lowercase. Timezones are
+        dropped so frames from different sources align on the same dates.
+        """
+        symbols = list(frames)
+        indexes = {symbol: _naive_index(frame.index) for symbol, frame in frames.items()}
+        dates = np.unique(np.concatenate(
+            [index.asi8 for index in indexes.values()] or [np.empty(0, dtype=np.int64)]
+        ))
+
+        values = np.full((len(FIELDS), len(dates), len(symbols)), np.nan)
+        for j, symbol in enumerate(symbols):
+            frame = frames[symbol]
+            columns = {str(column).lower(): column for column in frame.columns}
+            rows = np.searchsorted(dates, indexes[symbol].asi8)
+            for k, field in enumerate(FIELDS):
+                if field in columns:
+                    values[k, rows, j] = frame[columns[field]].to_numpy(dtype=float)
+
+        return cls(_to_datetimes(dates), symbols, values)
+
+    @classmethod
+    def from_store(cls, store, symbols, start_date=None, end_date=None, path=None):
+        """Build a panel from an ``OHLCVStore`` without going through DataFrames.
+
+        With ``path`` the values are written straight into a panel file there
+        and the returned panel is memory-mapped from it, so universes larger
+        than memory can be assembled one symbol at a time.
+        """
+        symbols = list(symbols)
+        bars = [store.bars(symbol, start_date, end_date) for symbol in symbols]
+        dates = np.unique(np.concatenate(
+            [symbol_bars['date'] for symbol_bars in bars] or [np.empty(0, dtype=np.int64)]
+        ))
+        shape = (len(FIELDS), len(dates), len(symbols))
+
+        if path is None:
+            values = np.full(shape, np.nan)
+        else:
+            os.makedirs(path, exist_ok=True)
+            values = np.lib.format.open_memmap(
+                os.path.join(path, VALUES_FILE), mode='w+', dtype=np.float64, shape=shape
+            )
+            values[...] = np.nan
+
+        for j, symbol_bars in enumerate(bars):
+            rows = np.searchsorted(dates, symbol_bars['date'])
+            for k, field in enumerate(FIELDS):
+                values[k, rows, j] = symbol_bars[field.capitalize()]
+
+        if path is None:
+            return cls(_to_datetimes(dates), symbols, values)
+
+        values.flush()
+        del values
+        _write_index(path, dates, symbols)
+        return cls.load(path)
+
+    def save(self, path):
+        """Write the panel to ``path`` in the format read by ``load``.
+
+        ``path`` is a directory holding the (fields x dates x symbols) float64
+        values, the int64 nanosecond dates and the symbol list. Each file is
+        written to a temporary and renamed into place.
+        """
+        os.makedirs(path, exist_ok=True)
+        values_path = os.path.join(path, VALUES_FILE)
+        tmp_path = f"{values_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.asarray(self.values, dtype=np.float64))
+        os.replace(tmp_path, values_path)
+        _write_index(path, pd.DatetimeIndex(self.dates).as_unit('ns').asi8, self.symbols)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a panel saved with ``save``; the values are read-only."""
+        values = np.load(os.path.join(path, VALUES_FILE), mmap_mode='r')
+        dates = np.load(os.path.join(path, DATES_FILE))
+        with open(os.path.join(path, SYMBOLS_FILE)) as f:
+            symbols = json.load(f)
+        return cls(_to_datetimes(dates), symbols, values, path=path)
+
+    def share(self):
+        """Publish the panel to worker processes.
+
+        Returns ``(shm, spec)`` for ``attach``. A panel opened from a file is
+        shared by path and ``shm`` is None; otherwise the values are copied
+        into shared memory, which the caller must ``close()`` and ``unlink()``.
+        """
+        if self.path is not None:
+            return None, {'path': self.path}
+        return self.to_shared_memory()
+
+    @classmethod
+    def attach(cls, spec):
+        """Open a panel published with ``share``."""
+        if 'path' in spec:
+            return cls.load(spec['path'])
+        return cls.from_shared_memory(spec)
+
+    def to_shared_memory(self):
+        """Copy the panel values into a new shared memory block.
+
+        Returns ``(shm, spec)``. ``spec`` is small and picklable; pass it to
+        ``from_shared_memory`` in other processes. The caller owns ``shm`` and
+        must ``close()`` and ``unlink()`` it when done.
+        """
+        shm, spec = share_array(self.values)
+        spec['dates'] = self.dates
+        spec['symbols'] = self.symbols
+        return shm, spec
+
+    @classmethod
+    def from_shared_memory(cls, spec):
+        """Attach to a panel published with ``to_shared_memory`` without copying."""
+        shm, values = attach_array(spec)
+        panel = cls(spec['dates'], spec['symbols'], values)
+        # Keep the mapping alive as long as the panel
+        panel._shm = shm
+        return panel
+
+    def __len__(self):
+        return len(self.dates)
+
+    def field(self, name):
+        """Return the (dates x symbols) array for an OHLCV field."""
+        return self.values[FIELDS.index(name)]
+
+    @property
+    def open(self):
+        return self.values[0]
+
+    @property
+    def high(self):
+        return self.values[1]
+
+    @property
+    def low(self):
+        return self.values[2]
+
+    @property
+    def close(self):
+        return self.values[3]
+
+    @property
+    def volume(self):
+        return self.values[4]
+
+    def bars(self, i):
+        """Return ``{symbol: [bar, ...]}`` for the date at offset ``i``."""
+        if self._records is not None:
+            starts = self._starts[i].tolist()
+            ends = self._ends[i].tolist()
+            return {
+                symbol: records[start:end]
+                for symbol, records, start, end
+                in zip(self.symbols, self._records, starts, ends)
+            }
+
+        date = self.dates[i]
+        rows = self.values[:, i, :].T.tolist()
+        daily_data = {}
+        for symbol, row in zip(self.symbols, rows):
+            if row[3] != row[3]:  # NaN close: no bar for this symbol today
+                daily_data[symbol] = []
+            else:
+                bar = dict(zip(FIELDS, row))
+                bar['date'] = date
+                daily_data[symbol] = [bar]
+        return daily_data
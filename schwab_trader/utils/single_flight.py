@@ -0,0 +1,139 @@
+"""Single-flight request coalescing for threads and asyncio tasks."""
+import asyncio
+import inspect
+import logging
+import threading
+import weakref
+from concurrent.futures import Future
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls from threads into one.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block and receive the same result, or the same exception.
+    Nothing is cached: once the call finishes the next caller runs it again.
+    Results are shared, not copied, so callers must not mutate them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._counts = {'calls': 0, 'coalesced': 0}
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """Run ``func(*args, **kwargs)`` unless a call for ``key`` is already in flight."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._counts['calls'] += 1
+            else:
+                self._counts['coalesced'] += 1
+
+        if not leader:
+            logger.debug(f"Joined in-flight call {key!r}")
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._forget(key)
+            future.set_exception(e)
+            raise
+        self._forget(key)
+        future.set_result(result)
+        return result
+
+    def _forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counts, 'in_flight': len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """Collapses concurrent identical awaits into one task per event loop.
+
+    Waiters await the shared task through ``asyncio.shield``, so a cancelled
+    waiter does not cancel the fetch for the others.
+    """
+
+    def __init__(self):
+        self._tasks: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task]]' = \
+            weakref.WeakKeyDictionary()
+        self._counts = {'calls': 0, 'coalesced': 0}
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """Await ``func(*args, **kwargs)`` unless a call for ``key`` is already in flight."""
+        tasks = self._tasks.setdefault(asyncio.get_running_loop(), {})
+        task = tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            tasks[key] = task
+            task.add_done_callback(lambda done: tasks.pop(key) if tasks.get(key) is done else None)
+            self._counts['calls'] += 1
+        else:
+            self._counts['coalesced'] += 1
+            logger.debug(f"Joined in-flight task {key!r}")
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return sum(len(tasks) for tasks in self._tasks.values())
+
+    def metrics(self) -> Dict[str, int]:
+        return {**self._counts, 'in_flight': self.in_flight()}
+
+
+# Process-wide groups used by the data services
+default_group = SingleFlight()
+default_async_group = AsyncSingleFlight()
+
+
+def single_flight(key: Optional[Callable[..., Hashable]] = None, group=None):
+    """Decorator coalescing concurrent calls that share a key.
+
+    ``key`` receives the call's arguments and is scoped to the decorated
+    function; by default it is all arguments, so methods only coalesce on
+    the same instance. Coroutine functions use an ``AsyncSingleFlight``
+    group, others a ``SingleFlight``.
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        if key is None:
+            make_key = lambda *args, **kwargs: (name, args, tuple(sorted(kwargs.items())))
+        else:
+            make_key = lambda *args, **kwargs: (name, key(*args, **kwargs))
+
+        if inspect.iscoroutinefunction(func):
+            flight = group if group is not None else default_async_group
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await flight.do(make_key(*args, **kwargs), func, *args, **kwargs)
+            return async_wrapper
+
+        flight = group if group is not None else default_group
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return flight.do(make_key(*args, **kwargs), func, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def single_flight_metrics() -> Dict[str, Dict[str, int]]:
+    """Counters of the process-wide groups."""
+    return {'threads': default_group.metrics(), 'asyncio': default_async_group.metrics()}
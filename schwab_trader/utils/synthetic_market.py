@@ -0,0 +1,104 @@
+"""Deterministic synthetic OHLCV universes for benchmarks and tests.
+
+Prices cycle through the regimes in ``MARKET_PERIODS``: each regime lasts
+roughly its ``expected_days`` in trading days, draws daily changes from its
+``price_change_params`` and keeps prices within its ``min_range`` /
+``max_range`` of the price the regime started at. Symbols take their base
+price and volume from ``STOCKS``, cycling through them with a per-symbol
+scale for universes larger than the configured list.
+"""
+import numpy as np
+import pandas as pd
+from schwab_trader.config.market_config import MARKET_PERIODS, STOCKS
+from .price_panel import PricePanel, FIELDS
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _regime_schedule(n_dates, periods):
+    """Yield ``(start, end, params)`` blocks covering ``n_dates`` rows."""
+    start = 0
+    while start < n_dates:
+        for name in periods:
+            config = MARKET_PERIODS[name]
+            length = max(1, config['expected_days'] * TRADING_DAYS_PER_YEAR // 365)
+            end = min(n_dates, start + length)
+            yield start, end, config['price_change_params']
+            start = end
+            if start >= n_dates:
+                return
+
+
+def generate_panel(n_symbols, years, periods=None, seed=0, start_date='2000-01-03'):
+    """Generate a ``PricePanel`` of ``n_symbols`` over ``years`` of trading days.
+
+    Args:
+        n_symbols: Number of symbols in the universe
+        years: Length of the history in years of 252 trading days
+        periods: Regime names from ``MARKET_PERIODS`` to cycle through
+            (defaults to all, in configuration order)
+        seed: Random seed; the same arguments always give the same panel
+        start_date: First business day of the history
+
+    Returns:
+        PricePanel without gaps; symbols are the configured tickers followed
+        by ``SYN00001``-style names.
+    """
+    rng = np.random.default_rng(seed)
+    periods = list(periods or MARKET_PERIODS)
+    n_dates = int(round(years * TRADING_DAYS_PER_YEAR))
+    dates = list(pd.bdate_range(start_date, periods=n_dates).to_pydatetime())
+
+    templates = list(STOCKS.values())
+    symbols = list(STOCKS)[:n_symbols]
+    symbols += [f'SYN{j:05d}' for j in range(len(symbols), n_symbols)]
+    scale = rng.lognormal(0.0, 0.5, n_symbols)
+    scale[:min(n_symbols, len(templates))] = 1.0
+    base_price = np.array([templates[j % len(templates)]['base_price'] for j in range(n_symbols)]) * scale
+    base_volume = np.array([templates[j % len(templates)]['base_volume'] for j in range(n_symbols)]) * scale
+
+    close = np.empty((n_dates, n_symbols))
+    daily_std = np.empty(n_dates)
+    level = base_price
+    for start, end, params in _regime_schedule(n_dates, periods):
+        changes = rng.normal(params['mean'] / 100, params['std'] / 100, (end - start, n_symbols))
+        path = level * np.cumprod(1 + changes, axis=0)
+        close[start:end] = np.clip(path, level * params['min_range'], level * params['max_range'])
+        daily_std[start:end] = params['std'] / 100
+        level = close[end - 1]
+
+    previous = np.vstack([base_price, close[:-1]])
+    noise = daily_std[:, None]
+    open_ = previous * (1 + rng.normal(0, 1, close.shape) * noise / 4)
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 1, close.shape)) * noise / 2)
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 1, close.shape)) * noise / 2)
+
+    # Volume rises with the size of the move
+    move = np.abs(close / previous - 1)
+    volume = np.round(base_volume * rng.lognormal(0.0, 0.25, close.shape) * (1 + 20 * move))
+
+    return PricePanel(dates, symbols, np.stack([open_, high, low, close, volume]))
+
+
+def panel_to_records(panel):
+    """Convert a panel to ``{symbol: [{'date': ..., 'close': ...}, ...]}``."""
+    records = {}
+    for j, symbol in enumerate(panel.symbols):
+        columns = [panel.values[k, :, j].tolist() for k in range(len(FIELDS))]
+        records[symbol] = [
+            dict(zip(FIELDS, row), date=date)
+            for date, row in zip(panel.dates, zip(*columns))
+        ]
+    return records
+
+
+def panel_to_frames(panel):
+    """Convert a panel to ``{symbol: DataFrame}`` with ``Open``..``Volume`` columns."""
+    index = pd.DatetimeIndex(panel.dates)
+    return {
+        symbol: pd.DataFrame(
+            {field.capitalize(): panel.values[k, :, j] for k, field in enumerate(FIELDS)},
+            index=index
+        )
+        for j, symbol in enumerate(panel.symbols)
+    }
@@ -0,0 +1,304 @@
+"""Walk-forward validation for strategies and the strategy testers."""
+import logging
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .backtester import StrategyBacktester
+from .parameter_sweep import ParameterSweep
+from .price_panel import PricePanel, share_array, attach_array
+
+logger = logging.getLogger(__name__)
+
+# Shared state attached once per worker process by _init_worker
+_worker_panel = None
+_worker_matrices = None
+_worker_handles = []
+_worker_run_window = None
+
+
+def walk_forward_splits(n_dates, train_size, test_size, step=None, expanding=False):
+    """Split ``n_dates`` bars into consecutive train/test windows.
+
+    Args:
+        n_dates: Number of bars in the history
+        train_size: Bars in each training window
+        test_size: Bars in each test window
+        step: Bars to advance between folds (defaults to ``test_size``)
+        expanding: Anchor every training window at the first bar
+
+    Returns:
+        List of ``(train_start, train_end, test_start, test_end)`` offsets;
+        ends are exclusive and each test window directly follows its
+        training window.
+    """
+    if train_size <= 0 or test_size <= 0:
+        raise ValueError("train_size and test_size must be positive")
+    step = step or test_size
+
+    splits = []
+    train_start = 0
+    train_end = train_size
+    while train_end + test_size <= n_dates:
+        splits.append((0 if expanding else train_start, train_end, train_end, train_end + test_size))
+        train_start += step
+        train_end += step
+    return splits
+
+
+def walk_forward_windows(dates, run_window, train_size, test_size, step=None, expanding=False,
+                         max_workers=None):
+    """Walk-forward evaluation of a backtest without parameters to fit.
+
+    Used by the strategy testers, whose strategies are plain callables.
+    Every fold reports the in-sample metrics of its training window next to
+    the out-of-sample metrics of its test window. Windows run in parallel
+    worker processes, each holding one copy of ``run_window``, unless it
+    cannot be pickled (e.g. a lambda strategy), in which case they run here
+    one after another.
+
+    Args:
+        dates: Bar timestamps of the whole history
+        run_window: Callable ``(start, end)`` returning the metrics of a
+            fresh backtest over the bars ``[start, end)``; it must not
+            depend on state shared between calls
+        train_size, test_size, step, expanding: As for ``walk_forward_splits``
+        max_workers: Worker processes (defaults to the CPU count; 1 runs serially)
+
+    Returns:
+        Dict with ``folds`` and ``aggregate`` as from ``WalkForwardValidator.run``.
+    """
+    splits = walk_forward_splits(len(dates), train_size, test_size, step, expanding)
+    if not splits:
+        raise ValueError(
+            f"Not enough history for one fold: {len(dates)} bars, need {train_size + test_size}"
+        )
+
+    windows = [window for split in splits for window in (split[:2], split[2:])]
+    metrics = _run_windows(run_window, windows, max_workers or os.cpu_count() or 1)
+
+    folds = []
+    for fold, (train_start, train_end, test_start, test_end) in enumerate(splits):
+        folds.append({
+            'fold': fold,
+            'train_start': dates[train_start],
+            'train_end': dates[train_end - 1],
+            'test_start': dates[test_start],
+            'test_end': dates[test_end - 1],
+            'params': {},
+            'train': metrics[2 * fold],
+            'test': metrics[2 * fold + 1]
+        })
+    logger.info(f"Walk-forward completed {len(folds)} folds")
+    return summarize_folds(folds)
+
+
+def _init_window_worker(run_window):
+    """Keep the window runner in a worker process for every window it is sent."""
+    global _worker_run_window
+    _worker_run_window = run_window
+
+
+def _run_worker_window(start, end):
+    return _worker_run_window(start, end)
+
+
+def _run_windows(run_window, windows, max_workers):
+    """Metrics of every ``(start, end)`` window, in order."""
+    if max_workers > 1 and len(windows) > 1:
+        try:
+            pickle.dumps(run_window)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            logger.info(f"Running walk-forward windows serially, the backtest cannot be sent to workers: {str(e)}")
+        else:
+            with ProcessPoolExecutor(
+                max_workers=min(max_workers, len(windows)),
+                initializer=_init_window_worker,
+                initargs=(run_window,)
+            ) as executor:
+                return list(executor.map(_run_worker_window, *zip(*windows)))
+    return [run_window(start, end) for start, end in windows]
+
+
+def summarize_folds(folds):
+    """Flatten fold results and aggregate the out-of-sample metrics."""
+    rows = []
+    for result in folds:
+        row = {
+            'fold': result['fold'],
+            'train_start': result['train_start'],
+            'train_end': result['train_end'],
+            'test_start': result['test_start'],
+            'test_end': result['test_end'],
+            **result['params']
+        }
+        row.update({f'train_{name}': value for name, value in result['train'].items()})
+        row.update({f'test_{name}': value for name, value in result['test'].items()})
+        rows.append(row)
+    fold_table = pd.DataFrame(rows)
+
+    test_metrics = pd.DataFrame([result['test'] for result in folds])
+    aggregate = {'folds': len(folds)}
+    for name in test_metrics.columns:
+        aggregate[f'mean_{name}'] = float(test_metrics[name].mean())
+        aggregate[f'std_{name}'] = float(test_metrics[name].std(ddof=0))
+    aggregate['compounded_return'] = float(np.prod(1 + test_metrics['total_return'].to_numpy()) - 1)
+
+    return {'folds': fold_table, 'aggregate': aggregate}
+
+
+def _init_worker(panel_spec, matrices_spec):
+    """Attach the shared panel and signal matrices in a worker process."""
+    global _worker_panel, _worker_matrices
+    _worker_panel = PricePanel.attach(panel_spec)
+    if matrices_spec is not None:
+        shm, _worker_matrices = attach_array(matrices_spec)
+        _worker_handles.append(shm)
+
+
+def _backtest_window(strategy_class, params, initial_capital, panel, matrix, start, end):
+    """Backtest one parameter set over the bars ``[start, end)``."""
+    backtester = StrategyBacktester(strategy_class(**params), initial_capital=initial_capital)
+    results = backtester.backtest(
+        panel,
+        start_date=panel.dates[start],
+        end_date=panel.dates[end - 1],
+        signal_matrix=matrix
+    )
+    return results['performance']
+
+
+def _run_fold(fold, split, strategy_class, param_sets, initial_capital, rank_by, ascending,
+              panel=None, matrices=None):
+    """Pick the best parameters on the training window and score them on the test window."""
+    panel = panel if panel is not None else _worker_panel
+    matrices = matrices if matrices is not None else _worker_matrices
+    train_start, train_end, test_start, test_end = split
+
+    def matrix_for(k):
+        return matrices[k] if matrices is not None else None
+
+    best, best_train = 0, None
+    for k, params in enumerate(param_sets):
+        performance = _backtest_window(
+            strategy_class, params, initial_capital, panel, matrix_for(k), train_start, train_end
+        )
+        score = performance[rank_by]
+        if best_train is None or (score < best_train[rank_by] if ascending else score > best_train[rank_by]):
+            best, best_train = k, performance
+
+    test = _backtest_window(
+        strategy_class, param_sets[best], initial_capital, panel, matrix_for(best), test_start, test_end
+    )
+    return {
+        'fold': fold,
+        'train_start': panel.dates[train_start],
+        'train_end': panel.dates[train_end - 1],
+        'test_start': panel.dates[test_start],
+        'test_end': panel.dates[test_end - 1],
+        'params': param_sets[best],
+        'train': best_train,
+        'test': test
+    }
+
+
+class WalkForwardValidator:
+    """Rolling or expanding walk-forward evaluation of a strategy.
+
+    Every fold picks the best parameter set (by ``rank_by``) on its training
+    window and reports out-of-sample metrics on the following test window.
+    Signal matrices are computed once per parameter set over the whole
+    history and reused by every fold, so overlapping windows never repeat
+    indicator work; because indicators only look backwards each window also
+    gets its warm-up bars for free. Folds run in parallel worker processes
+    that share the panel and matrices through shared memory.
+    """
+
+    def __init__(self, strategy_class, train_size, test_size, step=None, expanding=False,
+                 params=None, param_grid=None, initial_capital=100000, max_workers=None,
+                 rank_by='sharpe_ratio', ascending=False):
+        self.strategy_class = strategy_class
+        self.train_size = train_size
+        self.test_size = test_size
+        self.step = step
+        self.expanding = expanding
+        self.param_sets = ParameterSweep.grid(param_grid) if param_grid else [params or {}]
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.rank_by = rank_by
+        self.ascending = ascending
+
+    def precompute_signals(self, panel):
+        """Signal matrices for every parameter set, or None if the strategy has none."""
+        matrices = []
+        for params in self.param_sets:
+            matrix = self.strategy_class(**params).generate_signal_matrix(panel)
+            if matrix is None:
+                return None
+            matrices.append(matrix)
+        return np.stack(matrices)
+
+    def run(self, historical_data):
+        """Run every fold and return per-fold and aggregate metrics.
+
+        Returns:
+            Dict with ``folds`` (DataFrame, one row per fold with the chosen
+            parameters and ``train_``/``test_`` prefixed metrics) and
+            ``aggregate`` (mean and standard deviation of each test metric
+            across folds plus the compounded out-of-sample return).
+        """
+        if isinstance(historical_data, PricePanel):
+            panel = historical_data
+        else:
+            panel = PricePanel.from_records(historical_data)
+
+        splits = walk_forward_splits(
+            len(panel), self.train_size, self.test_size, self.step, self.expanding
+        )
+        if not splits:
+            raise ValueError(
+                f"Not enough history for one fold: {len(panel)} bars, "
+                f"need {self.train_size + self.test_size}"
+            )
+
+        matrices = self.precompute_signals(panel)
+        fold_args = (self.strategy_class, self.param_sets, self.initial_capital, self.rank_by, self.ascending)
+
+        if self.max_workers == 1 or len(splits) == 1:
+            folds = [
+                _run_fold(fold, split, *fold_args, panel=panel, matrices=matrices)
+                for fold, split in enumerate(splits)
+            ]
+        else:
+            folds = self._run_parallel(panel, matrices, splits, fold_args)
+
+        logger.info(f"Walk-forward completed {len(folds)} folds")
+        return summarize_folds(folds)
+
+    def _run_parallel(self, panel, matrices, splits, fold_args):
+        """Run folds in worker processes sharing the panel and signal matrices."""
+        handles = []
+        try:
+            panel_shm, panel_spec = panel.share()
+            if panel_shm is not None:
+                handles.append(panel_shm)
+            matrices_spec = None
+            if matrices is not None:
+                matrices_shm, matrices_spec = share_array(matrices)
+                handles.append(matrices_shm)
+
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(panel_spec, matrices_spec)
+            ) as executor:
+                futures = [
+                    executor.submit(_run_fold, fold, split, *fold_args)
+                    for fold, split in enumerate(splits)
+                ]
+                return [future.result() for future in futures]
+        finally:
+            for shm in handles:
+                shm.close()
+                shm.unlink()
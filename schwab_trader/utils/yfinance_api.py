@@ -3,7 +3,8 @@ import yfinance as yf
 from functools import wraps
 from datetime import datetime, timedelta
 import pandas as pd
-from cachetools import TTLCache, cached
+from schwab_trader.utils.cache import get_cache
+from schwab_trader.utils.market_calendar import market_ttl
 from schwab_trader.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -41,7 +42,8 @@ class YFinanceAPI:
         self.connected = False
         self.client = None
         # Cache for storing API responses
-        self.cache = TTLCache(maxsize=100, ttl=300)  # 5 minutes TTL
+        # 5 minutes while trading, until the next open otherwise
+        self.cache = get_cache('yfinance_api', max_entries=100, ttl=market_ttl(300))
 
     def init_app(self, app):
         """Initialize the API with Flask app context."""
@@ -76,13 +78,14 @@ class YFinanceAPI:
             raise Exception("Not connected to Yahoo Finance API")
         
         cache_key = f"info_{symbol}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_value = self.cache.get(cache_key)
+        if cached_value is not None:
+            return cached_value
         
         try:
             ticker = self.client.Ticker(symbol)
             info = ticker.info
-            self.cache[cache_key] = info
+            self.cache.set(cache_key, info)
             return info
         except Exception as e:
             logger.error(f"Error getting info for {symbol}: {str(e)}")
@@ -95,8 +98,9 @@ class YFinanceAPI:
             raise Exception("Not connected to Yahoo Finance API")
         
         cache_key = f"data_{symbol}_{period}_{interval}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_value = self.cache.get(cache_key)
+        if cached_value is not None:
+            return cached_value
         
         try:
             ticker = self.client.Ticker(symbol)
@@ -112,7 +116,7 @@ class YFinanceAPI:
                     logger.info("Retrying with 15m interval")
                     data = ticker.history(period=period, interval="15m")
             
-            self.cache[cache_key] = data
+            self.cache.set(cache_key, data)
             return data
         except Exception as e:
             logger.error(f"Error getting stock data for {symbol}: {str(e)}")
@@ -125,8 +129,9 @@ class YFinanceAPI:
             raise Exception("Not connected to Yahoo Finance API")
         
         cache_key = f"multi_{'_'.join(symbols)}_{period}_{interval}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_value = self.cache.get(cache_key)
+        if cached_value is not None:
+            return cached_value
         
         try:
             data = {}
@@ -138,7 +143,7 @@ class YFinanceAPI:
                     logger.error(f"Error getting data for {symbol}: {str(e)}")
                     continue
             
-            self.cache[cache_key] = data
+            self.cache.set(cache_key, data)
             return data
         except Exception as e:
             logger.error(f"Error getting multiple ticker data: {str(e)}")
@@ -22,7 +22,8 @@ setup(
         "jinja2>=3.1.2",
         "alembic>=1.9.0",
         "python-socketio>=5.12.0",
-        "cachelib>=0.9.0"
+        "cachelib>=0.9.0",
+        "aiohttp>=3.9.1"
     ],
     python_requires=">=3.6",
 ) 
\ No newline at end of file
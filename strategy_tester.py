@@ -1,16 +1,28 @@
 import yfinance as yf
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 import logging
+from functools import partial
 from typing import Dict, List, Callable, Any
 from schwab_trader.utils.schwab_oauth import SchwabOAuth
+from schwab_trader.utils.performance_metrics import compute_metrics, trade_arrays
+from schwab_trader.utils.walk_forward import walk_forward_windows
+from schwab_trader import indicators
+from schwab_trader.utils.market_calendar import calendar as market_calendar
 import pytz
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Daily history used to warm up live indicators, and bars handed to strategies
+LIVE_SEED_PERIOD = "6mo"
+LIVE_HISTORY_BARS = 60
+
+def _window_metrics(strategy, symbols, historical_data, dates, initial_capital, start, end):
+    """Metrics of one walk-forward window over ``dates[start:end]``"""
+    return StrategyTester._simulate_backtest(strategy, symbols, historical_data, dates[start:end], initial_capital)['metrics']
+
 class StrategyTester:
     def __init__(self):
         self.schwab = None
@@ -26,27 +38,16 @@ class StrategyTester:
         self.running = False
         self.last_balance_check = 0
         self.profit_loss_threshold = 500  # $500 threshold for detailed summaries
+        self.live_indicators = {}  # symbol -> streaming indicator state for auto trading
         
     def is_market_open(self) -> bool:
-        """Check if the market is currently open"""
-        now = datetime.now(self.market_timezone)
-        # Market hours: 9:30 AM to 4:00 PM ET
-        market_open = now.replace(hour=9, minute=30, second=0, microsecond=0)
-        market_close = now.replace(hour=16, minute=0, second=0, microsecond=0)
-        
-        # Check if it's a weekday
-        if now.weekday() >= 5:  # 5 is Saturday, 6 is Sunday
-            return False
-            
-        return market_open <= now <= market_close
+        """Check if the market is currently open, honoring NYSE holidays and early closes"""
+        return market_calendar.is_open()
         
     def is_near_market_close(self, minutes_before: int = 20) -> bool:
-        """Check if we're within X minutes of market close"""
-        now = datetime.now(self.market_timezone)
-        market_close = now.replace(hour=16, minute=0, second=0, microsecond=0)
-        time_to_close = market_close - now
-        
-        return 0 < time_to_close.total_seconds() <= (minutes_before * 60)
+        """Check if we're within X minutes of today's close, which is 1:00 PM ET on early-close days"""
+        minutes_left = market_calendar.minutes_to_close()
+        return minutes_left is not None and 0 < minutes_left <= minutes_before
         
     def auto_sell_before_close(self) -> Dict[str, Any]:
         """Automatically sell all positions 20 minutes before market close"""
@@ -164,6 +165,8 @@ class StrategyTester:
                 # Check if market is open
                 if not self.is_market_open():
                     logger.info("Market is closed, waiting...")
+                    # Completed bars are folded in again at the next open
+                    self.live_indicators = {}
                     time.sleep(300)  # Check every 5 minutes when market is closed
                     continue
                     
@@ -183,10 +186,8 @@ class StrategyTester:
                 # Run normal trading strategy
                 for symbol in symbols:
                     try:
-                        stock = yf.Ticker(symbol)
-                        data = stock.history(period="1mo", interval="1d")
+                        data = self._live_indicator_data(symbol)
                         if not data.empty:
-                            data = self.calculate_indicators(data)
                             signal = strategy(data)
                             
                             if signal == 'BUY' and symbol not in self.positions:
@@ -244,31 +245,77 @@ class StrategyTester:
     
     def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
         """Calculate common technical indicators"""
+        close = data['Close'].to_numpy(dtype=float)
+        
         # Simple Moving Averages
-        data['SMA_20'] = data['Close'].rolling(window=20).mean()
-        data['SMA_50'] = data['Close'].rolling(window=50).mean()
+        data['SMA_20'] = indicators.sma(close, 20)
+        data['SMA_50'] = indicators.sma(close, 50)
         
         # RSI
-        delta = data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        data['RSI'] = 100 - (100 / (1 + rs))
+        data['RSI'] = indicators.rsi(close, 14)
         
         # Bollinger Bands
-        data['BB_middle'] = data['Close'].rolling(window=20).mean()
-        data['BB_std'] = data['Close'].rolling(window=20).std()
-        data['BB_upper'] = data['BB_middle'] + (data['BB_std'] * 2)
-        data['BB_lower'] = data['BB_middle'] - (data['BB_std'] * 2)
+        data['BB_upper'], data['BB_middle'], data['BB_lower'] = indicators.bollinger_bands(close, 20, 2)
+        data['BB_std'] = indicators.rolling_std(close, 20)
         
         # MACD
-        exp1 = data['Close'].ewm(span=12, adjust=False).mean()
-        exp2 = data['Close'].ewm(span=26, adjust=False).mean()
-        data['MACD'] = exp1 - exp2
-        data['Signal_Line'] = data['MACD'].ewm(span=9, adjust=False).mean()
+        data['MACD'], data['Signal_Line'], _ = indicators.macd(close, 12, 26, 9)
         
         return data
     
+    def _new_live_indicators(self) -> Dict[str, Any]:
+        """Streaming counterparts of calculate_indicators"""
+        return {
+            'SMA_20': indicators.SMA(20),
+            'SMA_50': indicators.SMA(50),
+            'RSI': indicators.RSI(14),
+            'BB': indicators.BollingerBands(20, 2),
+            'MACD': indicators.MACD(12, 26, 9)
+        }
+    
+    def _update_live_indicators(self, state: Dict[str, Any], bar: pd.Series) -> Dict[str, float]:
+        """Advance streaming indicators by one bar and return the calculate_indicators columns"""
+        row = {
+            'SMA_20': state['SMA_20'].update(bar),
+            'SMA_50': state['SMA_50'].update(bar),
+            'RSI': state['RSI'].update(bar)
+        }
+        row['BB_upper'], row['BB_middle'], row['BB_lower'] = state['BB'].update(bar)
+        row['BB_std'] = state['BB'].std
+        row['MACD'], row['Signal_Line'], _ = state['MACD'].update(bar)
+        return row
+    
+    def _live_indicator_data(self, symbol: str) -> pd.DataFrame:
+        """Recent bars with indicators for a symbol, advancing indicators by one bar per check.
+
+        Completed daily bars are downloaded and folded into the indicator
+        state once per session. Each check then only fetches today's bar and
+        applies it to a copy of that state, since the bar is still forming.
+        """
+        live = self.live_indicators.get(symbol)
+        if live is None:
+            history = yf.Ticker(symbol).history(period=LIVE_SEED_PERIOD, interval="1d")
+            today = datetime.now(self.market_timezone).date()
+            history = history[[timestamp.date() < today for timestamp in history.index]]
+            state = self._new_live_indicators()
+            for _, bar in history.iterrows():
+                self._update_live_indicators(state, bar)
+            live = self.live_indicators[symbol] = {
+                'state': state,
+                'history': self.calculate_indicators(history.copy()).tail(LIVE_HISTORY_BARS)
+            }
+        
+        latest = yf.Ticker(symbol).history(period="1d", interval="1d")
+        if latest.empty:
+            return live['history']
+        
+        bar = latest.iloc[-1]
+        provisional = {name: indicator.copy() for name, indicator in live['state'].items()}
+        row = dict(bar)
+        row.update(self._update_live_indicators(provisional, bar))
+        current = pd.DataFrame([row], index=latest.index[-1:])
+        return pd.concat([live['history'], current])
+    
     def backtest_strategy(self, 
                          strategy: Callable, 
                          symbols: List[str], 
@@ -276,6 +323,54 @@ class StrategyTester:
                          end_date: str,
                          initial_capital: float = 100000) -> Dict[str, Any]:
         """Backtest a trading strategy"""
+        historical_data = self._load_backtest_data(symbols, start_date, end_date)
+        return self._simulate_backtest(strategy, symbols, historical_data, self._trading_days(start_date, end_date), initial_capital)
+    
+    def walk_forward(self,
+                     strategy: Callable,
+                     symbols: List[str],
+                     start_date: str,
+                     end_date: str,
+                     train_size: int,
+                     test_size: int,
+                     step: int = None,
+                     expanding: bool = False,
+                     initial_capital: float = 100000,
+                     max_workers: int = None) -> Dict[str, Any]:
+        """Walk-forward evaluation of a strategy over rolling train/test windows of trading days
+        
+        History and indicators are loaded once; every fold backtests its
+        windows from ``initial_capital`` on that shared data. Windows keep
+        their portfolio to themselves, so they run in parallel worker
+        processes. See ``walk_forward_windows`` for the result.
+        """
+        historical_data = self._load_backtest_data(symbols, start_date, end_date)
+        dates = self._trading_days(start_date, end_date)
+        run_window = partial(_window_metrics, strategy, symbols, historical_data, dates, initial_capital)
+        return walk_forward_windows(dates, run_window, train_size, test_size, step, expanding, max_workers)
+    
+    def _trading_days(self, start_date: str, end_date: str) -> pd.DatetimeIndex:
+        """Weekdays between the dates"""
+        dates = pd.date_range(start=start_date, end=end_date)
+        return dates[dates.weekday < 5]
+    
+    def _load_backtest_data(self, symbols: List[str], start_date: str, end_date: str) -> Dict[str, pd.DataFrame]:
+        """Historical data with indicators for every symbol that has any"""
+        historical_data = {}
+        for symbol in symbols:
+            data = self.get_historical_data(symbol, start_date, end_date)
+            if not data.empty:
+                data = self.calculate_indicators(data)
+                historical_data[symbol] = data
+        return historical_data
+    
+    @staticmethod
+    def _simulate_backtest(strategy: Callable,
+                           symbols: List[str],
+                           historical_data: Dict[str, pd.DataFrame],
+                           dates: pd.DatetimeIndex,
+                           initial_capital: float) -> Dict[str, Any]:
+        """Trade the strategy over ``dates`` from ``initial_capital``"""
         results = {
             'trades': [],
             'portfolio_value': [],
@@ -290,19 +385,8 @@ class StrategyTester:
             'value': initial_capital
         }
         
-        # Get historical data for all symbols
-        historical_data = {}
-        for symbol in symbols:
-            data = self.get_historical_data(symbol, start_date, end_date)
-            if not data.empty:
-                data = self.calculate_indicators(data)
-                historical_data[symbol] = data
-        
         # Run strategy on each day
-        for date in pd.date_range(start=start_date, end=end_date):
-            if date.weekday() >= 5:  # Skip weekends
-                continue
-                
+        for date in dates:
             daily_portfolio_value = portfolio['cash']
             
             # Update positions value
@@ -353,13 +437,8 @@ class StrategyTester:
             results['portfolio_value'].append(daily_portfolio_value)
         
         # Calculate metrics
-        returns = pd.Series(results['portfolio_value']).pct_change()
-        results['metrics'] = {
-            'total_return': (results['portfolio_value'][-1] / initial_capital - 1) * 100,
-            'sharpe_ratio': np.sqrt(252) * returns.mean() / returns.std() if len(returns) > 1 else 0,
-            'max_drawdown': (pd.Series(results['portfolio_value']).cummax() - pd.Series(results['portfolio_value'])) / pd.Series(results['portfolio_value']).cummax() * 100,
-            'num_trades': len(results['trades'])
-        }
+        trades = trade_arrays(results['trades']) if results['trades'] else None
+        results['metrics'] = compute_metrics([initial_capital] + results['portfolio_value'], trades)
         
         return results
     
@@ -0,0 +1,58 @@
+"""Bar and panel factories and provider stubs shared by the tests."""
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from schwab_trader.services.data_manager import DataManager
+from schwab_trader.utils.price_panel import PricePanel
+
+
+def make_bars(start, end):
+    """Business-day OHLCV bars whose close rises by one from 100."""
+    index = pd.bdate_range(start, end)
+    closes = np.arange(len(index), dtype=float) + 100
+    return pd.DataFrame({
+        'Open': closes,
+        'High': closes + 1,
+        'Low': closes - 1,
+        'Close': closes,
+        'Volume': 1000.0
+    }, index=index)
+
+
+def make_panel(closes, volumes, start=datetime(2023, 1, 2)):
+    """Panel of daily bars from (dates x symbols) close and volume arrays."""
+    closes = np.asarray(closes, dtype=float)
+    volumes = np.asarray(volumes, dtype=float)
+    dates = [start + timedelta(days=i) for i in range(closes.shape[0])]
+    symbols = [f'SYM{j}' for j in range(closes.shape[1])]
+    return PricePanel(dates, symbols, np.stack([closes, closes, closes, closes, volumes]))
+
+
+def random_panel(n_dates, n_symbols, seed, price=50.0):
+    """Panel of random-walk closes around ``price`` with random volumes."""
+    rng = np.random.default_rng(seed)
+    closes = price * np.exp(np.cumsum(rng.normal(0, 0.02, (n_dates, n_symbols)), axis=0))
+    volumes = rng.uniform(2e5, 2e6, (n_dates, n_symbols))
+    return make_panel(closes, volumes, start=datetime(2022, 1, 3))
+
+
+class StubDataManager(DataManager):
+    """Serves ``make_bars`` for any range and records every provider request.
+
+    Dates in ``blocked`` are left out of the responses, as a provider
+    missing or lagging on them would. ``delay`` slows every fetch down.
+    """
+
+    def __init__(self, store, delay=0.0, **kwargs):
+        super().__init__(store=store, **kwargs)
+        self.delay = delay
+        self.requests = []
+        self.blocked = set()
+
+    def _fetch_historical_data(self, symbol, start_date, end_date, source='auto'):
+        self.requests.append((symbol, start_date.date(), end_date.date()))
+        time.sleep(self.delay)
+        bars = make_bars(start_date, end_date)
+        bars = bars[[day.date() not in self.blocked for day in bars.index]]
+        return bars if not bars.empty else None
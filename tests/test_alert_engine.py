@@ -0,0 +1,220 @@
+import random
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from schwab_trader import indicators
+from schwab_trader.services.alert_engine import CONDITIONS, AlertEngine, AlertRule, PriceThresholdIndex
+from schwab_trader.services.ohlcv_store import OHLCVStore
+from schwab_trader.services.quote_batcher import QuoteBatcher, QuoteSource, make_quote
+from schwab_trader.services.volume_history import VolumeHistory
+from schwab_trader.tasks.alert_monitor import run_alert_cycle
+from helpers import make_bars
+
+
+class PriceSource(QuoteSource):
+    name = 'prices'
+
+    def __init__(self, prices):
+        self.prices = prices
+
+    def fetch(self, symbols):
+        return {symbol: make_quote(symbol, self.prices[symbol]) for symbol in symbols if symbol in self.prices}
+
+
+class TestAlertEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = AlertEngine()
+
+    def test_price_conditions(self):
+        """Test above, below and crosses fire once on the right tick"""
+        self.engine.load([
+            AlertRule(1, 'AAPL', 'price', 'above', 200),
+            AlertRule(2, 'AAPL', 'price', 'below', 150),
+            AlertRule(3, 'AAPL', 'price', 'crosses', 180)
+        ])
+        self.assertEqual(self.engine.process({'symbol': 'AAPL', 'price': 175}), [])
+        fired = self.engine.process({'symbol': 'AAPL', 'price': 185})
+        self.assertEqual([item.rule.id for item in fired], [3])
+
+        fired = self.engine.process({'symbol': 'aapl', 'price': 201})
+        self.assertEqual([item.rule.id for item in fired], [1])
+        self.assertEqual(self.engine.process({'symbol': 'AAPL', 'price': 205}), [])
+        self.assertEqual([item.rule.id for item in self.engine.drain()], [3, 1])
+        self.assertEqual(len(self.engine), 1)
+
+    def test_ticks_only_visit_their_symbol(self):
+        """Test other symbols' rules are not evaluated"""
+        self.engine.load([AlertRule(i, f'SYM{i}', 'volume', 'above', 2.0) for i in range(1000)])
+        self.engine.process({'symbol': 'SYM5', 'volume_ratio': 1.0})
+        self.assertEqual(self.engine.metrics()['evaluations'], 1)
+
+    def test_price_ticks_only_visit_triggered_rules(self):
+        """Test a price move visits only the thresholds it passes"""
+        self.engine.load([AlertRule(i, 'AAPL', 'price', 'crosses', 100 + i) for i in range(10_000)])
+        self.engine.process({'symbol': 'AAPL', 'price': 99.5})
+        fired = self.engine.process({'symbol': 'AAPL', 'price': 104.5})
+        self.assertEqual(sorted(item.rule.value for item in fired), [100, 101, 102, 103, 104])
+        self.assertEqual(self.engine.metrics()['evaluations'], 5)
+
+        self.engine.remove(6)
+        fired = self.engine.process({'symbol': 'AAPL', 'price': 107})
+        self.assertEqual(sorted(item.rule.id for item in fired), [5, 7])
+
+    def test_reload_is_incremental(self):
+        """Test reloading drops deactivated rules and picks up edits"""
+        self.engine.load([AlertRule(1, 'AAPL', 'price', 'above', 200), AlertRule(2, 'AAPL', 'price', 'below', 100)])
+        self.engine.load([AlertRule(1, 'AAPL', 'price', 'above', 150), AlertRule(3, 'MSFT', 'price', 'above', 300)])
+
+        self.assertEqual(len(self.engine), 2)
+        self.assertEqual(self.engine.process({'symbol': 'AAPL', 'price': 90}), [])
+        self.assertEqual([item.rule.id for item in self.engine.process({'symbol': 'AAPL', 'price': 160})], [1])
+
+    def test_volume_alerts_use_history_baseline(self):
+        """Test volume multiples are measured against the running baseline"""
+        history = VolumeHistory()
+        for _ in range(30):
+            history.append('AAPL', 1_000_000.0)
+        engine = AlertEngine(volume_history=history)
+        engine.load([AlertRule(1, 'AAPL', 'volume', 'above', 2.0)])
+
+        self.assertEqual(engine.process({'symbol': 'AAPL', 'volume': 1_500_000}), [])
+        fired = engine.process({'symbol': 'AAPL', 'volume': 2_500_000})
+        self.assertAlmostEqual(fired[0].observed, 2.5)
+
+    def test_volume_baseline_is_seeded_from_the_store(self):
+        """Test volume alerts work before anything else fills the history"""
+        with tempfile.TemporaryDirectory() as root:
+            store = OHLCVStore(root)
+            store.write('AAPL', make_bars('2024-01-02', '2024-02-29'), '2024-01-02', '2024-02-29')
+            engine = AlertEngine(store=store)
+            engine.load([AlertRule(1, 'AAPL', 'volume', 'above', 2.0)])
+
+            at = datetime(2024, 3, 1, 15)
+            self.assertEqual(engine.process({'symbol': 'AAPL', 'volume': 1500.0}, at=at), [])
+            fired = engine.process({'symbol': 'AAPL', 'volume': 2500.0}, at=at + timedelta(seconds=15))
+        self.assertAlmostEqual(fired[0].observed, 2.5)
+
+    def test_session_volumes_feed_the_history(self):
+        """Test each finished session's last tick volume becomes a baseline print"""
+        history = VolumeHistory()
+        engine = AlertEngine(volume_history=history)
+        engine.load([AlertRule(1, 'AAPL', 'volume', 'above', 2.0)])
+        for day in pd.bdate_range('2024-03-04', periods=3):
+            at = day.to_pydatetime() + timedelta(hours=15)
+            for volume in (400_000.0, 1_000_000.0):
+                self.assertEqual(engine.process({'symbol': 'AAPL', 'volume': volume}, at=at), [])
+
+        self.assertEqual(list(history.values('AAPL')), [1_000_000.0, 1_000_000.0])
+        fired = engine.process({'symbol': 'AAPL', 'volume': 3_000_000.0}, at=datetime(2024, 3, 7, 15))
+        self.assertAlmostEqual(fired[0].observed, 3.0)
+
+    def test_technical_alerts_use_daily_rsi(self):
+        """Test RSI alerts wait for the indicator to warm up over daily closes"""
+        self.engine.load([AlertRule(1, 'AAPL', 'technical', 'above', 70)])
+        days = pd.bdate_range('2024-03-04', periods=20)
+        fired = []
+        for i, day in enumerate(days):
+            at = day.to_pydatetime() + timedelta(hours=15)
+            fired.extend(self.engine.process({'symbol': 'AAPL', 'price': 100.0 + i}, at=at))
+        self.assertEqual(len(fired), 1)
+        self.assertEqual(fired[0].observed, 100.0)
+        self.assertEqual(fired[0].triggered_at.date(), days[14].date())
+
+    def test_ticks_within_a_session_share_one_bar(self):
+        """Test intraday ticks revise the forming bar instead of adding bars"""
+        self.engine.load([AlertRule(1, 'AAPL', 'technical', 'above', 70)])
+        at = datetime(2024, 3, 4, 15)
+        for i in range(40):
+            self.engine.process({'symbol': 'AAPL', 'price': 100.0 + i}, at=at + timedelta(seconds=15 * i))
+        self.assertEqual(self.engine.drain(), [])
+
+    def test_rsi_is_seeded_from_stored_closes(self):
+        """Test the RSI starts from stored daily closes, with the tick as today's bar"""
+        with tempfile.TemporaryDirectory() as root:
+            store = OHLCVStore(root)
+            bars = make_bars('2024-01-02', '2024-02-29')
+            bars['Close'] = np.linspace(100, 130, len(bars))
+            store.write('AAPL', bars, '2024-01-02', '2024-02-29')
+            engine = AlertEngine(store=store)
+            engine.load([AlertRule(1, 'AAPL', 'technical', 'below', 50)])
+
+            at = datetime(2024, 3, 1, 15)
+            self.assertEqual(engine.process({'symbol': 'AAPL', 'price': 131.0}, at=at), [])
+            fired = engine.process({'symbol': 'AAPL', 'price': 100.0}, at=at + timedelta(seconds=15))
+
+        expected = indicators.rsi(np.append(bars['Close'].to_numpy(), 100.0), 14)[-1]
+        self.assertAlmostEqual(fired[0].observed, expected)
+
+    def test_load_from_models_skips_invalid(self):
+        """Test Alert rows are converted and bad ones skipped"""
+        rows = [
+            SimpleNamespace(id=1, user_id=7, symbol='msft', alert_type='price', condition='below', value=300.0),
+            SimpleNamespace(id=2, user_id=7, symbol='MSFT', alert_type='news', condition='above', value=1.0)
+        ]
+        self.assertEqual(self.engine.load(rows), 1)
+        self.assertEqual(self.engine.symbols(), ['MSFT'])
+
+    def test_throughput(self):
+        """Test ticks stay fast with tens of thousands of alerts loaded"""
+        self.engine.load([
+            AlertRule(i, f'SYM{i % 500}', 'price', 'crosses', 1000 + i) for i in range(50_000)
+        ])
+        ticks = [{'symbol': f'SYM{i % 500}', 'price': 100.0 + i % 7} for i in range(20_000)]
+        started = time.perf_counter()
+        self.engine.process_many(ticks)
+        elapsed = time.perf_counter() - started
+        self.assertGreater(len(ticks) / elapsed, 20_000)
+
+    def test_legacy_alert_rows(self):
+        """Test FastAPI alerts with condition_type and threshold are understood"""
+        rows = [
+            SimpleNamespace(id=1, symbol='AAPL', condition_type='price_above', threshold=200.0),
+            SimpleNamespace(id=2, symbol='AAPL', condition_type='percent_change', threshold=5.0)
+        ]
+        self.engine.load(rows)
+        fired = self.engine.process({'symbol': 'AAPL', 'price': 190.0, 'change_percent': -6.0})
+        self.assertEqual([item.rule.id for item in fired], [2])
+
+    def test_alert_cycle_batches_quotes(self):
+        """Test the monitor cycle quotes alert symbols and feeds the engine"""
+        quotes = QuoteBatcher(PriceSource({'AAPL': 210.0, 'MSFT': 290.0}), window=0.01)
+        self.engine.load([AlertRule(1, 'AAPL', 'price', 'above', 200), AlertRule(2, 'MSFT', 'price', 'above', 300)])
+        fired = run_alert_cycle(self.engine, quotes)
+        self.assertEqual([item.rule.id for item in fired], [1])
+        self.assertEqual(quotes.metrics()['requests'], 1)
+
+
+class TestPriceThresholdIndex(unittest.TestCase):
+    def test_matches_linear_scan(self):
+        """Test the index fires exactly the rules a linear scan would"""
+        rng = random.Random(5)
+        index = PriceThresholdIndex()
+        scan = {}
+        next_id = 0
+        previous = None
+        for _ in range(300):
+            for _ in range(rng.randint(0, 5)):
+                rule = AlertRule(next_id, 'AAPL', 'price', rng.choice(CONDITIONS), rng.randint(90, 110))
+                index.add(rule)
+                scan[rule.id] = rule
+                next_id += 1
+            if scan and rng.random() < 0.2:
+                rule = scan.pop(rng.choice(list(scan)))
+                self.assertTrue(index.remove(rule))
+
+            price = rng.choice([rng.randint(90, 110), rng.uniform(90, 110)])
+            expected = {rule.id for rule in scan.values() if rule.matches(price, previous)}
+            fired = {rule.id for rule in index.fire('AAPL', previous, price)}
+            self.assertEqual(fired, expected)
+            for alert_id in fired:
+                del scan[alert_id]
+            previous = price
+        self.assertEqual(len(index), len(scan))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import asyncio
+import time
+import unittest
+from datetime import date
+import pandas as pd
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from schwab_trader.services.async_fetcher import (
+    AlphaVantageProvider,
+    AsyncFetcher,
+    SchwabProvider,
+    TokenBucket
+)
+from schwab_trader.utils.circuit_breaker import reset_breakers
+
+
+def daily_series(start, end):
+    return {
+        day.strftime('%Y-%m-%d'): {
+            '1. open': '10.0', '2. high': '11.0', '3. low': '9.0', '4. close': '10.5', '5. volume': '1000'
+        }
+        for day in pd.bdate_range(start, end)
+    }
+
+
+class StubServer:
+    """Local provider endpoints that record load and can be told to fail."""
+
+    def __init__(self):
+        self.requests = {'alpha_vantage': 0, 'schwab': 0}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failures = {'alpha_vantage': 0, 'schwab': 0}
+        self.status = {'alpha_vantage': 200, 'schwab': 200}
+        app = web.Application()
+        app.router.add_get('/query', self.alpha_vantage)
+        app.router.add_get('/pricehistory', self.schwab)
+        self.server = TestServer(app)
+
+    async def _track(self, name):
+        self.requests[name] += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if self.failures[name]:
+            self.failures[name] -= 1
+            return web.Response(status=429)
+        if self.status[name] != 200:
+            return web.Response(status=self.status[name])
+        return None
+
+    async def alpha_vantage(self, request):
+        error = await self._track('alpha_vantage')
+        if error is not None:
+            return error
+        if request.query['symbol'] == 'BAD':
+            return web.json_response({'Error Message': 'Invalid API call'})
+        return web.json_response({'Time Series (Daily)': daily_series('2023-01-02', '2023-01-31')})
+
+    async def schwab(self, request):
+        error = await self._track('schwab')
+        if error is not None:
+            return error
+        days = pd.bdate_range('2023-01-02', '2023-01-31')
+        return web.json_response({'candles': [
+            {'open': 1, 'high': 2, 'low': 0.5, 'close': 1.5, 'volume': 100, 'datetime': int(day.timestamp() * 1000)}
+            for day in days
+        ]})
+
+    def url(self, path):
+        return str(self.server.make_url(path))
+
+
+class TestAsyncFetcher(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        reset_breakers()
+        self.stub = StubServer()
+        await self.stub.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.stub.server.close()
+
+    def alpha_vantage(self, rate=100, per=1.0, max_concurrency=5):
+        return AlphaVantageProvider('key', base_url=self.stub.url('/query'), rate=rate, per=per,
+                                    max_concurrency=max_concurrency)
+
+    def schwab(self):
+        return SchwabProvider('token', base_url=self.stub.url(''), rate=100, per=1.0)
+
+    async def test_jobs_are_fetched_and_sliced(self):
+        """Test every job gets its own date range"""
+        fetcher = AsyncFetcher([self.alpha_vantage()])
+        jobs = [('AAPL', date(2023, 1, 9), date(2023, 1, 13)), ('MSFT', date(2023, 1, 2), date(2023, 1, 31))]
+        results = await fetcher.fetch_all(jobs)
+
+        self.assertEqual(len(results[jobs[0]]), 5)
+        self.assertEqual(len(results[jobs[1]]), len(pd.bdate_range('2023-01-02', '2023-01-31')))
+        self.assertEqual(list(results[jobs[0]].columns), ['Open', 'High', 'Low', 'Close', 'Volume'])
+        self.assertEqual(results[jobs[0]].index[0], pd.Timestamp('2023-01-09'))
+
+    async def test_falls_back_to_next_provider(self):
+        """Test provider errors move the job to the next provider"""
+        self.stub.status['alpha_vantage'] = 503
+        fetcher = AsyncFetcher([self.alpha_vantage(), self.schwab()], retries=1, retry_delay=0.01)
+        job = ('AAPL', date(2023, 1, 2), date(2023, 1, 6))
+        results = await fetcher.fetch_all([job, ('BAD', date(2023, 1, 2), date(2023, 1, 6))])
+
+        self.assertEqual(results[job]['Close'].tolist(), [1.5] * 5)
+        self.assertEqual(self.stub.requests['alpha_vantage'], 4)
+        self.assertEqual(fetcher.stats['alpha_vantage']['failures'], 2)
+
+    async def test_rate_limited_responses_are_retried(self):
+        """Test HTTP 429 is retried on the same provider"""
+        self.stub.failures['alpha_vantage'] = 1
+        fetcher = AsyncFetcher([self.alpha_vantage()], retries=2, retry_delay=0.01)
+        results = await fetcher.fetch_all([('AAPL', date(2023, 1, 2), date(2023, 1, 6))])
+
+        self.assertEqual(len(next(iter(results.values()))), 5)
+        self.assertEqual(self.stub.requests['alpha_vantage'], 2)
+
+    async def test_budget_and_concurrency_are_respected(self):
+        """Test a 5-per-second budget spreads 10 jobs over a second, 2 at a time"""
+        fetcher = AsyncFetcher([self.alpha_vantage(rate=5, per=1.0, max_concurrency=2)])
+        jobs = [(f'SYM{i}', date(2023, 1, 2), date(2023, 1, 6)) for i in range(10)]
+
+        start = time.monotonic()
+        results = await fetcher.fetch_all(jobs)
+        elapsed = time.monotonic() - start
+
+        self.assertTrue(all(result is not None for result in results.values()))
+        self.assertGreaterEqual(elapsed, 0.9)
+        self.assertLessEqual(self.stub.max_in_flight, 2)
+
+
+class TestTokenBucket(unittest.IsolatedAsyncioTestCase):
+    async def test_burst_then_rate(self):
+        """Test the bucket allows its capacity at once and then refills at the rate"""
+        bucket = TokenBucket(rate=20, per=1.0, capacity=5)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.05)
+
+        for _ in range(4):
+            await bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from schwab_trader.utils.backtester import StrategyBacktester, SimulatedPortfolio
+from schwab_trader.utils.price_panel import PricePanel
+
+
+class ThresholdStrategy:
+    """Buys below a price and sells above another."""
+
+    def __init__(self, buy_below, sell_above):
+        self.buy_below = buy_below
+        self.sell_above = sell_above
+        self.seen = []
+
+    def generate_signals(self, data):
+        self.seen.append(data)
+        signals = []
+        for symbol, bars in data.items():
+            if not bars:
+                continue
+            close = bars[0]['close']
+            if close < self.buy_below:
+                signals.append({'symbol': symbol, 'action': 'BUY', 'reason': 'cheap'})
+            elif close > self.sell_above:
+                signals.append({'symbol': symbol, 'action': 'SELL', 'reason': 'rich'})
+        return signals
+
+    def calculate_position_size(self, portfolio, signal):
+        return portfolio.total_value * 0.1
+
+
+def make_bars(closes, start=datetime(2023, 1, 2)):
+    return [
+        {
+            'date': start + timedelta(days=i),
+            'open': close,
+            'high': close,
+            'low': close,
+            'close': close,
+            'volume': 1000
+        }
+        for i, close in enumerate(closes)
+    ]
+
+
+class TestPricePanel(unittest.TestCase):
+    def test_aligns_symbols_on_union_of_dates(self):
+        """Test symbols with different histories share one date axis"""
+        aapl = make_bars([10.0, 11.0, 12.0])
+        msft = make_bars([20.0, 21.0])[1:]
+        panel = PricePanel.from_records({'AAPL': aapl, 'MSFT': msft})
+
+        self.assertEqual(panel.dates, [bar['date'] for bar in aapl])
+        self.assertEqual(panel.close[:, 0].tolist(), [10.0, 11.0, 12.0])
+        self.assertTrue(np.isnan(panel.close[0, 1]))
+        self.assertEqual(panel.close[1, 1], 21.0)
+        self.assertTrue(np.isnan(panel.close[2, 1]))
+
+    def test_bars_returns_original_records(self):
+        """Test per-date bar lists reuse the input records"""
+        aapl = make_bars([10.0, 11.0])
+        panel = PricePanel.from_records({'AAPL': aapl, 'MSFT': []})
+
+        daily = panel.bars(1)
+        self.assertIs(daily['AAPL'][0], aapl[1])
+        self.assertEqual(daily['MSFT'], [])
+
+
+class TestSimulatedPortfolio(unittest.TestCase):
+    def test_fills_value_each_symbol_at_its_own_price(self):
+        """Test a fill does not revalue other positions at its price"""
+        portfolio = SimulatedPortfolio(1000)
+        portfolio.update_position('AAPL', 10, 10.0)
+        portfolio.update_position('MSFT', 2, 50.0)
+
+        self.assertEqual(portfolio.cash_value, 800)
+        self.assertEqual(portfolio.market_value, 200)
+        self.assertEqual(portfolio.total_value, 1000)
+
+    def test_mark_updates_running_value(self):
+        """Test marks and partial sells adjust the market value incrementally"""
+        portfolio = SimulatedPortfolio(1000)
+        portfolio.update_position('AAPL', 10, 10.0)
+        portfolio.update_position('AAPL', 10, 20.0)
+        self.assertEqual(portfolio.positions['AAPL'].cost_basis, 15.0)
+
+        portfolio.mark('AAPL', 25.0)
+        self.assertEqual(portfolio.total_value, 700 + 500)
+
+        portfolio.update_position('AAPL', -5, 30.0)
+        self.assertEqual(portfolio.positions['AAPL'].quantity, 15)
+        self.assertEqual(portfolio.total_value, 850 + 450)
+
+        portfolio.update_position('AAPL', -15, 30.0)
+        self.assertEqual(portfolio.positions, {})
+        self.assertEqual(portfolio.total_value, 1300)
+
+
+    def test_mark_prices_revalues_held_columns(self):
+        """Test a row of closes revalues held columns and skips missing closes"""
+        portfolio = SimulatedPortfolio(10000, ['AAPL', 'MSFT', 'GOOGL'])
+        portfolio.update_position('AAPL', 10, 10.0)
+        portfolio.update_position('GOOGL', 4, 100.0)
+
+        portfolio.mark_prices(np.array([12.0, 50.0, np.nan]))
+        self.assertEqual(portfolio.market_value, 10 * 12.0 + 4 * 100.0)
+        portfolio.mark_prices(np.array([11.0, 55.0, 110.0]))
+        self.assertEqual(portfolio.market_value, 10 * 11.0 + 4 * 110.0)
+        self.assertEqual(portfolio.positions['GOOGL'].market_value, 440.0)
+        self.assertNotIn('MSFT', portfolio.positions)
+
+class TestStrategyBacktester(unittest.TestCase):
+    def test_trades_and_portfolio_values(self):
+        """Test a simple buy/sell round trip"""
+        data = {'AAPL': make_bars([10.0, 9.0, 12.0, 15.0])}
+        backtester = StrategyBacktester(ThresholdStrategy(buy_below=10.0, sell_above=14.0), initial_capital=1000)
+        results = backtester.backtest(data)
+
+        actions = [(t['action'], t['quantity'], t['price']) for t in results['trades']]
+        self.assertEqual(actions, [('BUY', 11.0, 9.0), ('SELL', 11.0, 15.0)])
+        self.assertEqual(
+            [row['total_value'] for row in results['portfolio_values']],
+            [1000.0, 1000.0, 1033.0, 1066.0]
+        )
+        self.assertAlmostEqual(results['portfolio_values'][-1]['total_value'], 1066.0)
+
+    def test_date_range_is_respected(self):
+        """Test start and end dates limit the simulated days"""
+        bars = make_bars([10.0, 11.0, 12.0, 13.0, 14.0])
+        strategy = ThresholdStrategy(buy_below=0, sell_above=100)
+        results = StrategyBacktester(strategy).backtest(
+            {'AAPL': bars},
+            start_date=bars[1]['date'],
+            end_date=bars[3]['date']
+        )
+
+        self.assertEqual(
+            [row['date'] for row in results['portfolio_values']],
+            [bar['date'] for bar in bars[1:4]]
+        )
+
+    def test_signal_without_bar_is_skipped(self):
+        """Test signals for symbols that did not trade that day are ignored"""
+        class AlwaysBuy(ThresholdStrategy):
+            def generate_signals(self, data):
+                return [{'symbol': symbol, 'action': 'BUY'} for symbol in data]
+
+        data = {
+            'AAPL': make_bars([10.0, 10.0]),
+            'MSFT': make_bars([20.0])
+        }
+        results = StrategyBacktester(AlwaysBuy(0, 0), initial_capital=1000).backtest(data)
+
+        self.assertEqual(
+            [(t['date'], t['symbol']) for t in results['trades']],
+            [
+                (data['AAPL'][0]['date'], 'AAPL'),
+                (data['MSFT'][0]['date'], 'MSFT'),
+                (data['AAPL'][1]['date'], 'AAPL')
+            ]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
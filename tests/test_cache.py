@@ -0,0 +1,189 @@
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+from datetime import datetime
+import numpy as np
+from flask import Flask, session
+import pandas as pd
+from schwab_trader.services.volume_analysis import VolumeAnalysisService
+from schwab_trader.utils.api_utils import api_response_cache, cache_response
+from schwab_trader.utils.cache import MISSING, DiskCache, LRUCache, cached, function_key, make_key
+
+
+class Client:
+    def __init__(self, token):
+        self.token = token
+        self.calls = 0
+
+    @cache_response(timeout=60)
+    def get_quotes(self, symbols, fields='quote'):
+        self.calls += 1
+        return {'symbols': symbols, 'fields': fields}
+
+
+class AccountClient:
+    def __init__(self):
+        self.calls = 0
+
+    @cache_response(timeout=60, per_user=True)
+    def get_accounts(self):
+        self.calls += 1
+        return {'token': session['oauth_token']['access_token']}
+
+
+class TestKeys(unittest.TestCase):
+    def test_keys_are_stable(self):
+        """Test equal arguments give equal keys regardless of container order"""
+        self.assertEqual(make_key('AAPL', {'a': 1, 'b': 2}), make_key('AAPL', {'b': 2, 'a': 1}))
+        self.assertEqual(make_key(datetime(2023, 1, 2)), make_key(datetime(2023, 1, 2)))
+        self.assertNotEqual(make_key('AAPL', 1), make_key('AAPL', '1'))
+        self.assertEqual(make_key(np.arange(3.0)), make_key(np.arange(3.0)))
+
+    def test_function_key_ignores_self_and_binds_defaults(self):
+        """Test instances and equivalent call forms share a key"""
+        func = Client.get_quotes.__wrapped__
+        first = function_key(func, (Client('a'), ['AAPL']), {})
+        self.assertEqual(first, function_key(func, (Client('b'), ['AAPL'], 'quote'), {}))
+        self.assertEqual(first, function_key(func, (Client('c'),), {'symbols': ['AAPL']}))
+        self.assertNotEqual(first, function_key(func, (Client('a'), ['MSFT']), {}))
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the entry bound keeps recently read entries"""
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.metrics()['evictions'], 1)
+
+    def test_byte_bound(self):
+        """Test large values push out older ones and oversized values are skipped"""
+        cache = LRUCache(max_entries=100, max_bytes=10_000)
+        cache.set('first', np.zeros(800))
+        cache.set('second', np.zeros(800))
+        self.assertNotIn('first', cache)
+        self.assertLessEqual(cache.metrics()['bytes'], 10_000)
+
+        cache.set('huge', np.zeros(10_000))
+        self.assertNotIn('huge', cache)
+
+    def test_ttl(self):
+        """Test entries expire and None means no expiry"""
+        cache = LRUCache(ttl=0.05)
+        cache.set('short', 1)
+        cache.set('forever', 2, ttl=None)
+        time.sleep(0.06)
+
+        self.assertIsNone(cache.get('short'))
+        self.assertEqual(cache.get('forever'), 2)
+        metrics = cache.metrics()
+        self.assertEqual((metrics['hits'], metrics['misses'], metrics['expirations']), (1, 1, 1))
+
+    def test_get_or_set(self):
+        """Test the factory only runs on a miss"""
+        cache = LRUCache()
+        calls = []
+        for _ in range(3):
+            cache.get_or_set('key', lambda: calls.append(1) or len(calls))
+        self.assertEqual(calls, [1])
+
+
+class TestDiskTier(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_evicted_entries_spill_and_are_promoted(self):
+        """Test entries pushed out of memory are still served from disk"""
+        cache = LRUCache(max_entries=1, disk=DiskCache(self.root))
+        frame = pd.DataFrame({'Close': [1.0, 2.0]})
+        cache.set('frame', frame)
+        cache.set('other', 1)
+
+        self.assertNotIn('frame', cache)
+        pd.testing.assert_frame_equal(cache.get('frame'), frame)
+        self.assertIn('frame', cache)
+        metrics = cache.metrics()
+        self.assertEqual((metrics['spills'], metrics['disk_hits']), (2, 1))
+
+    def test_disk_entries_expire(self):
+        """Test expired files are ignored and removed"""
+        disk = DiskCache(self.root)
+        disk.set('old', 1, expires_at=time.time() - 1)
+        self.assertIsNone(LRUCache(disk=disk).get('old'))
+
+    def test_disk_is_bounded_by_bytes(self):
+        """Test the oldest files are removed past the byte bound"""
+        disk = DiskCache(self.root, max_bytes=20_000)
+        for i in range(5):
+            disk.set(f'key{i}', np.zeros(1000))
+            time.sleep(0.01)
+        self.assertIs(disk.get('key0'), MISSING)
+        self.assertEqual(len(disk.get('key4')), 1000)
+
+
+class TestDecorators(unittest.TestCase):
+    def setUp(self):
+        api_response_cache.clear()
+
+    def test_cache_response_is_shared_across_instances(self):
+        """Test a second client is served the first client's response"""
+        first, second = Client('a'), Client('b')
+        self.assertEqual(first.get_quotes(['AAPL']), second.get_quotes(['AAPL'], fields='quote'))
+        self.assertEqual((first.calls, second.calls), (1, 0))
+
+        second.get_quotes(['MSFT'])
+        self.assertEqual(second.calls, 1)
+
+    def test_per_user_responses_are_not_shared(self):
+        """Test account data is cached per caller token"""
+        app = Flask(__name__)
+        app.secret_key = 'test'
+        client = AccountClient()
+        results = []
+        for token in ('alice', 'bob', 'alice'):
+            with app.test_request_context():
+                session['oauth_token'] = {'access_token': token}
+                results.append(client.get_accounts())
+
+        self.assertEqual([result['token'] for result in results], ['alice', 'bob', 'alice'])
+        self.assertEqual(client.calls, 2)
+
+    def test_cached_skips_none(self):
+        """Test None results are retried"""
+        calls = []
+
+        @cached(LRUCache())
+        def lookup(symbol):
+            calls.append(symbol)
+            return None
+
+        lookup('AAPL')
+        lookup('AAPL')
+        self.assertEqual(len(calls), 2)
+
+
+class TestVolumeBaselines(unittest.TestCase):
+    def test_baseline_follows_new_volumes(self):
+        """Test the cached baseline is recomputed when the volumes change"""
+        service = VolumeAnalysisService()
+        service.logger = MagicMock()
+        volumes = [1_000_000.0] * 30
+        first = service.analyze_volume_pattern('AAPL', volumes)['baseline']
+        second = service.analyze_volume_pattern('AAPL', volumes[1:] + [5_000_000.0])['baseline']
+
+        self.assertAlmostEqual(first, 1_000_000.0)
+        self.assertGreater(second, first)
+
+
+if __name__ == '__main__':
+    unittest.main()
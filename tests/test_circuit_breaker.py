@@ -0,0 +1,163 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+import requests
+from flask import Flask
+from schwab_trader.routes.api import api_bp
+from schwab_trader.services.data_service import DataService
+from schwab_trader.utils.api_utils import retry_on_failure
+from schwab_trader.utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    get_breaker,
+    reset_breakers
+)
+from schwab_trader.utils.error_utils import CircuitOpenError, NetworkError, RateLimitError, ValidationError
+
+
+def failing(error):
+    def call():
+        raise error
+    return call
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        """Test the circuit opens at the threshold and then fails fast"""
+        breaker = CircuitBreaker('test', failure_threshold=3, recovery_timeout=60)
+        for _ in range(3):
+            with self.assertRaises(NetworkError):
+                breaker.call(failing(NetworkError('down')))
+        self.assertEqual(breaker.state, OPEN)
+
+        func = MagicMock()
+        start = time.monotonic()
+        with self.assertRaises(CircuitOpenError) as context:
+            breaker.call(func)
+        self.assertLess(time.monotonic() - start, 0.05)
+        func.assert_not_called()
+        self.assertEqual(context.exception.provider, 'test')
+        self.assertGreater(context.exception.retry_after, 0)
+
+    def test_success_resets_the_failure_count(self):
+        """Test only consecutive failures count"""
+        breaker = CircuitBreaker('test', failure_threshold=2)
+        with self.assertRaises(NetworkError):
+            breaker.call(failing(NetworkError('down')))
+        self.assertEqual(breaker.call(lambda: 1), 1)
+        with self.assertRaises(NetworkError):
+            breaker.call(failing(NetworkError('down')))
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_client_errors_do_not_count(self):
+        """Test errors that say nothing about provider health leave the circuit closed"""
+        breaker = CircuitBreaker('test', failure_threshold=1)
+        response = requests.Response()
+        response.status_code = 404
+        with self.assertRaises(requests.HTTPError):
+            breaker.call(failing(requests.HTTPError(response=response)))
+        with self.assertRaises(KeyError):
+            breaker.call(failing(KeyError('symbol')))
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_rate_limit_opens_immediately(self):
+        """Test a rate limit response opens the circuit for the rate limit cooldown"""
+        breaker = CircuitBreaker('test', failure_threshold=5, recovery_timeout=1, rate_limit_timeout=60)
+        with self.assertRaises(RateLimitError):
+            breaker.call(failing(RateLimitError('slow down')))
+        self.assertEqual(breaker.state, OPEN)
+        self.assertGreater(breaker.retry_after(), 30)
+
+    def test_half_open_trial(self):
+        """Test one trial call is let through after the recovery timeout"""
+        breaker = CircuitBreaker('test', failure_threshold=1, recovery_timeout=0.05)
+        with self.assertRaises(NetworkError):
+            breaker.call(failing(NetworkError('down')))
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, HALF_OPEN)
+
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_failure(NetworkError('still down'))
+        self.assertEqual(breaker.state, OPEN)
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.call(lambda: 'ok'), 'ok')
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_metrics(self):
+        """Test the counters"""
+        breaker = CircuitBreaker('test', failure_threshold=1)
+        breaker.call(lambda: None)
+        with self.assertRaises(NetworkError):
+            breaker.call(failing(NetworkError('down')))
+        with self.assertRaises(CircuitOpenError):
+            breaker.call(lambda: None)
+
+        metrics = breaker.metrics()
+        self.assertEqual(metrics['state'], OPEN)
+        self.assertEqual(
+            (metrics['successes'], metrics['failures'], metrics['rejections'], metrics['opens']),
+            (1, 1, 1, 1)
+        )
+
+
+class TestProviderBreakers(unittest.TestCase):
+    def setUp(self):
+        reset_breakers()
+
+    def tearDown(self):
+        reset_breakers()
+
+    def test_retry_skips_open_circuits(self):
+        """Test retry_on_failure does not sleep on an open circuit"""
+        func = MagicMock(side_effect=CircuitOpenError('schwab', 30))
+        start = time.monotonic()
+        with self.assertRaises(CircuitOpenError):
+            retry_on_failure(max_retries=3, delay=1)(func)()
+        self.assertEqual(func.call_count, 1)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    @patch('schwab_trader.services.data_service.requests.get')
+    def test_alpha_vantage_rate_limit_note_opens_circuit(self, get):
+        """Test a rate limit note stops further Alpha Vantage requests"""
+        get.return_value.json.return_value = {'Note': 'Thank you for using Alpha Vantage! call frequency'}
+        service = DataService('key')
+
+        with self.assertRaises(RateLimitError):
+            service.get_stock_quote('AAPL')
+        with self.assertRaises(CircuitOpenError):
+            service.get_stock_quote('AAPL')
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(get_breaker('alpha_vantage').state, OPEN)
+
+    @patch('schwab_trader.services.data_service.requests.get')
+    def test_alpha_vantage_errors_keep_their_types(self, get):
+        """Test network and parsing errors are still translated"""
+        service = DataService('key')
+        get.side_effect = requests.ConnectionError('refused')
+        with self.assertRaises(NetworkError):
+            service.get_stock_quote('AAPL')
+
+        get.side_effect = None
+        get.return_value.json.side_effect = ValueError('not json')
+        with self.assertRaises(ValidationError):
+            service.get_stock_quote('AAPL')
+
+    def test_metrics_route(self):
+        """Test /api/metrics reports each provider's breaker"""
+        get_breaker('schwab').record_failure(RateLimitError('slow down'))
+        app = Flask(__name__)
+        app.register_blueprint(api_bp)
+
+        response = app.test_client().get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        metrics = response.get_json()['circuit_breakers']
+        self.assertEqual(metrics['schwab']['state'], OPEN)
+        self.assertEqual(metrics['schwab']['opens'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
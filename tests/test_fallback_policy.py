@@ -0,0 +1,234 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pandas as pd
+from flask import Flask, session
+from schwab_trader.services.data_manager import DataManager
+from schwab_trader.services.fallback_policy import FallbackPolicy
+from schwab_trader.services.ohlcv_store import OHLCVStore
+from schwab_trader.utils.circuit_breaker import CLOSED, OPEN, circuit_breaker, get_breaker, reset_breakers
+from schwab_trader.utils.error_utils import NetworkError
+from helpers import make_bars
+
+
+def provider(result=None, delay=0.0, error=None, calls=None, name=None):
+    def call():
+        if calls is not None:
+            calls.append(name)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+    return call
+
+
+class TestFallbackPolicy(unittest.TestCase):
+    def test_slow_provider_is_hedged(self):
+        """Test the next provider starts after the hedge delay and wins"""
+        policy = FallbackPolicy(hedge_delay=0.05, adaptive=False)
+        start = time.monotonic()
+        name, result = policy.run([
+            ('slow', provider([1], delay=0.5)),
+            ('fast', provider([2], delay=0.01))
+        ])
+
+        self.assertEqual((name, result), ('fast', [2]))
+        self.assertLess(time.monotonic() - start, 0.3)
+
+    def test_fast_provider_is_not_hedged(self):
+        """Test no extra request is made when the first provider answers in time"""
+        calls = []
+        policy = FallbackPolicy(hedge_delay=0.2, adaptive=False)
+        name, _ = policy.run([
+            ('first', provider([1], delay=0.01, calls=calls, name='first')),
+            ('second', provider([2], calls=calls, name='second'))
+        ])
+        self.assertEqual(name, 'first')
+        self.assertEqual(calls, ['first'])
+
+    def test_failures_start_the_next_provider_immediately(self):
+        """Test errors and empty results fall through without waiting"""
+        policy = FallbackPolicy(hedge_delay=5.0, adaptive=False)
+        start = time.monotonic()
+        name, result = policy.run([
+            ('broken', provider(error=RuntimeError('down'))),
+            ('empty', provider(pd.DataFrame())),
+            ('good', provider([3]))
+        ])
+
+        self.assertEqual((name, result), ('good', [3]))
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(policy.stats()['broken']['error_rate'], policy.alpha)
+
+    def test_all_providers_failing(self):
+        """Test the policy reports no result"""
+        policy = FallbackPolicy(hedge_delay=0.01)
+        self.assertEqual(policy.run([('a', provider(None)), ('b', provider([]))]), (None, None))
+        self.assertEqual(policy.run([]), (None, None))
+
+    def test_timeout(self):
+        """Test a hung provider does not block past the timeout"""
+        policy = FallbackPolicy(hedge_delay=0.01, timeout=0.1)
+        start = time.monotonic()
+        self.assertEqual(policy.run([('hung', provider([1], delay=1.0))]), (None, None))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_providers_are_reordered_by_cost(self):
+        """Test slow and failing providers move behind healthy ones"""
+        policy = FallbackPolicy(hedge_delay=None)
+        self.assertEqual(policy.order(['schwab', 'yfinance']), ['schwab', 'yfinance'])
+
+        policy.record('schwab', 2.0, True)
+        policy.record('yfinance', 0.2, True)
+        self.assertEqual(policy.order(['schwab', 'yfinance']), ['yfinance', 'schwab'])
+
+        for _ in range(5):
+            policy.record('yfinance', 0.2, False)
+        self.assertEqual(policy.order(['schwab', 'yfinance']), ['schwab', 'yfinance'])
+
+    def test_sequential_mode(self):
+        """Test hedging can be disabled"""
+        running = []
+        lock = threading.Lock()
+
+        def tracked(result):
+            def call():
+                with lock:
+                    running.append(threading.current_thread().name)
+                time.sleep(0.02)
+                return result
+            return call
+
+        policy = FallbackPolicy(hedge_delay=None, adaptive=False)
+        self.assertEqual(policy.run([('a', tracked(None)), ('b', tracked([1]))]), ('b', [1]))
+        self.assertEqual(set(running), {threading.current_thread().name})
+
+    def test_providers_see_the_request_session(self):
+        """Test pooled provider calls run inside the caller's request context"""
+        app = Flask(__name__)
+        app.secret_key = 'test'
+
+        def schwab():
+            return [session['oauth_token']['access_token']]
+
+        policy = FallbackPolicy(hedge_delay=0.05, adaptive=False)
+        with app.test_request_context():
+            session['oauth_token'] = {'access_token': 'token'}
+            self.assertEqual(policy.run([('schwab', schwab)]), ('schwab', ['token']))
+
+
+class HedgedDataManager(DataManager):
+    """Schwab hangs while Yahoo answers quickly."""
+
+    def __init__(self, store, fallback):
+        super().__init__(store=store, fallback=fallback)
+        self.schwab_api = object()
+
+    def _get_schwab_data(self, symbol, start_date, end_date):
+        time.sleep(0.5)
+        return None
+
+    def _get_yfinance_data(self, symbol, start_date, end_date):
+        return make_bars(start_date, end_date)
+
+
+class FlakySchwabClient:
+    """Guards its calls with the 'schwab' breaker and answers like SchwabAPI."""
+
+    def __init__(self):
+        self.up = False
+        self.calls = 0
+        self.periods = []
+
+    @circuit_breaker('schwab')
+    def get_historical_prices(self, symbol, period="1y", frequency="daily"):
+        self.calls += 1
+        self.periods.append(period)
+        if not self.up:
+            raise NetworkError('down')
+        index = pd.bdate_range(end=datetime.now(), periods=500).normalize()
+        return {'symbol': symbol, 'candles': [
+            {'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0, 'volume': 100,
+             'datetime': int(timestamp.timestamp() * 1000)}
+            for timestamp in index
+        ]}
+
+
+class RecoveringDataManager(DataManager):
+    """Schwab is the only provider with data."""
+
+    def __init__(self, store, fallback):
+        super().__init__(store=store, fallback=fallback)
+        self.schwab_api = FlakySchwabClient()
+
+    def _get_yfinance_data(self, symbol, start_date, end_date):
+        return None
+
+
+class TestDataManagerFallback(unittest.TestCase):
+    def setUp(self):
+        reset_breakers()
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_slow_schwab_is_hedged_by_yahoo(self):
+        """Test a hanging first provider only costs the hedge delay"""
+        manager = HedgedDataManager(OHLCVStore(self.root), FallbackPolicy(hedge_delay=0.05, adaptive=False))
+        start = time.monotonic()
+        data = manager.get_historical_data('AAPL', datetime(2023, 1, 2), datetime(2023, 1, 6))
+
+        self.assertEqual(len(data), 5)
+        self.assertLess(time.monotonic() - start, 0.4)
+
+    def test_schwab_circuit_recovers_through_data_manager(self):
+        """Test the half-open trial reaches Schwab and closes the circuit"""
+        # A private registry so the counters do not leak into other tests
+        registry = patch.dict('schwab_trader.utils.circuit_breaker._breakers', clear=True)
+        registry.start()
+        self.addCleanup(registry.stop)
+        breaker = get_breaker('schwab', failure_threshold=1, recovery_timeout=0.05)
+        manager = RecoveringDataManager(OHLCVStore(self.root), FallbackPolicy(hedge_delay=None, adaptive=False))
+        client = manager.schwab_api
+        start_date, end_date = self.recent_week()
+        self.assertIsNone(manager._fetch_historical_data('AAPL', start_date, end_date))
+        self.assertEqual(breaker.state, OPEN)
+        self.assertIsNone(manager._fetch_historical_data('AAPL', start_date, end_date))
+        self.assertEqual(client.calls, 1)
+
+        time.sleep(0.06)
+        client.up = True
+        data = manager._fetch_historical_data('AAPL', start_date, end_date)
+
+        self.assertEqual(len(data), len(pd.bdate_range(start_date, end_date)))
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_schwab_history_uses_a_lookback_period(self):
+        """Test Schwab is asked for the shortest covering period and cut to the range"""
+        manager = RecoveringDataManager(OHLCVStore(self.root), FallbackPolicy(hedge_delay=None, adaptive=False))
+        client = manager.schwab_api
+        client.up = True
+        start_date, end_date = self.recent_week()
+        data = manager._get_schwab_data('AAPL', start_date, end_date)
+
+        self.assertEqual(client.periods, ['1m'])
+        self.assertEqual(list(data.index), list(pd.bdate_range(start_date, end_date)))
+        self.assertEqual(list(data.columns), ['Open', 'High', 'Low', 'Close', 'Volume'])
+
+        long_ago = datetime.now() - timedelta(days=6 * 365)
+        self.assertIsNone(manager._get_schwab_data('AAPL', long_ago, long_ago + timedelta(days=7)))
+        self.assertEqual(client.calls, 1)
+
+    def recent_week(self):
+        start_date = datetime.combine((datetime.now() - timedelta(days=20)).date(), datetime.min.time())
+        return start_date, start_date + timedelta(days=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+import pandas as pd
+from schwab_trader.services.historical_sync import HistoricalSync
+from schwab_trader.services.ohlcv_store import OHLCVStore
+from helpers import StubDataManager, make_bars
+
+
+class RecordingFetcher:
+    """Stands in for AsyncFetcher and records each batch of jobs."""
+
+    def __init__(self):
+        self.batches = []
+
+    def fetch(self, jobs):
+        self.batches.append(list(jobs))
+        return {job: make_bars(job[1], job[2]) for job in jobs}
+
+
+class TestHistoricalSync(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.manager = StubDataManager(OHLCVStore(self.root))
+        self.sync = HistoricalSync(self.manager)
+        self.store = self.manager.store
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_second_run_requests_only_new_bars(self):
+        """Test a refresh fetches just the days after the last run"""
+        first = self.sync.sync_symbol('AAPL', '2023-01-02', '2023-03-31')
+        second = self.sync.sync_symbol('AAPL', '2023-01-02', '2023-04-14')
+
+        self.assertEqual(first['requests'], 1)
+        self.assertEqual(second['requests'], 1)
+        self.assertEqual(self.manager.requests[-1], ('AAPL', date(2023, 4, 1), date(2023, 4, 14)))
+        self.assertEqual(second['bars'], 10)
+        self.assertEqual(second['last_bar'], date(2023, 4, 14))
+        self.assertEqual(len(self.store.load('AAPL')), len(pd.bdate_range('2023-01-02', '2023-04-14')))
+
+    def test_up_to_date_symbol_makes_no_requests(self):
+        """Test repeating a sync, or covering only a weekend, needs no request"""
+        self.sync.sync_symbol('AAPL', '2023-01-02', '2023-01-06')
+        weekend = self.sync.sync_symbol('AAPL', '2023-01-02', '2023-01-08')
+
+        self.assertEqual(weekend['requests'], 0)
+        self.assertEqual(self.store.coverage('AAPL'), (date(2023, 1, 2), date(2023, 1, 8)))
+        self.assertEqual(self.sync.sync_symbol('AAPL', '2023-01-02', '2023-01-08')['requests'], 0)
+
+    def test_holiday_only_range_makes_no_request(self):
+        """Test a range holding only a market holiday is not requested"""
+        self.sync.sync_symbol('AAPL', '2023-07-03', '2023-07-03')
+        result = self.sync.sync_symbol('AAPL', '2023-07-03', '2023-07-04')
+
+        self.assertEqual(result['requests'], 0)
+        self.assertEqual(self.store.coverage('AAPL'), (date(2023, 7, 3), date(2023, 7, 4)))
+
+    def test_holes_are_backfilled(self):
+        """Test a run of missing weekdays inside the coverage is refetched"""
+        self.manager.blocked = set(pd.bdate_range('2023-02-06', '2023-02-17').date)
+        self.sync.sync_symbol('AAPL', '2023-01-02', '2023-03-31')
+        self.assertEqual(self.sync.find_holes('AAPL'), [(date(2023, 2, 4), date(2023, 2, 19))])
+
+        self.manager.blocked = set()
+        result = self.sync.sync_symbol('AAPL', '2023-01-02', '2023-03-31')
+
+        self.assertEqual(self.manager.requests[-1], ('AAPL', date(2023, 2, 4), date(2023, 2, 19)))
+        self.assertEqual(result['bars'], 10)
+        self.assertEqual(self.sync.find_holes('AAPL'), [])
+
+    def test_single_missing_day_is_a_hole(self):
+        """Test one trading day without a bar is refetched"""
+        self.manager.blocked = {date(2023, 2, 15)}
+        self.sync.sync_symbol('AAPL', '2023-01-02', '2023-03-31')
+        self.assertEqual(self.sync.find_holes('AAPL'), [(date(2023, 2, 15), date(2023, 2, 15))])
+
+        self.manager.blocked = set()
+        self.sync.sync_symbol('AAPL', '2023-01-02', '2023-03-31')
+        self.assertEqual(self.manager.requests[-1], ('AAPL', date(2023, 2, 15), date(2023, 2, 15)))
+        self.assertEqual(self.sync.find_holes('AAPL'), [])
+
+    def test_lagging_provider_does_not_advance_coverage(self):
+        """Test days after the last returned bar are requested again"""
+        self.manager.blocked = {date(2023, 3, 30), date(2023, 3, 31)}
+        result = self.sync.sync_symbol('AAPL', '2023-03-01', '2023-04-02')
+
+        self.assertEqual(self.store.coverage('AAPL'), (date(2023, 3, 1), date(2023, 3, 29)))
+        self.assertEqual((result['status'], result['missing']), ('partial', [(date(2023, 3, 30), date(2023, 4, 2))]))
+
+        self.manager.blocked = set()
+        self.sync.sync_symbol('AAPL', '2023-03-01', '2023-04-02')
+        self.assertEqual(self.manager.requests[-1], ('AAPL', date(2023, 3, 30), date(2023, 4, 2)))
+        self.assertEqual(self.store.coverage('AAPL'), (date(2023, 3, 1), date(2023, 4, 2)))
+
+    def test_empty_holes_are_not_requested_again(self):
+        """Test holes the provider has no bars for are remembered"""
+        self.manager.blocked = set(pd.bdate_range('2023-02-06', '2023-02-17').date)
+        self.sync.sync_symbol('AAPL', '2023-01-02', '2023-03-31')
+        self.sync.sync_symbol('AAPL', '2023-01-02', '2023-03-31')
+        requests = len(self.manager.requests)
+
+        result = self.sync.sync_symbol('AAPL', '2023-01-02', '2023-03-31')
+        self.assertEqual(len(self.manager.requests), requests)
+        self.assertEqual(result['requests'], 0)
+        self.assertEqual(self.store.known_gaps('AAPL'), [(date(2023, 2, 4), date(2023, 2, 19))])
+
+    def test_sync_never_stores_today(self):
+        """Test the end date is capped at yesterday"""
+        today = datetime.now().date()
+        result = self.sync.sync_symbol('AAPL', today - timedelta(days=10), today)
+        self.assertEqual(self.store.coverage('AAPL')[1], today - timedelta(days=1))
+        self.assertEqual(result['status'], 'success')
+
+    def test_sync_many_symbols(self):
+        """Test the batch summary"""
+        summary = self.sync.sync(['AAPL', 'MSFT'], '2023-01-02', '2023-01-31')
+        self.assertEqual(summary['requests'], 2)
+        self.assertEqual(summary['bars'], 2 * len(pd.bdate_range('2023-01-02', '2023-01-31')))
+        self.assertEqual(summary['failed'], [])
+
+    def test_sync_with_fetcher_sends_one_batch(self):
+        """Test all symbols' requests go to the fetcher together"""
+        self.sync.sync_symbol('AAPL', '2023-01-02', '2023-01-31')
+        fetcher = RecordingFetcher()
+        summary = self.sync.sync(['AAPL', 'MSFT'], '2023-01-02', '2023-02-10', fetcher=fetcher)
+
+        self.assertEqual(fetcher.batches, [[
+            ('AAPL', date(2023, 2, 1), date(2023, 2, 10)),
+            ('MSFT', date(2023, 1, 2), date(2023, 2, 10))
+        ]])
+        self.assertEqual(summary['requests'], 2)
+        self.assertEqual(self.store.last_bar('MSFT'), date(2023, 2, 10))
+        self.assertEqual(self.store.coverage('AAPL'), (date(2023, 1, 2), date(2023, 2, 10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
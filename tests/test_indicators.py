@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+import pandas as pd
+from schwab_trader import indicators
+
+
+class TestIndicators(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 500)))
+        self.high = self.close * (1 + rng.uniform(0, 0.02, 500))
+        self.low = self.close * (1 - rng.uniform(0, 0.02, 500))
+        self.volume = rng.uniform(1e5, 1e6, 500)
+        self.bars = [
+            {'close': c, 'high': h, 'low': l, 'volume': v}
+            for c, h, l, v in zip(self.close, self.high, self.low, self.volume)
+        ]
+
+    def stream(self, indicator):
+        return np.array([indicator.update(bar) for bar in self.bars], dtype=float)
+
+    def test_streaming_matches_batch(self):
+        """Test every streaming indicator reproduces its batch values exactly"""
+        cases = [
+            (indicators.ema(self.close, span=10), indicators.EMA(span=10)),
+            (indicators.rsi(self.close, 14), indicators.RSI(14)),
+            (indicators.atr(self.high, self.low, self.close, 14), indicators.ATR(14)),
+            (np.column_stack(indicators.macd(self.close)), indicators.MACD())
+        ]
+        for expected, indicator in cases:
+            with self.subTest(indicator=type(indicator).__name__):
+                np.testing.assert_array_equal(self.stream(indicator), expected)
+
+    def test_running_sums_match_batch(self):
+        """Test the running-sum indicators stay within rounding of batch values"""
+        cases = [
+            (indicators.sma(self.close, 20), indicators.SMA(20)),
+            (indicators.volume_ma(self.volume, 20), indicators.VolumeMA(20)),
+            (np.column_stack(indicators.bollinger_bands(self.close, 20, 2)), indicators.BollingerBands(20, 2))
+        ]
+        for expected, indicator in cases:
+            with self.subTest(indicator=type(indicator).__name__):
+                np.testing.assert_allclose(self.stream(indicator), expected, rtol=1e-10)
+
+    def test_running_sums_do_not_drift(self):
+        """Test a long stream of large, nearly equal prices keeps an accurate band width"""
+        rng = np.random.default_rng(8)
+        close = 1e6 + rng.normal(0, 0.01, 20_000)
+        bands = indicators.BollingerBands(20, 2)
+        for value in close:
+            bands.update(value)
+        self.assertAlmostEqual(bands.std, close[-20:].std(ddof=1), delta=1e-9)
+        self.assertAlmostEqual(bands.sma.value, close[-20:].mean(), delta=1e-6)
+
+    def test_batch_matches_pandas(self):
+        """Test batch SMA, EMA and Bollinger width against pandas"""
+        series = pd.Series(self.close)
+        np.testing.assert_allclose(indicators.sma(self.close, 20), series.rolling(20).mean())
+        np.testing.assert_allclose(indicators.ema(self.close, span=12), series.ewm(span=12, adjust=False).mean())
+        upper, middle, lower = indicators.bollinger_bands(self.close, 20, 2)
+        np.testing.assert_allclose(upper - middle, series.rolling(20).std() * 2)
+
+    def test_rsi_warm_up(self):
+        """Test Wilder RSI is first defined after one full period of changes"""
+        rsi = indicators.rsi(self.close, 14)
+        self.assertTrue(np.isnan(rsi[:14]).all())
+        self.assertFalse(np.isnan(rsi[14:]).any())
+        self.assertTrue(((rsi[14:] >= 0) & (rsi[14:] <= 100)).all())
+
+    def test_copy_leaves_state_untouched(self):
+        """Test a provisional update on a copy does not advance the original"""
+        rsi = indicators.RSI(14)
+        for bar in self.bars[:-1]:
+            rsi.update(bar)
+        committed = rsi.value
+        provisional = rsi.copy()
+        provisional.update(self.bars[-1])
+        self.assertEqual(rsi.value, committed)
+        self.assertEqual(rsi.update(self.bars[-1]), provisional.value)
+
+    def test_indicators_must_implement_update(self):
+        """Test the base class cannot be used without an update method"""
+        with self.assertRaises(TypeError):
+            indicators.Indicator()
+
+    def test_dataframe_rows(self):
+        """Test bars with capitalized columns"""
+        frame = pd.DataFrame({'Close': self.close[:30]})
+        sma = indicators.SMA(20)
+        for _, row in frame.iterrows():
+            sma.update(row)
+        self.assertAlmostEqual(sma.value, indicators.sma(self.close[:30], 20)[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
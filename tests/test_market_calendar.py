@@ -0,0 +1,87 @@
+import time
+import unittest
+from datetime import date, datetime
+from schwab_trader.utils.cache import LRUCache
+from schwab_trader.utils.market_calendar import MarketCalendar, nyse_early_closes, nyse_holidays
+
+
+class TestHolidays(unittest.TestCase):
+    def test_2024_holidays(self):
+        """Test the published 2024 NYSE holidays and early closes"""
+        self.assertEqual(sorted(nyse_holidays(2024)), [
+            date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19), date(2024, 3, 29),
+            date(2024, 5, 27), date(2024, 6, 19), date(2024, 7, 4), date(2024, 9, 2),
+            date(2024, 11, 28), date(2024, 12, 25)
+        ])
+        self.assertEqual(sorted(nyse_early_closes(2024)), [date(2024, 7, 3), date(2024, 11, 29), date(2024, 12, 24)])
+
+    def test_2025_holidays(self):
+        """Test rule-based holidays plus the special closure"""
+        holidays = nyse_holidays(2025)
+        self.assertIn(date(2025, 1, 9), holidays)
+        self.assertIn(date(2025, 4, 18), holidays)
+        self.assertEqual(len(holidays), 11)
+
+    def test_weekend_observance(self):
+        """Test weekend holidays move to the nearest weekday, except a Saturday New Year's Day"""
+        self.assertIn(date(2021, 12, 24), nyse_holidays(2021))
+        self.assertNotIn(date(2021, 12, 31), nyse_holidays(2021))
+        self.assertIn(date(2022, 6, 20), nyse_holidays(2022))
+        self.assertIn(date(2022, 12, 26), nyse_holidays(2022))
+        self.assertNotIn(date(2021, 7, 2), nyse_early_closes(2021))
+
+
+class TestMarketCalendar(unittest.TestCase):
+    def setUp(self):
+        self.calendar = MarketCalendar()
+
+    def test_is_open(self):
+        """Test regular hours, weekends, holidays and early closes"""
+        self.assertTrue(self.calendar.is_open(datetime(2024, 3, 5, 10, 0)))
+        self.assertFalse(self.calendar.is_open(datetime(2024, 3, 5, 16, 0)))
+        self.assertFalse(self.calendar.is_open(datetime(2024, 3, 9, 12, 0)))
+        self.assertFalse(self.calendar.is_open(datetime(2024, 7, 4, 12, 0)))
+        self.assertTrue(self.calendar.is_open(datetime(2024, 11, 29, 12, 59)))
+        self.assertFalse(self.calendar.is_open(datetime(2024, 11, 29, 13, 0)))
+
+    def test_next_open_skips_weekends_and_holidays(self):
+        """Test Thursday-before-Good-Friday evening opens on Monday"""
+        self.assertEqual(
+            self.calendar.next_open(datetime(2024, 3, 28, 17, 0)).replace(tzinfo=None),
+            datetime(2024, 4, 1, 9, 30)
+        )
+        self.assertEqual(
+            self.calendar.next_open(datetime(2024, 4, 1, 8, 0)).replace(tzinfo=None),
+            datetime(2024, 4, 1, 9, 30)
+        )
+
+    def test_minutes_to_close(self):
+        """Test the countdown uses the early close"""
+        self.assertEqual(self.calendar.minutes_to_close(datetime(2024, 12, 24, 12, 40)), 20)
+        self.assertIsNone(self.calendar.minutes_to_close(datetime(2024, 12, 24, 14, 0)))
+
+    def test_ttl(self):
+        """Test short TTLs while trading and until the next open once closed"""
+        self.assertEqual(self.calendar.ttl(60, datetime(2024, 3, 5, 10, 0)), 60)
+        self.assertEqual(self.calendar.ttl(3600, datetime(2024, 3, 5, 15, 30)), 1800)
+        self.assertEqual(self.calendar.ttl(60, datetime(2024, 3, 5, 16, 5)), 60)
+        # Friday evening to Monday 9:30
+        friday = datetime(2024, 3, 8, 18, 0)
+        self.assertEqual(self.calendar.ttl(60, friday), (datetime(2024, 3, 11, 9, 30) - friday).total_seconds())
+
+    def test_aware_datetimes(self):
+        """Test other time zones are converted to Eastern"""
+        from zoneinfo import ZoneInfo
+        self.assertTrue(self.calendar.is_open(datetime(2024, 3, 5, 15, 0, tzinfo=ZoneInfo('UTC'))))
+
+    def test_cache_evaluates_callable_ttl(self):
+        """Test the cache asks for the TTL when storing"""
+        cache = LRUCache(ttl=lambda: 0.05)
+        cache.set('quote', 1)
+        self.assertEqual(cache.get('quote'), 1)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('quote'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+from flask import Flask
+from schwab_trader.routes import analysis
+from schwab_trader.services.market_stream import MarketStreamPublisher
+from schwab_trader.services.quote_batcher import QuoteBatcher, QuoteSource, make_quote
+
+
+class CountingSource(QuoteSource):
+    name = 'counting'
+
+    def __init__(self):
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def fetch(self, symbols):
+        with self.lock:
+            self.requests.append(sorted(symbols))
+            price = float(len(self.requests))
+        return {symbol: make_quote(symbol, price) for symbol in symbols}
+
+
+class TestMarketStreamPublisher(unittest.TestCase):
+    def setUp(self):
+        self.source = CountingSource()
+        self.publisher = MarketStreamPublisher(QuoteBatcher(self.source, window=0.01), interval=0.05, queue_size=3)
+
+    def test_clients_share_one_poll(self):
+        """Test many subscribers cost one upstream request per poll"""
+        subscriptions = [self.publisher.subscribe(['AAPL', 'MSFT']) for _ in range(20)]
+        subscriptions.append(self.publisher.subscribe(['GOOGL']))
+        try:
+            self.publisher.publish_once()
+            frames = [subscription.get(timeout=1) for subscription in subscriptions]
+        finally:
+            for subscription in subscriptions:
+                subscription.close()
+
+        self.assertIn(['AAPL', 'GOOGL', 'MSFT'], self.source.requests)
+        self.assertEqual(set(frames[0]), {'AAPL', 'MSFT'})
+        self.assertEqual(set(frames[-1]), {'GOOGL'})
+
+    def test_slow_consumer_keeps_latest_frames(self):
+        """Test a full queue drops its oldest frames instead of growing"""
+        self.publisher.interval = 60
+        with self.publisher.subscribe(['AAPL']) as subscription:
+            self.assertIsNotNone(subscription.get(timeout=1))
+            for _ in range(10):
+                self.publisher.publish_once()
+            self.assertEqual(subscription.pending(), 3)
+            frames = [subscription.get(timeout=0)['AAPL']['price'] for _ in range(3)]
+        self.assertEqual(frames, sorted(frames))
+        self.assertEqual(frames[-1], float(len(self.source.requests)))
+        self.assertGreaterEqual(self.publisher.metrics()['dropped'], 7)
+
+    def test_polling_stops_without_subscribers(self):
+        """Test the background poller runs only while someone listens"""
+        subscription = self.publisher.subscribe(['AAPL'])
+        self.assertIsNotNone(subscription.get(timeout=1))
+        subscription.close()
+        time.sleep(0.2)
+        self.assertIsNone(self.publisher._thread)
+        polls = self.publisher.metrics()['polls']
+        time.sleep(0.15)
+        self.assertEqual(self.publisher.metrics()['polls'], polls)
+
+
+
+class TestSharedMarketStream(unittest.TestCase):
+    def test_concurrent_requests_create_one_publisher(self):
+        """Test the first streams of an app agree on a single publisher"""
+        app = Flask(__name__)
+        app.volume_analysis = app.strategy_tester = None
+        app.schwab_market = SimpleNamespace(quotes=QuoteBatcher(CountingSource()))
+        created = []
+
+        def slow_publisher(quotes):
+            time.sleep(0.05)
+            created.append(MarketStreamPublisher(quotes))
+            return created[-1]
+
+        def get_publisher(_):
+            with app.app_context():
+                return analysis.get_market_stream()
+
+        with patch.object(analysis, 'MarketStreamPublisher', side_effect=slow_publisher):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                publishers = list(pool.map(get_publisher, range(8)))
+
+        self.assertEqual(len(created), 1)
+        self.assertTrue(all(publisher is created[0] for publisher in publishers))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import pandas as pd
+from schwab_trader.services.ohlcv_store import OHLCVStore
+from helpers import StubDataManager, make_bars
+
+
+class TestOHLCVStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = OHLCVStore(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_round_trip_and_slicing(self):
+        """Test stored bars are served for any sub-range"""
+        bars = make_bars('2023-01-02', '2023-03-31')
+        self.store.write('AAPL', bars, date(2023, 1, 1), date(2023, 3, 31))
+
+        loaded = self.store.load('AAPL', '2023-02-01', '2023-02-28')
+        pd.testing.assert_frame_equal(
+            loaded,
+            bars.loc['2023-02-01':'2023-02-28'],
+            check_names=False,
+            check_freq=False,
+            check_index_type=False
+        )
+        self.assertEqual(self.store.coverage('AAPL'), (date(2023, 1, 1), date(2023, 3, 31)))
+
+    def test_missing_ranges(self):
+        """Test only the uncovered head and tail are reported"""
+        self.assertEqual(self.store.missing_ranges('AAPL', '2023-01-01', '2023-01-31'), [(date(2023, 1, 1), date(2023, 1, 31))])
+        self.store.write('AAPL', make_bars('2023-01-10', '2023-01-20'), date(2023, 1, 10), date(2023, 1, 20))
+        self.assertEqual(
+            self.store.missing_ranges('AAPL', '2023-01-01', '2023-01-31'),
+            [(date(2023, 1, 1), date(2023, 1, 9)), (date(2023, 1, 21), date(2023, 1, 31))]
+        )
+        self.assertEqual(self.store.missing_ranges('AAPL', '2023-01-12', '2023-01-15'), [])
+
+    def test_merge_replaces_duplicate_dates(self):
+        """Test newer bars win and adjacent coverage is joined"""
+        self.store.write('AAPL', make_bars('2023-01-02', '2023-01-06'), date(2023, 1, 1), date(2023, 1, 6))
+        update = make_bars('2023-01-06', '2023-01-13') * 2
+        self.store.write('AAPL', update, date(2023, 1, 6), date(2023, 1, 13))
+
+        loaded = self.store.load('AAPL')
+        self.assertEqual(len(loaded), 10)
+        self.assertEqual(loaded.loc['2023-01-06', 'Close'], 200.0)
+        self.assertEqual(self.store.coverage('AAPL'), (date(2023, 1, 1), date(2023, 1, 13)))
+
+    def test_concurrent_writes_keep_every_bar(self):
+        """Test threads storing different ranges of one symbol do not lose bars"""
+        weeks = [(date(2023, 1, 2) + timedelta(weeks=i), date(2023, 1, 6) + timedelta(weeks=i)) for i in range(40)]
+
+        def write(week):
+            self.store.write('AAPL', make_bars(*week), *week)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(write, weeks))
+
+        self.assertEqual(len(self.store.load('AAPL')), 200)
+        self.assertEqual(self.store.last_bar('AAPL'), date(2023, 10, 6))
+
+
+class TestDataManagerStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.manager = StubDataManager(OHLCVStore(self.root))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_repeat_requests_use_the_store(self):
+        """Test a second request for a stored range makes no provider call"""
+        first = self.manager.get_historical_data('AAPL', datetime(2023, 1, 1), datetime(2023, 6, 30), source='yfinance')
+        second = self.manager.get_historical_data('AAPL', datetime(2023, 2, 1), datetime(2023, 3, 1), source='yfinance')
+
+        self.assertEqual(self.manager.requests, [('AAPL', date(2023, 1, 1), date(2023, 6, 30))])
+        self.assertEqual(list(first.columns), ['Open', 'High', 'Low', 'Close', 'Volume'])
+        pd.testing.assert_frame_equal(second, first.loc['2023-02-01':'2023-03-01'])
+
+    def test_only_missing_tail_is_fetched(self):
+        """Test extending the range fetches just the new days"""
+        self.manager.get_historical_data('AAPL', datetime(2023, 1, 1), datetime(2023, 1, 31), source='yfinance')
+        data = self.manager.get_historical_data('AAPL', datetime(2023, 1, 1), datetime(2023, 2, 28), source='yfinance')
+
+        self.assertEqual(self.manager.requests[-1], ('AAPL', date(2023, 2, 1), date(2023, 2, 28)))
+        self.assertEqual(data.index[-1], pd.Timestamp('2023-02-28'))
+
+    def test_truncated_response_is_refetched(self):
+        """Test days a provider left out at the end are not marked fetched"""
+        self.manager.blocked = set(pd.bdate_range('2023-01-26', '2023-01-31').date)
+        data = self.manager.get_historical_data('AAPL', datetime(2023, 1, 1), datetime(2023, 1, 31), source='yfinance')
+        self.assertEqual(data.index[-1], pd.Timestamp('2023-01-25'))
+        self.assertEqual(self.manager.store.coverage('AAPL'), (date(2023, 1, 1), date(2023, 1, 25)))
+
+        self.manager.blocked = set()
+        data = self.manager.get_historical_data('AAPL', datetime(2023, 1, 1), datetime(2023, 1, 31), source='yfinance')
+        self.assertEqual(self.manager.requests[-1], ('AAPL', date(2023, 1, 26), date(2023, 1, 31)))
+        self.assertEqual(data.index[-1], pd.Timestamp('2023-01-31'))
+
+    def test_forming_bar_is_not_persisted(self):
+        """Test today's bar is served but refetched next time"""
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = today - timedelta(days=10)
+        self.manager.get_historical_data('AAPL', start, today, source='yfinance')
+        self.manager.get_historical_data('AAPL', start, today, source='yfinance')
+
+        self.assertEqual(self.manager.requests[-1], ('AAPL', today.date(), today.date()))
+        self.assertEqual(self.manager.store.coverage('AAPL')[1], today.date() - timedelta(days=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
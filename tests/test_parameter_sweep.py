@@ -0,0 +1,55 @@
+import unittest
+from schwab_trader.strategies.sentiment_volume import SentimentVolumeStrategy
+from schwab_trader.utils.parameter_sweep import ParameterSweep
+from helpers import random_panel
+
+
+class TestParameterSweep(unittest.TestCase):
+    def setUp(self):
+        self.panel = random_panel(120, 5, seed=3)
+        self.grid = {
+            'lookback_days': [10, 20],
+            'volume_increase_threshold': [1.1, 1.3, 1.5]
+        }
+
+    def test_grid_expands_all_combinations(self):
+        """Test grid expansion"""
+        param_sets = ParameterSweep.grid(self.grid)
+        self.assertEqual(len(param_sets), 6)
+        self.assertIn({'lookback_days': 20, 'volume_increase_threshold': 1.3}, param_sets)
+
+    def test_random_respects_spaces(self):
+        """Test random sampling from choices and ranges"""
+        param_sets = ParameterSweep.random(
+            {'lookback_days': (5, 30), 'volume_increase_threshold': (1.0, 2.0), 'min_volume': [1, 2]},
+            n_iter=50,
+            seed=1
+        )
+        self.assertEqual(len(param_sets), 50)
+        for params in param_sets:
+            self.assertIsInstance(params['lookback_days'], int)
+            self.assertTrue(5 <= params['lookback_days'] <= 30)
+            self.assertTrue(1.0 <= params['volume_increase_threshold'] <= 2.0)
+            self.assertIn(params['min_volume'], [1, 2])
+        self.assertEqual(param_sets, ParameterSweep.random(
+            {'lookback_days': (5, 30), 'volume_increase_threshold': (1.0, 2.0), 'min_volume': [1, 2]},
+            n_iter=50,
+            seed=1
+        ))
+
+    def test_results_are_ranked(self):
+        """Test the result table is sorted by the ranking metric"""
+        results = ParameterSweep(SentimentVolumeStrategy, max_workers=1).grid_search(self.panel, self.grid)
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results['rank'].tolist(), list(range(1, 7)))
+        self.assertTrue((results['sharpe_ratio'].diff().dropna() <= 0).all())
+
+    def test_parallel_matches_serial(self):
+        """Test worker processes see the same shared panel"""
+        serial = ParameterSweep(SentimentVolumeStrategy, max_workers=1).grid_search(self.panel, self.grid)
+        parallel = ParameterSweep(SentimentVolumeStrategy, max_workers=2).grid_search(self.panel, self.grid)
+        self.assertEqual(serial.to_dict('records'), parallel.to_dict('records'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import numpy as np
+import pandas as pd
+from schwab_trader.utils.performance_metrics import (
+    compute_metrics,
+    drawdown_stats,
+    rolling_volatility,
+    round_trip_pnl,
+    trade_arrays
+)
+
+
+class TestDrawdown(unittest.TestCase):
+    def test_depth_and_duration(self):
+        """Test drawdown depth and periods spent below the peak"""
+        equity = [100, 120, 90, 110, 115, 130, 100, 140]
+        max_drawdown, duration = drawdown_stats(equity)
+        self.assertAlmostEqual(max_drawdown, 0.25)
+        self.assertEqual(duration, 3)
+
+    def test_monotonic_curve(self):
+        """Test a rising curve has no drawdown"""
+        self.assertEqual(drawdown_stats([1, 2, 3]), (0.0, 0))
+
+
+class TestRollingVolatility(unittest.TestCase):
+    def test_matches_pandas(self):
+        """Test trailing volatility against pandas rolling std"""
+        returns = np.random.default_rng(5).normal(0, 0.01, 200)
+        expected = pd.Series(returns).rolling(20).std().to_numpy() * np.sqrt(252)
+        result = rolling_volatility(returns, 20)
+        self.assertTrue(np.isnan(result[:19]).all())
+        np.testing.assert_allclose(result[19:], expected[19:])
+
+
+class TestRoundTrips(unittest.TestCase):
+    def test_scaling_in_and_out_is_one_trip(self):
+        """Test round trips per symbol with partial fills"""
+        trades = [
+            {'symbol': 'AAPL', 'action': 'BUY', 'quantity': 10, 'price': 10.0},
+            {'symbol': 'MSFT', 'action': 'BUY', 'quantity': 5, 'price': 50.0},
+            {'symbol': 'AAPL', 'action': 'BUY', 'quantity': 10, 'price': 12.0},
+            {'symbol': 'AAPL', 'action': 'SELL', 'quantity': 5, 'price': 9.0},
+            {'symbol': 'MSFT', 'action': 'SELL', 'quantity': 5, 'price': 40.0},
+            {'symbol': 'AAPL', 'action': 'SELL', 'quantity': 15, 'price': 13.0},
+            {'symbol': 'AAPL', 'action': 'BUY', 'quantity': 1, 'price': 13.0}
+        ]
+        symbols, quantities, prices, fees = trade_arrays(trades)
+        pnl = round_trip_pnl(symbols, quantities, prices, fees)
+        # AAPL: -100 - 120 + 45 + 195; MSFT: -250 + 200; the last buy is still open
+        self.assertEqual(sorted(pnl.tolist()), [-50.0, 20.0])
+
+    def test_fees_reduce_profit(self):
+        """Test fees are charged to the round trip"""
+        pnl = round_trip_pnl(['A', 'A'], [1, -1], [10.0, 11.0], [0.6, 0.6])
+        self.assertAlmostEqual(pnl[0], -0.2)
+
+
+class TestComputeMetrics(unittest.TestCase):
+    def test_ratios(self):
+        """Test Sharpe, Sortino and Calmar from a short curve"""
+        equity = np.array([100.0, 102.0, 101.0, 104.0, 103.0])
+        returns = equity[1:] / equity[:-1] - 1
+        metrics = compute_metrics(equity)
+
+        self.assertAlmostEqual(metrics['total_return'], 0.03)
+        self.assertAlmostEqual(metrics['sharpe_ratio'], np.sqrt(252) * returns.mean() / returns.std(ddof=1))
+        downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+        self.assertAlmostEqual(metrics['sortino_ratio'], np.sqrt(252) * returns.mean() / downside)
+        self.assertAlmostEqual(metrics['calmar_ratio'], metrics['annualized_return'] / metrics['max_drawdown'])
+
+    def test_trade_metrics(self):
+        """Test win rate and turnover from trade arrays"""
+        trades = trade_arrays([
+            {'symbol': 'A', 'action': 'BUY', 'quantity': 10, 'price': 10.0},
+            {'symbol': 'A', 'action': 'SELL', 'quantity': 10, 'price': 11.0}
+        ])
+        metrics = compute_metrics([1000.0] * 253, trades)
+        self.assertEqual(metrics['round_trips'], 1)
+        self.assertEqual(metrics['win_rate'], 1.0)
+        self.assertAlmostEqual(metrics['turnover'], 0.21)
+
+    def test_flat_curve(self):
+        """Test degenerate inputs produce zeros rather than errors"""
+        metrics = compute_metrics([100.0])
+        self.assertEqual(metrics['sharpe_ratio'], 0.0)
+        self.assertEqual(metrics['max_drawdown'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
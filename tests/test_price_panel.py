@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from schwab_trader.services.ohlcv_store import OHLCVStore
+from schwab_trader.strategies.sentiment_volume import SentimentVolumeStrategy
+from schwab_trader.utils.backtester import StrategyBacktester
+from schwab_trader.utils.parameter_sweep import ParameterSweep
+from schwab_trader.utils.price_panel import PricePanel
+from schwab_trader.utils.synthetic_market import generate_panel, panel_to_frames
+
+
+class TestPricePanelFiles(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.panel = generate_panel(6, 0.5, seed=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_save_and_load_round_trip(self):
+        """Test a loaded panel is a read-only memory map of the saved one"""
+        self.panel.save(self.root)
+        loaded = PricePanel.load(self.root)
+
+        self.assertIsInstance(loaded.values, np.memmap)
+        self.assertFalse(loaded.values.flags.writeable)
+        np.testing.assert_array_equal(loaded.values, self.panel.values)
+        self.assertEqual(loaded.dates, self.panel.dates)
+        self.assertEqual(loaded.symbols, self.panel.symbols)
+
+    def test_backtest_on_loaded_panel(self):
+        """Test backtests give the same results on a memory-mapped panel"""
+        self.panel.save(self.root)
+        expected = StrategyBacktester(SentimentVolumeStrategy()).backtest(self.panel)
+        results = StrategyBacktester(SentimentVolumeStrategy()).backtest(PricePanel.load(self.root))
+        self.assertEqual(results['trades'], expected['trades'])
+        self.assertEqual(results['performance'], expected['performance'])
+
+    def test_share_by_path(self):
+        """Test file-backed panels are published by path"""
+        self.panel.save(self.root)
+        shm, spec = PricePanel.load(self.root).share()
+        self.assertIsNone(shm)
+        self.assertEqual(spec, {'path': self.root})
+        np.testing.assert_array_equal(PricePanel.attach(spec).close, self.panel.close)
+
+    def test_parallel_sweep_on_loaded_panel(self):
+        """Test workers mapping the panel file match a serial sweep"""
+        self.panel.save(self.root)
+        grid = {'lookback_days': [10, 20], 'volume_increase_threshold': [1.1, 1.5]}
+        serial = ParameterSweep(SentimentVolumeStrategy, max_workers=1).grid_search(self.panel, grid)
+        parallel = ParameterSweep(SentimentVolumeStrategy, max_workers=2).grid_search(
+            PricePanel.load(self.root), grid
+        )
+        pd.testing.assert_frame_equal(parallel, serial)
+
+
+class TestPricePanelBuilders(unittest.TestCase):
+    def test_from_frames_aligns_dates(self):
+        """Test frames with different dates are aligned with NaN gaps"""
+        frames = panel_to_frames(generate_panel(2, 0.1, seed=1))
+        first, second = frames
+        frames[second] = frames[second].iloc[5:].rename(columns=str.lower)
+        frames[second].index = frames[second].index.tz_localize('America/New_York')
+
+        panel = PricePanel.from_frames(frames)
+        self.assertEqual(len(panel), len(frames[first]))
+        self.assertTrue(np.isnan(panel.close[:5, 1]).all())
+        np.testing.assert_array_equal(panel.close[5:, 1], frames[second]['close'].to_numpy())
+        np.testing.assert_array_equal(panel.volume[:, 0], frames[first]['Volume'].to_numpy())
+
+    def test_from_store_writes_panel_file(self):
+        """Test a panel assembled from the store into a file"""
+        root = tempfile.mkdtemp()
+        try:
+            store = OHLCVStore(root)
+            frames = panel_to_frames(generate_panel(3, 0.2, seed=2))
+            for symbol, frame in frames.items():
+                store.write(symbol, frame, frame.index[0], frame.index[-1])
+
+            expected = PricePanel.from_frames(frames)
+            in_memory = PricePanel.from_store(store, list(frames))
+            on_disk = PricePanel.from_store(store, list(frames), path=f"{root}/panel")
+
+            np.testing.assert_array_equal(in_memory.values, expected.values)
+            np.testing.assert_array_equal(on_disk.values, expected.values)
+            self.assertEqual(on_disk.dates, expected.dates)
+            self.assertIsInstance(on_disk.values, np.memmap)
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+from schwab_trader.services.quote_batcher import (
+    AlphaVantageQuoteSource, QuoteBatcher, QuoteSource, SchwabQuoteSource, make_quote
+)
+from schwab_trader.utils.circuit_breaker import reset_breakers
+from schwab_trader.utils.error_utils import APIError
+
+
+class FakeSource(QuoteSource):
+    name = 'fake'
+
+    def __init__(self, max_batch=100, missing=(), error=None):
+        self.max_batch = max_batch
+        self.missing = set(missing)
+        self.error = error
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def fetch(self, symbols):
+        with self.lock:
+            self.requests.append(list(symbols))
+        if self.error:
+            raise self.error
+        return {symbol: make_quote(symbol, 100.0, 1.0, 1.0, 1000, self.name)
+                for symbol in symbols if symbol not in self.missing}
+
+
+class TestQuoteBatcher(unittest.TestCase):
+    def test_concurrent_demands_share_one_request(self):
+        """Test callers on different threads are served by one batched request"""
+        source = FakeSource()
+        batcher = QuoteBatcher(source, window=0.1)
+        symbols = ['AAPL', 'MSFT', 'GOOGL', 'AAPL', 'msft']
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            quotes = list(pool.map(batcher.get, symbols))
+
+        self.assertEqual(len(source.requests), 1)
+        self.assertEqual(sorted(source.requests[0]), ['AAPL', 'GOOGL', 'MSFT'])
+        self.assertEqual([quote['symbol'] for quote in quotes], ['AAPL', 'MSFT', 'GOOGL', 'AAPL', 'MSFT'])
+        self.assertEqual(batcher.metrics(), {'demands': 5, 'symbols': 3, 'requests': 1, 'failures': 0})
+
+    def test_large_refresh_is_chunked(self):
+        """Test 200 positions take two requests instead of 200"""
+        source = FakeSource(max_batch=100)
+        batcher = QuoteBatcher(source, window=0.05)
+        symbols = [f'SYM{i}' for i in range(200)]
+        quotes = batcher.get_many(symbols)
+
+        self.assertEqual(len(source.requests), 2)
+        self.assertTrue(all(len(chunk) == 100 for chunk in source.requests))
+        self.assertEqual(set(quotes), set(symbols))
+        self.assertTrue(all(quote['price'] == 100.0 for quote in quotes.values()))
+
+    def test_missing_symbols_and_failures(self):
+        """Test unknown symbols map to None and a failed batch reaches every caller"""
+        batcher = QuoteBatcher(FakeSource(missing={'ZZZZ'}), window=0.01)
+        self.assertIsNone(batcher.get_many(['AAPL', 'ZZZZ'])['ZZZZ'])
+
+        failing = QuoteBatcher(FakeSource(error=APIError('down')), window=0.01)
+        self.assertEqual(failing.get_many(['AAPL', 'MSFT']), {'AAPL': None, 'MSFT': None})
+        with self.assertRaises(APIError):
+            failing.get('AAPL')
+        self.assertEqual(failing.metrics()['failures'], 2)
+
+
+class TestQuoteSources(unittest.TestCase):
+    def setUp(self):
+        reset_breakers()
+
+    def test_schwab_quotes_are_normalized(self):
+        """Test Schwab /quotes entries are mapped to the common quote shape"""
+        client = MagicMock()
+        client.get_quotes.return_value = {
+            'AAPL': {'quote': {'lastPrice': 190.5, 'netChange': -1.2, 'netPercentChange': -0.63, 'totalVolume': 5000}}
+        }
+        quotes = SchwabQuoteSource(client).fetch(['AAPL', 'MSFT'])
+
+        client.get_quotes.assert_called_once_with(['AAPL', 'MSFT'])
+        self.assertEqual(quotes, {'AAPL': make_quote('AAPL', 190.5, -1.2, -0.63, 5000, 'schwab')})
+
+    def test_alpha_vantage_bulk_and_fallback(self):
+        """Test bulk quotes are used when entitled, single quotes otherwise"""
+        source = AlphaVantageQuoteSource('key')
+        bulk = MagicMock()
+        bulk.json.return_value = {'data': [
+            {'symbol': 'AAPL', 'close': '190.50', 'change': '1.5', 'change_percent': '0.79', 'volume': '100'},
+            {'symbol': 'MSFT', 'close': '410.00', 'change': '-2', 'change_percent': '-0.49', 'volume': '200'}
+        ]}
+        with patch.object(source._session, 'get', return_value=bulk) as get:
+            quotes = source.fetch(['AAPL', 'MSFT'])
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(get.call_args.kwargs['params']['symbol'], 'AAPL,MSFT')
+        self.assertEqual(quotes['MSFT']['price'], 410.0)
+
+        refused = MagicMock()
+        refused.json.return_value = {'Information': 'This is a premium endpoint.'}
+        single = MagicMock()
+        single.json.return_value = {'Global Quote': {
+            '05. price': '190.50', '09. change': '1.5', '10. change percent': '0.79%', '06. volume': '100'
+        }}
+        source = AlphaVantageQuoteSource('key')
+        with patch.object(source._session, 'get', side_effect=[refused, single]):
+            quotes = source.fetch(['AAPL'])
+        self.assertFalse(source.bulk)
+        self.assertEqual(quotes['AAPL']['change_percent'], 0.79)
+
+    def test_alpha_vantage_fallback_keeps_partial_results(self):
+        """Test a rate limit part-way through single quotes keeps the quotes already fetched"""
+        def single(price):
+            response = MagicMock()
+            response.json.return_value = {'Global Quote': {'05. price': price}}
+            return response
+
+        limited = MagicMock()
+        limited.json.return_value = {'Note': 'Our standard API call frequency is 5 calls per minute.'}
+        source = AlphaVantageQuoteSource('key')
+        source.bulk = False
+        with patch.object(source._session, 'get', side_effect=[single('1.0'), single('2.0'), limited]) as get:
+            quotes = source.fetch(['AAA', 'BBB', 'CCC', 'DDD'])
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual({symbol: quote['price'] for symbol, quote in quotes.items()}, {'AAA': 1.0, 'BBB': 2.0})
+
+        # Batcher callers get the fetched quotes and None for the rest
+        reset_breakers()
+        batcher = QuoteBatcher(source, window=0.01)
+        with patch.object(source._session, 'get', side_effect=[single('3.0'), limited]):
+            quotes = batcher.get_many(['AAA', 'BBB'])
+        self.assertEqual((quotes['AAA']['price'], quotes['BBB']), (3.0, None))
+        self.assertEqual(batcher.metrics()['failures'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
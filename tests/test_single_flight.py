@@ -0,0 +1,139 @@
+import asyncio
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pandas as pd
+from schwab_trader.services.ohlcv_store import OHLCVStore
+from schwab_trader.utils.single_flight import AsyncSingleFlight, SingleFlight, single_flight
+from helpers import StubDataManager
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        """Test threads asking for the same key at once trigger one call"""
+        flight = SingleFlight()
+        calls = []
+
+        def fetch(symbol):
+            calls.append(symbol)
+            time.sleep(0.1)
+            return {'symbol': symbol}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: flight.do('AAPL', fetch, 'AAPL'), range(8)))
+
+        self.assertEqual(calls, ['AAPL'])
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(flight.metrics(), {'calls': 1, 'coalesced': 7, 'in_flight': 0})
+
+    def test_different_keys_run_separately(self):
+        """Test only identical keys are coalesced"""
+        flight = SingleFlight()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(lambda symbol: flight.do(symbol, str.lower, symbol), ['AAPL', 'MSFT']))
+        self.assertEqual(results, ['aapl', 'msft'])
+        self.assertEqual(flight.metrics()['calls'], 2)
+
+    def test_errors_reach_every_waiter(self):
+        """Test a failed call raises in all callers and is not remembered"""
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError('down')
+
+        def call():
+            try:
+                flight.do('key', fail)
+            except ValueError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            leader = pool.submit(call)
+            started.wait()
+            followers = [pool.submit(call) for _ in range(2)]
+            errors = [leader.result()] + [future.result() for future in followers]
+
+        self.assertEqual(errors, ['down'] * 3)
+        self.assertEqual(flight.in_flight(), 0)
+        self.assertEqual(flight.do('key', lambda: 'ok'), 'ok')
+
+    def test_sequential_calls_are_not_cached(self):
+        """Test a finished call is run again by the next caller"""
+        flight = SingleFlight()
+        counter = iter(range(10))
+        self.assertEqual(flight.do('key', lambda: next(counter)), 0)
+        self.assertEqual(flight.do('key', lambda: next(counter)), 1)
+
+
+class TestAsyncSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_tasks_share_one_execution(self):
+        """Test tasks awaiting the same key share one coroutine"""
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch(symbol):
+            calls.append(symbol)
+            await asyncio.sleep(0.05)
+            return symbol.lower()
+
+        results = await asyncio.gather(*(flight.do('AAPL', fetch, 'AAPL') for _ in range(5)))
+        self.assertEqual(results, ['aapl'] * 5)
+        self.assertEqual(calls, ['AAPL'])
+        self.assertEqual(flight.metrics(), {'calls': 1, 'coalesced': 4, 'in_flight': 0})
+
+    async def test_cancelled_waiter_does_not_cancel_the_fetch(self):
+        """Test the shared task survives one of its waiters being cancelled"""
+        flight = AsyncSingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return 'done'
+
+        first = asyncio.ensure_future(flight.do('key', fetch))
+        second = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        self.assertEqual(await second, 'done')
+
+    async def test_decorator_detects_coroutines(self):
+        """Test the decorator coalesces coroutine functions by key"""
+        calls = []
+
+        @single_flight(key=lambda symbol: symbol.upper(), group=AsyncSingleFlight())
+        async def quote(symbol):
+            calls.append(symbol)
+            await asyncio.sleep(0.02)
+            return 1.0
+
+        await asyncio.gather(quote('aapl'), quote('AAPL'), quote('msft'))
+        self.assertEqual(sorted(calls), ['aapl', 'msft'])
+
+
+class TestDataManagerCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_concurrent_history_requests_share_one_fetch(self):
+        """Test simultaneous requests for the same range reach the provider once"""
+        manager = StubDataManager(OHLCVStore(self.root), delay=0.1)
+        start, end = datetime(2023, 1, 2), datetime(2023, 1, 31)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            frames = list(pool.map(lambda _: manager.get_historical_data('AAPL', start, end), range(4)))
+
+        self.assertEqual(len(manager.requests), 1)
+        self.assertTrue(all(len(frame) == len(pd.bdate_range(start, end)) for frame in frames))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+import numpy as np
+import pandas as pd
+from schwab_trader.strategies.base import SIGNAL_BUY, SIGNAL_SELL, SIGNAL_HOLD, rolling_mean
+from schwab_trader.strategies.momentum import MomentumStrategy
+from schwab_trader.strategies.sentiment_volume import SentimentVolumeStrategy
+from schwab_trader.strategies.volatility_pattern import VolatilityPatternStrategy
+from schwab_trader.strategies.volume_strategy import (
+    add_indicator_columns,
+    calculate_macd,
+    calculate_rsi,
+    momentum_strategy
+)
+from schwab_trader.utils.backtester import StrategyBacktester
+from helpers import make_panel
+
+
+class TestRollingMean(unittest.TestCase):
+    def test_matches_window_average(self):
+        """Test trailing means with a partial first window"""
+        values = np.array([[1.0], [2.0], [3.0], [4.0]])
+        result = rolling_mean(values, 2)
+        self.assertTrue(np.isnan(result[0, 0]))
+        self.assertEqual(result[1:, 0].tolist(), [1.5, 2.5, 3.5])
+
+    def test_missing_values_invalidate_window(self):
+        """Test windows containing NaN are NaN"""
+        values = np.array([[1.0], [np.nan], [3.0], [4.0]])
+        result = rolling_mean(values, 2)
+        self.assertTrue(np.isnan(result[1:3, 0]).all())
+        self.assertEqual(result[3, 0], 3.5)
+
+
+class TestMomentumSignalMatrix(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, (60, 4)), axis=0))
+        self.volumes = rng.uniform(5e5, 2e6, (60, 4))
+        self.strategy = MomentumStrategy(lookback_period=5, volume_threshold=1.1, price_threshold=0.01)
+
+    def test_matches_per_position_signals(self):
+        """Test the matrix agrees with generate_signals bar by bar"""
+        panel = make_panel(self.closes, self.volumes)
+        matrix = self.strategy.generate_signal_matrix(panel)
+        avg_volume = rolling_mean(self.volumes, 5)
+        codes = {'BUY': SIGNAL_BUY, 'SELL': SIGNAL_SELL, 'HOLD': SIGNAL_HOLD}
+
+        for i in range(5, 60):
+            positions = [
+                {
+                    'symbol': symbol,
+                    'day_change_percent': (self.closes[i, j] / self.closes[i - 1, j] - 1) * 100,
+                    'volume': self.volumes[i, j],
+                    'avg_volume': avg_volume[i, j]
+                }
+                for j, symbol in enumerate(panel.symbols)
+            ]
+            expected = [codes[s['action']] for s in self.strategy.generate_signals({'positions': positions})]
+            self.assertEqual(matrix[i].tolist(), expected)
+
+    def test_holds_without_history(self):
+        """Test no signals before the lookback window fills"""
+        panel = make_panel(self.closes, self.volumes)
+        matrix = self.strategy.generate_signal_matrix(panel)
+        self.assertFalse(matrix[:4].any())
+
+
+class TestSentimentVolumeSignalMatrix(unittest.TestCase):
+    def test_buy_and_sell_on_baseline_ratio(self):
+        """Test volume spikes buy and returns to baseline sell"""
+        volumes = np.array([[200000.0]] * 5 + [[400000.0], [150000.0], [50000.0]])
+        closes = np.full(volumes.shape, 10.0)
+        strategy = SentimentVolumeStrategy(volume_increase_threshold=1.15, min_volume=100000, lookback_days=5)
+        matrix = strategy.generate_signal_matrix(make_panel(closes, volumes))
+
+        self.assertEqual(matrix[:4, 0].tolist(), [SIGNAL_HOLD] * 4)
+        # A flat baseline sits exactly at 1.0x, which is a sell
+        self.assertEqual(matrix[4, 0], SIGNAL_SELL)
+        self.assertEqual(matrix[5, 0], SIGNAL_BUY)
+        self.assertEqual(matrix[6, 0], SIGNAL_SELL)
+        # Below minimum volume
+        self.assertEqual(matrix[7, 0], SIGNAL_HOLD)
+
+
+class TestVolatilityPatternSignalMatrix(unittest.TestCase):
+    def test_profit_target_sells_after_entry(self):
+        """Test the profit target closes a position opened on a volume spike"""
+        closes = np.array([[10.0], [12.0], [11.0], [13.0], [13.5], [30.0]])
+        volumes = np.array([[1e6], [1e6], [1e6], [2e6], [8e5], [5e5]])
+        strategy = VolatilityPatternStrategy(
+            min_price=5.0,
+            min_volume=100000,
+            pattern_lookback=3,
+            volume_increase_threshold=1.15,
+            volume_decrease_threshold=0.95,
+            price_profit_target=10.0
+        )
+        matrix = strategy.generate_signal_matrix(make_panel(closes, volumes))
+
+        self.assertEqual(strategy.top_stocks, {'SYM0'})
+        self.assertEqual(matrix[3, 0], SIGNAL_BUY)
+        self.assertEqual(matrix[4, 0], SIGNAL_HOLD)
+        self.assertEqual(matrix[5, 0], SIGNAL_SELL)
+
+    def test_short_panel_has_no_signals(self):
+        """Test panels shorter than the lookback produce only holds"""
+        strategy = VolatilityPatternStrategy(pattern_lookback=20)
+        matrix = strategy.generate_signal_matrix(make_panel(np.ones((5, 2)), np.ones((5, 2))))
+        self.assertFalse(matrix.any())
+
+
+class TestBacktesterMatrixPath(unittest.TestCase):
+    def test_backtester_uses_signal_matrix(self):
+        """Test the backtester trades on matrix signals"""
+        volumes = np.array([[200000.0]] * 5 + [[400000.0], [150000.0]])
+        closes = np.array([[10.0]] * 5 + [[11.0], [12.0]])
+        strategy = SentimentVolumeStrategy(lookback_days=5)
+        results = StrategyBacktester(strategy, initial_capital=10000).backtest(make_panel(closes, volumes))
+
+        self.assertEqual([t['action'] for t in results['trades']], ['BUY', 'SELL'])
+        self.assertEqual([t['price'] for t in results['trades']], [11.0, 12.0])
+
+
+class TestIndicatorColumns(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 120)))
+        self.data = pd.DataFrame({'Close': closes}, index=pd.bdate_range('2022-01-03', periods=120))
+
+    def test_columns_match_history_prefix(self):
+        """Test precomputed columns equal indicators over the history up to each bar"""
+        data = add_indicator_columns(self.data)
+        for timestamp in data.index[60::10]:
+            prefix = data.loc[:timestamp, 'Close']
+            self.assertAlmostEqual(data.at[timestamp, 'SMA_50'], prefix.rolling(window=50).mean().iloc[-1])
+            self.assertAlmostEqual(data.at[timestamp, 'RSI'], calculate_rsi(prefix).iloc[-1])
+            macd, signal_line = calculate_macd(prefix)
+            self.assertAlmostEqual(data.at[timestamp, 'MACD'], macd)
+            self.assertAlmostEqual(data.at[timestamp, 'Signal_Line'], signal_line)
+
+    def test_strategy_adds_missing_columns(self):
+        """Test strategies still work on frames without precomputed columns"""
+        momentum_strategy(self.data, self.data.index[-1])
+        self.assertIn('RSI', self.data.columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import numpy as np
+import pandas as pd
+from schwab_trader.services.strategy_tester import StrategyTester
+
+
+class FakeDataManager:
+    """Serves fixed OHLCV frames instead of calling data providers."""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_historical_data(self, symbol, start_date, end_date):
+        return self.frames[symbol].copy()
+
+
+def make_frame(closes, start='2023-01-02', volume=1e6):
+    index = pd.bdate_range(start, periods=len(closes))
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        'Open': closes,
+        'High': closes,
+        'Low': closes,
+        'Close': closes,
+        'Volume': volume
+    }, index=index)
+
+
+def buy_then_sell(data, timestamp):
+    """Buys on the first bar of a symbol and sells on its last."""
+    if timestamp == data.index[0]:
+        return [{'action': 'buy', 'risk': 0.1}]
+    if timestamp == data.index[-1]:
+        return [{'action': 'sell'}]
+    return []
+
+
+class TestStrategyTesterPortfolio(unittest.TestCase):
+    def make_tester(self, frames, **kwargs):
+        tester = StrategyTester(slippage_percent=0.0, **kwargs)
+        tester.data_manager = FakeDataManager(frames)
+        return tester
+
+    def test_shared_cash_across_symbols(self):
+        """Test symbols trade against one cash balance and are marked at their own prices"""
+        frames = {
+            'AAA': make_frame([10.0, 11.0, 12.0]),
+            'BBB': make_frame([50.0, 40.0, 45.0])
+        }
+        tester = self.make_tester(frames, initial_capital=10000.0)
+        results = tester.run_portfolio(['AAA', 'BBB'], None, None, buy_then_sell)
+
+        buys = [t for t in results['trades'] if t['type'] == 'buy']
+        self.assertEqual([(t['symbol'], t['shares']) for t in buys], [('AAA', 100), ('BBB', 20)])
+        # 8000 cash + 100 * 11 + 20 * 40 on the second bar
+        self.assertAlmostEqual(results['equity_curve'].iloc[1], 9900.0)
+        self.assertAlmostEqual(results['final_portfolio_value'], 10000 + 100 * 2 - 20 * 5)
+        self.assertEqual(results['positions'], {})
+
+    def test_unaligned_histories(self):
+        """Test a symbol without a bar keeps its last mark and is not sent to the strategy"""
+        frames = {
+            'AAA': make_frame([10.0, 10.0, 10.0, 10.0]),
+            'BBB': make_frame([20.0, 30.0], start='2023-01-03')
+        }
+        seen = []
+
+        def strategy(data, timestamp):
+            seen.append((data['Close'].iloc[0], timestamp))
+            return buy_then_sell(data, timestamp)
+
+        tester = self.make_tester(frames, initial_capital=10000.0)
+        results = tester.run_portfolio(['AAA', 'BBB'], None, None, strategy)
+
+        self.assertEqual(len(results['equity_curve']), 4)
+        self.assertEqual(len(seen), 6)
+        self.assertAlmostEqual(results['final_portfolio_value'], 10000 + 50 * 10)
+
+    def test_price_impact_and_commission(self):
+        """Test fills pay the modelled impact and commissions on both sides"""
+        tester = self.make_tester({}, commission_per_trade=1.0)
+        tester.execute_trade('AAA', 10, 100.0, True, None, price_impact=0.5)
+        self.assertAlmostEqual(tester.cash, 100000 - 1005 - 1)
+        tester.execute_trade('AAA', 10, 100.0, False, None, price_impact=0.5)
+        self.assertAlmostEqual(tester.cash, 100000 - 1006 + 995 - 1)
+        self.assertEqual(tester.positions, {})
+
+    def test_daily_returns_follow_the_equity_curve(self):
+        """Test daily returns include price moves between bars, not just trading costs"""
+        tester = self.make_tester({'AAA': make_frame([10.0, 12.0, 9.0, 9.0])}, initial_capital=1000.0)
+        results = tester.run_strategy('AAA', None, None, buy_then_sell)
+
+        equity = np.r_[1000.0, results['equity_curve'].to_numpy()]
+        np.testing.assert_allclose(results['daily_returns'], equity[1:] / equity[:-1] - 1)
+        self.assertAlmostEqual(results['daily_returns'][1], 0.02)
+
+    def test_single_symbol_run(self):
+        """Test run_strategy is the one-symbol portfolio"""
+        tester = self.make_tester({'AAA': make_frame([10.0, 12.0])}, initial_capital=1000.0)
+        results = tester.run_strategy('AAA', None, None, buy_then_sell)
+        self.assertAlmostEqual(results['final_portfolio_value'], 1000 + 10 * 2)
+        self.assertAlmostEqual(results['metrics']['total_return'], 0.02)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+from schwab_trader.config.market_config import STOCKS
+from schwab_trader.scripts.benchmark_backtests import find_regressions, run_benchmarks
+from schwab_trader.utils.price_panel import PricePanel
+from schwab_trader.utils.synthetic_market import generate_panel, panel_to_frames, panel_to_records
+
+
+class TestSyntheticMarket(unittest.TestCase):
+    def test_deterministic(self):
+        """Test the same seed gives the same universe"""
+        first = generate_panel(6, 1, seed=3)
+        np.testing.assert_array_equal(first.values, generate_panel(6, 1, seed=3).values)
+        self.assertFalse(np.array_equal(first.values, generate_panel(6, 1, seed=4).values))
+
+    def test_shape_and_symbols(self):
+        """Test universe size and configured tickers first"""
+        panel = generate_panel(6, 2)
+        self.assertEqual(panel.values.shape, (5, 504, 6))
+        self.assertEqual(panel.symbols[:len(STOCKS)], list(STOCKS))
+        self.assertEqual(panel.symbols[-1], 'SYN00005')
+
+    def test_bars_are_consistent(self):
+        """Test high and low bracket open and close and nothing is missing"""
+        panel = generate_panel(8, 3, seed=1)
+        self.assertFalse(np.isnan(panel.values).any())
+        self.assertTrue((panel.high >= np.maximum(panel.open, panel.close)).all())
+        self.assertTrue((panel.low <= np.minimum(panel.open, panel.close)).all())
+        self.assertTrue((panel.volume > 0).all())
+
+    def test_conversions(self):
+        """Test record and frame views carry the same bars"""
+        panel = generate_panel(2, 0.1)
+        records = panel_to_records(panel)
+        np.testing.assert_array_equal(PricePanel.from_records(records).values, panel.values)
+        frames = panel_to_frames(panel)
+        np.testing.assert_array_equal(frames['NVDA']['Close'].to_numpy(), panel.close[:, 1])
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_panel_benchmark(self):
+        """Test a small panel benchmark reports throughput"""
+        results = run_benchmarks([(3, 0.5)], backtesters=['panel'], memory=True)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['bars'], 3 * 126)
+        self.assertGreater(results[0]['bars_per_sec'], 0)
+        self.assertGreater(results[0]['peak_mb'], 0)
+
+    def test_find_regressions(self):
+        """Test slower or larger runs are flagged against the latest baseline"""
+        baseline = {'backtester': 'panel', 'symbols': 10, 'years': 1, 'bars_per_sec': 1000.0, 'peak_mb': 10.0}
+        history = [{'results': [dict(baseline, bars_per_sec=5000.0)]}, {'results': [baseline]}]
+        self.assertEqual(find_regressions(history, [dict(baseline, bars_per_sec=900.0)]), [])
+        messages = find_regressions(history, [dict(baseline, bars_per_sec=500.0, peak_mb=20.0)])
+        self.assertEqual(len(messages), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
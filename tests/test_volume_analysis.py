@@ -0,0 +1,140 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+from schwab_trader.services.volume_analysis import VolumeAnalysisService
+from schwab_trader.services.volume_history import VolumeHistory
+
+
+class TestAnalyzeUniverse(unittest.TestCase):
+    def setUp(self):
+        self.service = VolumeAnalysisService()
+        self.service.logger = MagicMock()
+        self.rng = np.random.default_rng(7)
+
+    def test_matches_single_symbol_analysis(self):
+        """Test every row agrees with analyze_volume_pattern"""
+        volumes = self.rng.uniform(5e5, 2e6, size=(40, 60))
+        volumes[0, -1] = 1e7
+        volumes[1, -1] = 1e4
+        symbols = [f'SYM{i}' for i in range(len(volumes))]
+        analyses = self.service.to_analyses(self.service.analyze_universe(symbols, volumes))
+
+        for symbol, row in zip(symbols, volumes):
+            expected = self.service.analyze_volume_pattern(symbol, row.tolist())
+            actual = analyses[symbol]
+            self.assertAlmostEqual(actual['baseline'], expected['baseline'], delta=1e-6 * expected['baseline'])
+            self.assertAlmostEqual(actual['volume_ratio'], expected['volume_ratio'])
+            self.assertEqual(actual['signal'], expected['signal'])
+            self.assertEqual(actual['details']['volume_trend'], expected['details']['volume_trend'])
+            self.assertAlmostEqual(actual['details']['volume_momentum'], expected['details']['volume_momentum'])
+        self.assertEqual(analyses['SYM0']['signal'], 'BUY')
+        self.assertEqual(analyses['SYM1']['signal'], 'SELL')
+
+    def test_ragged_histories(self):
+        """Test shorter histories are aligned and short ones held"""
+        long = self.rng.uniform(5e5, 2e6, size=50).tolist()
+        medium = self.rng.uniform(5e5, 2e6, size=35).tolist()
+        symbols, matrix = self.service.volume_matrix({'LONG': long, 'MEDIUM': medium, 'NEW': [1e6] * 5})
+        frame = self.service.analyze_universe(symbols, matrix)
+
+        self.assertEqual(matrix.shape, (3, 50))
+        self.assertAlmostEqual(
+            frame.loc['MEDIUM', 'baseline'],
+            self.service.analyze_volume_pattern('MEDIUM', medium)['baseline']
+        )
+        self.assertFalse(frame.loc['NEW', 'sufficient_data'])
+        self.assertEqual((frame.loc['NEW', 'baseline'], frame.loc['NEW', 'signal']), (0.0, 'HOLD'))
+        self.assertIn('error', self.service.to_analyses(frame)['NEW'])
+
+    def test_large_universe_is_fast(self):
+        """Test screening 5,000 tickers over a year takes milliseconds"""
+        volumes = self.rng.uniform(5e5, 2e6, size=(5000, 252))
+        symbols = [f'SYM{i}' for i in range(5000)]
+        started = time.perf_counter()
+        frame = self.service.analyze_universe(symbols, volumes)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(frame), 5000)
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(self.service.logger.info.call_count, 1)
+
+    def test_shape_mismatch(self):
+        """Test a matrix that does not match the symbols is rejected"""
+        with self.assertRaises(ValueError):
+            self.service.analyze_universe(['AAPL'], np.ones((2, 30)))
+
+    def test_alerts(self):
+        """Test alerts are built from an analysis"""
+        analysis = {
+            'current_volume': 3e6, 'volume_ratio': 3.0,
+            'details': {'unusual_activity': True, 'volume_momentum': 0.5}
+        }
+        self.assertEqual(len(self.service.alerts_for(analysis)), 2)
+
+
+class TestVolumeHistory(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(11)
+
+    def test_ring_buffer_keeps_latest_prints(self):
+        """Test the buffer wraps and returns prints in order"""
+        history = VolumeHistory(capacity=5, span=3, initial_symbols=1)
+        for volume in range(1, 9):
+            history.append('AAPL', float(volume))
+        history.append('MSFT', 42.0)
+
+        np.testing.assert_array_equal(history['AAPL'], [4.0, 5.0, 6.0, 7.0, 8.0])
+        self.assertEqual((history.latest('AAPL'), history.latest('AAPL', back=4)), (8.0, 4.0))
+        self.assertEqual(list(history), ['AAPL', 'MSFT'])
+        self.assertEqual(history.count('MSFT'), 1)
+
+    def test_running_accumulators_match_pandas(self):
+        """Test the running EMA and rolling mean equal full recomputation"""
+        volumes = self.rng.uniform(5e5, 2e6, size=500)
+        history = VolumeHistory(capacity=90, span=30)
+        for volume in volumes:
+            history.append('AAPL', volume)
+
+        expected_ema = pd.Series(volumes).ewm(span=30, adjust=False).mean().iloc[-1]
+        self.assertAlmostEqual(history.ema('AAPL'), expected_ema, delta=1e-6)
+        self.assertAlmostEqual(history.rolling_mean('AAPL'), volumes[-30:].mean(), delta=1e-6)
+
+
+class TestUpdateVolumeData(unittest.TestCase):
+    def setUp(self):
+        self.service = VolumeAnalysisService()
+        self.service.logger = MagicMock()
+
+    def test_baseline_tracks_new_prints(self):
+        """Test each print moves the baseline instead of freezing it"""
+        for _ in range(40):
+            analysis = self.service.update_volume_data('AAPL', 1_000_000.0)
+        self.assertAlmostEqual(analysis['baseline'], 1_000_000.0)
+
+        analysis = self.service.update_volume_data('AAPL', 3_000_000.0)
+        self.assertGreater(analysis['baseline'], 1_000_000.0)
+        self.assertEqual(analysis['signal'], 'BUY')
+        self.assertEqual(len(self.service.get_volume_alerts('AAPL')), 2)
+
+    def test_matches_full_history_analysis(self):
+        """Test the O(1) analysis agrees with analyzing the stored prints"""
+        volumes = np.random.default_rng(3).uniform(5e5, 2e6, size=60).tolist()
+        for volume in volumes:
+            analysis = self.service.update_volume_data('AAPL', volume)
+        expected = self.service.analyze_volume_pattern('AAPL', volumes)
+
+        self.assertAlmostEqual(analysis['baseline'], expected['baseline'], delta=1e-6)
+        self.assertAlmostEqual(analysis['details']['volume_momentum'], expected['details']['volume_momentum'])
+        self.assertEqual(analysis['signal'], expected['signal'])
+
+    def test_insufficient_data(self):
+        """Test early prints hold until the lookback is filled"""
+        analysis = self.service.update_volume_data('NEW', 1_000_000.0)
+        self.assertEqual((analysis['signal'], analysis['baseline']), ('HOLD', 0))
+        self.assertIn('error', analysis)
+
+
+if __name__ == '__main__':
+    unittest.main()
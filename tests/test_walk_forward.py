@@ -0,0 +1,146 @@
+import unittest
+import numpy as np
+import pandas as pd
+from schwab_trader.services.strategy_tester import StrategyTester
+from schwab_trader.strategies.sentiment_volume import SentimentVolumeStrategy
+from schwab_trader.utils.backtester import StrategyBacktester
+from schwab_trader.utils.walk_forward import WalkForwardValidator, walk_forward_splits
+from helpers import random_panel
+
+
+class TestWalkForwardSplits(unittest.TestCase):
+    def test_rolling_windows(self):
+        """Test rolling windows advance by the test size"""
+        self.assertEqual(walk_forward_splits(10, 4, 2), [(0, 4, 4, 6), (2, 6, 6, 8), (4, 8, 8, 10)])
+
+    def test_expanding_windows(self):
+        """Test expanding windows stay anchored at the first bar"""
+        self.assertEqual(walk_forward_splits(10, 4, 3, step=3, expanding=True), [(0, 4, 4, 7), (0, 7, 7, 10)])
+
+    def test_too_short(self):
+        """Test no folds when history is shorter than one window"""
+        self.assertEqual(walk_forward_splits(5, 4, 2), [])
+
+
+class TestWalkForwardValidator(unittest.TestCase):
+    def setUp(self):
+        self.panel = random_panel(160, 4, seed=11, price=40.0)
+        self.grid = {'lookback_days': [5, 10], 'volume_increase_threshold': [1.2, 1.5]}
+
+    def test_fold_matches_direct_backtest(self):
+        """Test reused signal matrices give the same result as a fresh backtest"""
+        validator = WalkForwardValidator(
+            SentimentVolumeStrategy, train_size=60, test_size=30,
+            params={'lookback_days': 10}, max_workers=1
+        )
+        results = validator.run(self.panel)
+        folds = results['folds']
+        self.assertEqual(len(folds), 3)
+
+        first = folds.iloc[0]
+        direct = StrategyBacktester(SentimentVolumeStrategy(lookback_days=10), initial_capital=100000).backtest(
+            self.panel, start_date=first['test_start'], end_date=first['test_end']
+        )
+        self.assertAlmostEqual(first['test_total_return'], direct['performance']['total_return'])
+
+    def test_aggregate_metrics(self):
+        """Test aggregate statistics over the out-of-sample folds"""
+        results = WalkForwardValidator(
+            SentimentVolumeStrategy, train_size=60, test_size=25, param_grid=self.grid, max_workers=1
+        ).run(self.panel)
+        folds = results['folds']
+        aggregate = results['aggregate']
+        self.assertEqual(aggregate['folds'], len(folds))
+        self.assertAlmostEqual(aggregate['mean_total_return'], folds['test_total_return'].mean())
+        self.assertAlmostEqual(
+            aggregate['compounded_return'],
+            np.prod(1 + folds['test_total_return']) - 1
+        )
+
+    def test_parallel_matches_serial(self):
+        """Test folds run in workers give the same results"""
+        kwargs = dict(train_size=60, test_size=25, param_grid=self.grid)
+        serial = WalkForwardValidator(SentimentVolumeStrategy, max_workers=1, **kwargs).run(self.panel)
+        parallel = WalkForwardValidator(SentimentVolumeStrategy, max_workers=2, **kwargs).run(self.panel)
+        self.assertEqual(serial['folds'].to_dict('records'), parallel['folds'].to_dict('records'))
+
+    def test_not_enough_history(self):
+        """Test a clear error when no fold fits"""
+        validator = WalkForwardValidator(SentimentVolumeStrategy, train_size=150, test_size=30, max_workers=1)
+        with self.assertRaises(ValueError):
+            validator.run(self.panel)
+
+
+
+class FrameDataManager:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_historical_data(self, symbol, start_date, end_date):
+        return self.frames[symbol].copy()
+
+
+def momentum(data, timestamp):
+    """Holds while the close is above its 5-day average."""
+    close = data['Close']
+    average = close.rolling(5).mean()
+    if close[timestamp] > average[timestamp]:
+        return [{'action': 'buy', 'risk': 0.2}]
+    return [{'action': 'sell'}]
+
+
+class TestStrategyTesterWalkForward(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        index = pd.bdate_range('2023-01-02', periods=120)
+        self.frames = {}
+        for symbol in ('AAA', 'BBB'):
+            closes = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index))))
+            self.frames[symbol] = pd.DataFrame({
+                'Open': closes, 'High': closes * 1.01, 'Low': closes * 0.99,
+                'Close': closes, 'Volume': rng.uniform(5e5, 2e6, len(index))
+            }, index=index)
+        self.tester = StrategyTester(slippage_percent=0.0)
+        self.tester.data_manager = FrameDataManager(self.frames)
+
+    def test_folds_match_windowed_runs(self):
+        """Test each fold equals a fresh run over its test window on the shared data"""
+        results = self.tester.walk_forward(['AAA', 'BBB'], None, None, momentum, train_size=40, test_size=20)
+        folds = results['folds']
+        self.assertEqual(len(folds), 4)
+        self.assertEqual(results['aggregate']['folds'], 4)
+
+        last = folds.iloc[-1]
+        frames = {symbol: self.tester.load_market_data(symbol, None, None) for symbol in self.frames}
+        aligned = self.tester._align(['AAA', 'BBB'], frames)
+        direct = self.tester._simulate(['AAA', 'BBB'], frames, momentum, aligned, 100, 120)
+        self.assertEqual(direct['equity_curve'].index[0], last['test_start'])
+        self.assertAlmostEqual(last['test_total_return'], direct['metrics']['total_return'])
+        self.assertAlmostEqual(
+            results['aggregate']['compounded_return'],
+            np.prod(1 + folds['test_total_return']) - 1
+        )
+
+    def test_parallel_matches_serial(self):
+        """Test windows run in worker processes give the same folds and leave the tester alone"""
+        args = (['AAA', 'BBB'], None, None)
+        serial = self.tester.walk_forward(*args, momentum, train_size=40, test_size=20, max_workers=1)
+        parallel = self.tester.walk_forward(*args, momentum, train_size=40, test_size=20, max_workers=2)
+        self.assertEqual(serial['folds'].to_dict('records'), parallel['folds'].to_dict('records'))
+        self.assertEqual((self.tester.trades, self.tester.cash), ([], self.tester.initial_capital))
+
+    def test_unpicklable_strategy_runs_serially(self):
+        """Test a lambda strategy still walks forward in this process"""
+        results = self.tester.walk_forward(
+            ['AAA'], None, None, lambda data, timestamp: momentum(data, timestamp),
+            train_size=40, test_size=20, max_workers=2
+        )
+        self.assertEqual(len(results['folds']), 4)
+
+    def test_not_enough_history(self):
+        """Test a clear error when no fold fits"""
+        with self.assertRaises(ValueError):
+            self.tester.walk_forward(['AAA'], None, None, momentum, train_size=100, test_size=40)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 from datetime import datetime, timedelta
-from schwab_trader.services.yfinance import YFinanceAPI
+from schwab_trader.services.yfinance import YFinanceAPI, history_cache
 import time
 from unittest.mock import patch, MagicMock
 import pandas as pd
@@ -8,6 +8,7 @@ import pandas as pd
 class TestYFinanceAPI(unittest.TestCase):
     def setUp(self):
         """Set up test environment"""
+        history_cache.clear()  # shared by every YFinanceAPI
         self.api = YFinanceAPI(max_retries=2, retry_delay=1.0)  # Shorter retry settings for tests
         
         # Test symbols